@@ -9,17 +9,22 @@ from fastapi import APIRouter
 
 from app.api.state import (
     context_events,
+    context_ingest,
     event_bus,
     hardware_bridge,
     initiative_scheduler,
     initiative_service,
     media_sessions,
 )
+from app.blocking import pool_stats
 from app.config import settings
 from app.db import engine as db_engine
+from app.memory.embed_cache import get_embedding_cache
 from app.memory.store import MemoryStore
 from app.vault import get_secret
 from services import llama_local
+from services.ai_router import provider_health
+from services.router_logging import get_recent_logs, prompt_cache_stats
 
 router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
 
@@ -86,28 +91,41 @@ def _provider_diagnostics() -> Dict[str, Any]:
     openai_configured = bool(settings.openai_api_key)
     grok_configured = bool(settings.xai_api_key)
     gemini_configured = bool(settings.gemini_api_key)
+    health = provider_health().snapshot()
+    try:
+        cache = prompt_cache_stats(get_recent_logs(limit=200))
+    except Exception:
+        cache = {}
 
     return {
         "gguf": {
             "configured": bool(settings.gguf_model_path),
             "available": llama_local.is_available(),
             "model_path": bool(settings.gguf_model_path),
+            "worker": llama_local.worker_stats(),
+            "routing": health.get("gguf"),
         },
-        "ollama": _ollama_status(),
+        "ollama": {**_ollama_status(), "routing": health.get("ollama")},
         "openai": {
             "configured": openai_configured,
             "available": openai_configured and openai_sdk_available,
             "sdk_available": openai_sdk_available,
+            "routing": health.get("gpt4o"),
+            "prompt_cache": cache.get("gpt4o"),
         },
         "grok": {
             "configured": grok_configured,
             "available": grok_configured and grok_sdk_available,
             "sdk_available": grok_sdk_available,
+            "routing": health.get("grok"),
+            "prompt_cache": cache.get("grok"),
         },
         "gemini": {
             "configured": gemini_configured,
             "available": gemini_configured and gemini_sdk_available,
             "sdk_available": gemini_sdk_available,
+            "routing": health.get("gemini"),
+            "prompt_cache": cache.get("gemini"),
         },
     }
 
@@ -122,6 +140,7 @@ def _storage_diagnostics() -> Dict[str, Any]:
         "database_target": settings.database_url or settings.db_path,
         "vector_mode": vector_mode,
         "session_store": "sqlalchemy",
+        "embedding_cache": get_embedding_cache().stats(),
     }
 
 
@@ -164,7 +183,10 @@ def _realtime_diagnostics() -> Dict[str, Any]:
         "bus": "in_process",
         "subscriber_count": len(event_bus._subscribers),
         "recent_event_buffer": event_bus._history.maxlen,
+        "session_event_buffers": len(event_bus._session_history),
         "tracked_media_sessions": len(media_sessions._sessions),
+        "media_session_persistence": media_sessions.diagnostics(),
+        "blocking_pools": pool_stats(),
     }
 
 
@@ -266,7 +288,7 @@ def build_runtime_diagnostics() -> Dict[str, Any]:
         "realtime": realtime,
         "hardware_bridge": hardware_bridge,
         "initiative": initiative,
-        "context_events": context_events.diagnostics(),
+        "context_events": {**context_events.diagnostics(), "ingest": context_ingest.stats()},
     }
 
 
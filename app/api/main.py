@@ -27,7 +27,14 @@ from app.api.models import (
     OAuthCallbackResponse,
     OAuthStartResponse,
 )
-from app.api.state import agent, memory_store, mqtt_bridge, initiative_scheduler
+from app.api.state import (
+    agent,
+    context_ingest,
+    initiative_scheduler,
+    media_sessions,
+    memory_store,
+    mqtt_bridge,
+)
 from app.api.v2 import router as v2_router
 from app.config import settings
 from app.db import engine as db_engine
@@ -40,10 +47,13 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await mqtt_bridge.start()
+    await context_ingest.start()
     await initiative_scheduler.start()
     yield
     await initiative_scheduler.stop()
     await mqtt_bridge.stop()
+    await context_ingest.stop()
+    media_sessions.close()
 
 
 app = FastAPI(title="Joi API", version="1.0.0", lifespan=lifespan)
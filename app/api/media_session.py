@@ -1,71 +1,181 @@
+"""In-memory media-session state with write-behind persistence.
+
+``update`` runs several times per voice or chat turn and ``get`` runs once
+per streamed token (``_assistant_turn_is_active``), while most fields are
+transient latency metrics. So state lives in typed per-session objects,
+every update publishes a ready-made snapshot that readers fetch without
+taking the lock, and changed sessions are only marked dirty: a timer
+flushes them to the state database at most every
+``media_session_flush_ms``, and ``close`` flushes whatever is left. The
+owner calls ``close`` at shutdown (the app singleton is also registered
+with ``atexit`` in ``app.api.state``).
+"""
+
 from __future__ import annotations
 
+import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 from threading import Lock
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.persistence import StateTable
+
+log = logging.getLogger(__name__)
+
+_DEFAULTS: Dict[str, Any] = {
+    "assistant_turn_id": None,
+    "voice_mode": "push_to_talk",
+    "turn_state": "idle",
+    "mic_state": "idle",
+    "speaking_state": "idle",
+    "capture_source": "browser",
+    "last_transcript": "",
+    "recognition_latency_ms": None,
+    "end_of_speech_to_transcript_ms": None,
+    "speech_duration_ms": None,
+    "speech_detected": False,
+    "model_latency_ms": None,
+    "tts_generation_latency_ms": None,
+    "first_audio_latency_ms": None,
+    "end_to_end_latency_ms": None,
+    "playback_latency_ms": None,
+    "interruption_count": 0,
+    "last_error": None,
+}
+
 
-from app.persistence import read_json, write_json_atomic
+class MediaSessionState:
+    """Typed state of one media session; unknown keys are kept in ``extra``."""
+
+    __slots__ = ("session_id", "updated_at", "extra", *_DEFAULTS)
+
+    def __init__(self, session_id: str, values: Optional[Dict[str, Any]] = None) -> None:
+        self.session_id = session_id
+        self.updated_at = datetime.utcnow().isoformat()
+        self.extra: Dict[str, Any] = {}
+        for key, value in _DEFAULTS.items():
+            setattr(self, key, value)
+        if values:
+            self.apply(values, skip_none=False)
+
+    def apply(self, values: Dict[str, Any], *, skip_none: bool = True) -> None:
+        for key, value in values.items():
+            if key == "session_id" or (skip_none and value is None):
+                continue
+            if key == "updated_at" or key in _DEFAULTS:
+                setattr(self, key, value)
+            else:
+                self.extra[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        state = {"session_id": self.session_id}
+        state.update((key, getattr(self, key)) for key in _DEFAULTS)
+        state.update(self.extra)
+        state["updated_at"] = self.updated_at
+        return state
 
 
 class MediaSessionStore:
     """In-memory state for browser-driven media sessions."""
 
-    def __init__(self, path: Path | None = None) -> None:
+    def __init__(self, path: Path | None = None, *, flush_ms: Optional[int] = None) -> None:
         self.path = path
-        loaded = read_json(path, {}) if path is not None else {}
-        self._sessions: Dict[str, Dict[str, Any]] = loaded if isinstance(loaded, dict) else {}
+        self.flush_s = max(0, settings.media_session_flush_ms if flush_ms is None else flush_ms) / 1000
+        self._table = StateTable(path) if path is not None else None
+        self._sessions: Dict[str, MediaSessionState] = {}
+        # Published per-session dicts: replaced wholesale, never mutated.
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
         self._lock = Lock()
+        self._flush_lock = Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._flushes = 0
+        if self._table is not None:
+            self._table.migrate_json(self._legacy_rows)
+            for session_id, values in self._table.items():
+                if isinstance(values, dict):
+                    self._publish(MediaSessionState(session_id, values))
 
     def get(self, session_id: str) -> Dict[str, Any]:
-        with self._lock:
-            existing = self._sessions.get(session_id)
-            if existing is None:
-                existing = self._default_state(session_id)
-                self._sessions[session_id] = existing
-            else:
-                existing = {**self._default_state(session_id), **existing}
-                self._sessions[session_id] = existing
-            return dict(existing)
+        snapshot = self._snapshots.get(session_id)
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshots.get(session_id)
+                if snapshot is None:
+                    snapshot = self._publish(MediaSessionState(session_id))
+        return dict(snapshot)
 
     def update(self, session_id: str, **patch: Any) -> Dict[str, Any]:
         with self._lock:
-            current = self._sessions.get(session_id)
-            if current is None:
-                current = self._default_state(session_id)
-            else:
-                current = {**self._default_state(session_id), **current}
-            for key, value in patch.items():
-                if value is not None:
-                    current[key] = value
-            current["updated_at"] = datetime.utcnow().isoformat()
-            self._sessions[session_id] = current
-            if self.path is not None:
-                write_json_atomic(self.path, self._sessions)
-            return dict(current)
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = MediaSessionState(session_id)
+            state.apply(patch)
+            state.updated_at = datetime.utcnow().isoformat()
+            snapshot = self._publish(state)
+            if self._table is not None:
+                self._dirty.add(session_id)
+                self._schedule_locked()
+        if self._table is not None and not self.flush_s:
+            self.flush()
+        return dict(snapshot)
 
-    @staticmethod
-    def _default_state(session_id: str) -> Dict[str, Any]:
-        now = datetime.utcnow().isoformat()
+    def flush(self) -> int:
+        """Write dirty sessions now; returns how many were written."""
+        if self._table is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                self._timer = None
+                rows = [(session_id, self._snapshots[session_id]) for session_id in dirty]
+            if rows:
+                self._table.put_many(rows)
+                self._flushes += 1
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        try:
+            self.flush()
+        except Exception as exc:  # interpreter shutdown; nothing else to try
+            log.warning("Media session flush failed: %s", exc)
+
+    def diagnostics(self) -> Dict[str, Any]:
         return {
-            "session_id": session_id,
-            "assistant_turn_id": None,
-            "voice_mode": "push_to_talk",
-            "turn_state": "idle",
-            "mic_state": "idle",
-            "speaking_state": "idle",
-            "capture_source": "browser",
-            "last_transcript": "",
-            "recognition_latency_ms": None,
-            "end_of_speech_to_transcript_ms": None,
-            "speech_duration_ms": None,
-            "speech_detected": False,
-            "model_latency_ms": None,
-            "tts_generation_latency_ms": None,
-            "first_audio_latency_ms": None,
-            "end_to_end_latency_ms": None,
-            "playback_latency_ms": None,
-            "interruption_count": 0,
-            "last_error": None,
-            "updated_at": now,
+            "tracked": len(self._snapshots),
+            "dirty": len(self._dirty),
+            "flushes": self._flushes,
+            "flush_ms": int(self.flush_s * 1000),
         }
+
+    def _publish(self, state: MediaSessionState) -> Dict[str, Any]:
+        # Caller holds self._lock (or is the constructor).
+        self._sessions[state.session_id] = state
+        snapshot = self._snapshots[state.session_id] = state.to_dict()
+        return snapshot
+
+    def _schedule_locked(self) -> None:
+        if self._timer is not None or not self.flush_s:
+            return
+        self._timer = threading.Timer(self.flush_s, self._flush_quietly)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except Exception as exc:
+            log.warning("Media session flush failed: %s", exc)
+
+    @staticmethod
+    def _legacy_rows(data: Any) -> List[Tuple[str, Any]]:
+        if not isinstance(data, dict):
+            return []
+        return [(str(key), value) for key, value in data.items() if isinstance(value, dict)]
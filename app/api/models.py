@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import BigInteger, Text, Float, DateTime, Integer, Boolean, ARRAY, String, Date, Column
+from sqlalchemy import BigInteger, Text, Float, DateTime, Integer, Boolean, ARRAY, String, Date, Column, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from pgvector.sqlalchemy import Vector
 from datetime import datetime, date
@@ -108,6 +108,8 @@ class MoodEntry(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chatmessage"
+    # Windowed history reads page a session by id (keyset pagination).
+    __table_args__ = (Index("ix_chat_session_id", "session_id", "id"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     session_id: Mapped[str] = mapped_column(String)
     role: Mapped[str] = mapped_column(String)
@@ -1,25 +1,89 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
+import itertools
 import json
-from collections import deque
+import time
+import zlib
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Deque, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
 from uuid import uuid4
 
+# Per-token events are superseded by message.completed; keeping them in the
+# backfill history would flush out everything else.
+_TRANSIENT_EVENTS = {"message.delta"}
+
+
+class Envelope(dict):
+    """Event envelope that carries its SSE frame, rendered once at publish."""
+
+    sse: str = ""
+
+
+class _RingBuffer:
+    """Fixed-capacity event buffer, oldest first, indexable for ``bisect``."""
+
+    def __init__(self, capacity: int) -> None:
+        self.maxlen = max(1, capacity)
+        self._items: List[Optional[Envelope]] = [None] * self.maxlen
+        self._start = 0
+        self._size = 0
+        self.evicted_seq = 0  # seq of the newest event that fell off the end
+
+    def append(self, item: Envelope) -> None:
+        if self._size < self.maxlen:
+            self._items[(self._start + self._size) % self.maxlen] = item
+            self._size += 1
+            return
+        self.evicted_seq = self._items[self._start]["seq"]
+        self._items[self._start] = item
+        self._start = (self._start + 1) % self.maxlen
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> Envelope:
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        return self._items[(self._start + index) % self.maxlen]
+
+    def tail(self, limit: int) -> List[Envelope]:
+        return [self[i] for i in range(max(0, self._size - limit), self._size)]
+
+    def after(self, seq: int) -> List[Envelope]:
+        start = bisect.bisect_right(self, seq, key=lambda event: event["seq"])
+        return [self[i] for i in range(start, self._size)]
+
 
 class RealtimeEventBus:
-    """Process-local pub/sub bus for SSE clients."""
+    """Process-local pub/sub bus for SSE clients.
+
+    Every event gets a monotonically increasing ``seq`` and an ``event_id``
+    of ``<epoch>-<seq>``, where the epoch changes on every process start.
+    Besides the global history, each session keeps its own ring buffer, so
+    a reconnecting client resumes from its ``Last-Event-ID`` with a binary
+    search over just its session's events. An id from an earlier process
+    does not match the epoch, and the client gets a plain backfill instead.
+    """
 
     # Per-subscriber queue cap. A stalled or dead client can't grow memory without
     # bound; once full, its oldest queued events are dropped (it still gets a
     # backfill on reconnect).
     _SUBSCRIBER_QUEUE_MAX = 256
+    # Session ring buffers kept, least recently published to evicted first.
+    _MAX_SESSION_BUFFERS = 256
 
-    def __init__(self, history_limit: int = 200) -> None:
-        self._history: Deque[Dict[str, Any]] = deque(maxlen=history_limit)
+    def __init__(self, history_limit: int = 200, *, compact: bool = True) -> None:
+        self._history = _RingBuffer(history_limit)
+        self._session_history: "OrderedDict[str, _RingBuffer]" = OrderedDict()
+        self._history_limit = history_limit
         self._subscribers: Dict[str, Dict[str, Any]] = {}
         self._lock = asyncio.Lock()
+        self._seq = itertools.count(1)
+        self._compact = compact
+        self.epoch = uuid4().hex[:8]
 
     async def publish(
         self,
@@ -29,17 +93,24 @@ class RealtimeEventBus:
         session_id: Optional[str] = None,
         source: str = "system",
     ) -> Dict[str, Any]:
-        envelope = {
-            "api_version": "v2",
-            "event_id": str(uuid4()),
-            "event": event,
-            "source": source,
-            "session_id": session_id,
-            "timestamp": datetime.utcnow().isoformat(),
-            "payload": payload,
-        }
         async with self._lock:
-            self._history.append(envelope)
+            seq = next(self._seq)
+            envelope = Envelope(
+                api_version="v2",
+                event_id=f"{self.epoch}-{seq}",
+                seq=seq,
+                event=event,
+                source=source,
+                session_id=session_id,
+                timestamp=datetime.utcnow().isoformat(),
+                payload=payload,
+            )
+            # Serialized once here, not once per subscriber.
+            envelope.sse = format_sse_event(envelope, compact=self._compact)
+            if event not in _TRANSIENT_EVENTS:
+                self._history.append(envelope)
+                if session_id is not None:
+                    self._session_buffer(session_id).append(envelope)
             subscribers = list(self._subscribers.values())
 
         for subscriber in subscribers:
@@ -83,19 +154,144 @@ class RealtimeEventBus:
         session_id: Optional[str] = None,
         limit: int = 20,
     ) -> List[Dict[str, Any]]:
-        async with self._lock:
-            events = list(self._history)
-
-        if session_id is not None:
-            events = [event for event in events if event.get("session_id") == session_id]
         if limit <= 0:
             return []
-        return events[-limit:]
+        async with self._lock:
+            buffer = self._history if session_id is None else self._session_history.get(session_id)
+            return buffer.tail(limit) if buffer is not None else []
+
+    async def replay_after(
+        self,
+        last_event_id: Optional[str],
+        *,
+        session_id: Optional[str] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Events after *last_event_id*, or ``None`` if it can't be resumed from.
+
+        That includes an id older than the oldest retained event (the events in
+        between are gone) and a session whose buffer was evicted; the caller
+        falls back to a plain backfill rather than replaying with a silent gap.
+        """
+        seq = self.parse_event_id(last_event_id)
+        if seq is None:
+            return None
+        async with self._lock:
+            buffer = self._history if session_id is None else self._session_history.get(session_id)
+            if buffer is None or seq < buffer.evicted_seq:
+                return None
+            return buffer.after(seq)
+
+    def parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        epoch, _, seq = (event_id or "").partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _session_buffer(self, session_id: str) -> _RingBuffer:
+        # Caller holds self._lock.
+        buffer = self._session_history.get(session_id)
+        if buffer is None:
+            buffer = self._session_history[session_id] = _RingBuffer(self._history_limit)
+            while len(self._session_history) > self._MAX_SESSION_BUFFERS:
+                self._session_history.popitem(last=False)
+        else:
+            self._session_history.move_to_end(session_id)
+        return buffer
+
+
+class DeltaCoalescer:
+    """Batches streamed tokens into few ``message.delta`` events.
+
+    ``push`` is called from the provider thread for every token; it only
+    schedules a cheap loop callback. On the loop, text accumulates until
+    ``max_chars`` are buffered or ``window_s`` has passed since the first
+    buffered token, then one event carries just the new text and a
+    per-turn ``seq``. Events are published strictly in order. Whether the
+    turn is still active is checked at most every ``check_interval_s``.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        publish: Callable[[str, int], Awaitable[Any]],
+        is_active: Callable[[], bool],
+        *,
+        window_s: float = 0.03,
+        max_chars: int = 64,
+        check_interval_s: float = 0.1,
+    ) -> None:
+        self._loop = loop
+        self._publish = publish
+        self._is_active = is_active
+        self._window_s = window_s
+        self._max_chars = max_chars
+        self._check_interval_s = check_interval_s
+        self._active = True
+        self._checked_at = float("-inf")
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tail: Optional[asyncio.Task] = None
+        self.seq = 0
+
+    def push(self, delta: str) -> None:
+        """Thread-safe token sink (the provider's ``on_token``)."""
+        if not delta or not self._turn_active():
+            return
+        self._loop.call_soon_threadsafe(self._append, delta)
+
+    async def flush(self) -> None:
+        """Publish whatever is buffered and wait for every event to go out."""
+        self._emit()
+        if self._tail is not None:
+            await self._tail
+
+    def _turn_active(self) -> bool:
+        now = time.monotonic()
+        if self._active and now - self._checked_at >= self._check_interval_s:
+            self._checked_at = now
+            self._active = self._is_active()
+        return self._active
+
+    def _append(self, delta: str) -> None:
+        self._buffer.append(delta)
+        self._buffered += len(delta)
+        if self._buffered >= self._max_chars:
+            self._emit()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(self._window_s, self._emit)
+
+    def _emit(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        self.seq += 1
+        self._tail = self._loop.create_task(self._publish_after(self._tail, text, self.seq))
+
+    async def _publish_after(self, previous: Optional[asyncio.Task], text: str, seq: int) -> None:
+        if previous is not None:
+            await previous
+        await self._publish(text, seq)
+
+
+def format_sse_event(envelope: Dict[str, Any], *, compact: bool = False) -> str:
+    cached = getattr(envelope, "sse", "")
+    if cached:
+        return cached
+    data = json.dumps(envelope, separators=(",", ":")) if compact else json.dumps(envelope)
+    # Only sequenced events set the client's Last-Event-ID; a heartbeat must not.
+    id_line = f"id: {envelope['event_id']}\n" if "seq" in envelope else ""
+    return f"{id_line}event: {envelope['event']}\ndata: {data}\n\n"
 
 
-def format_sse_event(envelope: Dict[str, Any]) -> str:
-    return (
-        f"id: {envelope['event_id']}\n"
-        f"event: {envelope['event']}\n"
-        f"data: {json.dumps(envelope)}\n\n"
-    )
+async def gzip_sse_stream(frames: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """gzip an SSE stream, sync-flushing after every frame so events aren't held back."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for frame in frames:
+        yield compressor.compress(frame.encode("utf-8")) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
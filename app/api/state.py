@@ -1,3 +1,5 @@
+import atexit
+
 from app.hardware.bridge import HardwareBridgeStore
 from app.hardware.mqtt_bridge import MqttBridge
 from app.api.media_session import MediaSessionStore
@@ -6,6 +8,8 @@ from app.api.realtime import RealtimeEventBus
 from app.api.runtime_settings import RuntimeSettingsStore
 from app.avatar.life_state import LifeStateEngine
 from app.desktop_actions import DesktopActionBroker
+from app.context_events.ingest import ContextIngestPipeline
+from app.context_events.models import ContextDecision
 from app.context_events.service import ContextEventService
 from app.context_events.store import ContextEventStore
 from app.context_events.feedback import ContextFeedbackStore
@@ -30,6 +34,8 @@ desktop_action_broker = DesktopActionBroker()
 perception_policy = PerceptionPolicyStore()
 event_bus = RealtimeEventBus()
 media_sessions = MediaSessionStore(_runtime_data / "media_sessions.json")
+# The lifespan closes it on a clean shutdown; this covers exits that skip it.
+atexit.register(media_sessions.close)
 hardware_bridge = HardwareBridgeStore()
 mqtt_bridge = MqttBridge(hardware_bridge, event_bus)
 telegram_outbox = TelegramOutbox(_runtime_data / "telegram_outbox.json")
@@ -43,6 +49,18 @@ context_events = ContextEventService(
     ContextEventStore(_runtime_data / "context_events.json"),
     ContextFeedbackStore(_runtime_data / "context_feedback.json"),
 )
+
+
+async def _publish_context_decision(decision: ContextDecision) -> None:
+    await event_bus.publish(
+        "context.observed" if decision.accepted else "context.suppressed",
+        decision.to_dict(),
+        session_id=decision.event.session_id,
+        source="context",
+    )
+
+
+context_ingest = ContextIngestPipeline(context_events, _publish_context_decision)
 life_state_engine = LifeStateEngine()
 initiative_scheduler = InitiativeScheduler(
     initiative_service,
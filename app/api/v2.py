@@ -19,11 +19,13 @@ from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 
 from app.hardware.schemas import HardwareBridgeContractResponse, HardwareStateName
-from app.api.realtime import format_sse_event
+from app.api.realtime import DeltaCoalescer, format_sse_event, gzip_sse_stream
+from app.blocking import run_blocking
 from app.api.state import (
     agent,
     approval_manager,
     context_events,
+    context_ingest,
     desktop_action_broker,
     event_bus,
     hardware_bridge,
@@ -172,16 +174,9 @@ MAX_IMAGE_BYTES = 8 * 1024 * 1024
 MAX_IMAGE_PIXELS = 20_000_000
 
 
-async def _observe_context_event(**kwargs: Any) -> dict[str, Any]:
-    decision = context_events.observe(**kwargs)
-    payload = decision.to_dict()
-    await event_bus.publish(
-        "context.observed" if decision.accepted else "context.suppressed",
-        payload,
-        session_id=decision.event.session_id,
-        source="context",
-    )
-    return payload
+def _observe_context_event(**kwargs: Any) -> bool:
+    # Decided, stored and published in batches by the ingest worker.
+    return context_ingest.submit(**kwargs)
 
 
 def _connector_resources() -> list[ConnectorResource]:
@@ -603,35 +598,25 @@ def _create_delta_bridge(
     session_id: str,
     client_turn_id: str,
 ) -> tuple[Any, Any]:
-    pending: List[Any] = []
-    accumulated = ""
-
-    def on_token(delta: str) -> None:
-        nonlocal accumulated
-        if not delta or not _assistant_turn_is_active(session_id, client_turn_id):
-            return
-        accumulated += delta
-        future = asyncio.run_coroutine_threadsafe(
-            event_bus.publish(
-                "message.delta",
-                {
-                    "message_id": None,
-                    "delta": delta,
-                    "content": accumulated,
-                    "client_turn_id": client_turn_id,
-                },
-                session_id=session_id,
-                source="chat",
-            ),
-            loop,
+    async def publish(delta: str, seq: int) -> None:
+        await event_bus.publish(
+            "message.delta",
+            {
+                "message_id": None,
+                "delta": delta,
+                "seq": seq,
+                "client_turn_id": client_turn_id,
+            },
+            session_id=session_id,
+            source="chat",
         )
-        pending.append(future)
-
-    async def flush() -> None:
-        for future in pending:
-            await asyncio.wrap_future(future)
 
-    return on_token, flush
+    coalescer = DeltaCoalescer(
+        loop,
+        publish,
+        lambda: _assistant_turn_is_active(session_id, client_turn_id),
+    )
+    return coalescer.push, coalescer.flush
 
 
 def _parse_memory_tags(raw_tags: Any) -> List[str]:
@@ -1281,15 +1266,21 @@ async def create_session(request: SessionCreateRequest):
 
 
 @router.get("/sessions/{session_id}/messages", response_model=MessageListResponse)
-async def get_session_messages(session_id: str, limit: int = Query(default=100, ge=1, le=500)):
+async def get_session_messages(
+    session_id: str,
+    limit: int = Query(default=100, ge=1, le=500),
+    before_id: int | None = Query(default=None, ge=1),
+):
     session = memory_store.get_session(session_id)
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    messages = memory_store.get_chat_history(session_id)[-limit:]
+    window = memory_store.get_chat_window(session_id, limit, before_id=before_id)
     return MessageListResponse(
         session=_session_resource(session),
-        messages=[_message_resource(message) for message in messages],
+        messages=[_message_resource(message) for message in window],
+        total=window.total,
+        next_before_id=window.next_before_id,
     )
 
 
@@ -1315,8 +1306,9 @@ async def search_memory(
     memory_type: str | None = None,
     mode: str = Query(default="graph", pattern="^(graph|vector)$"),
 ):
+    timings: Dict[str, float] = {}
     if mode == "graph":
-        items = memory_store.graph_rag_search(query, k=limit)
+        items = memory_store.graph_rag_search(query, k=limit, timings=timings)
     else:
         items = memory_store.search_embeddings(
             query,
@@ -1327,6 +1319,7 @@ async def search_memory(
     return MemorySearchResponseV2(
         query=query,
         items=[_memory_search_item_resource(item) for item in items],
+        timings_ms=timings,
     )
 
 
@@ -1407,19 +1400,23 @@ async def chat_v2(request: V2ChatRequest):
         last_error=None,
     )
     await _publish_media_session(request.session_id, assistant_state)
-    history = memory_store.get_chat_history(request.session_id)
-    initiative_service.record_user_activity(
+    from app.config import settings
+
+    # Store reads/writes and attachment decoding are blocking; keep them off the loop.
+    history = await run_blocking(memory_store.get_chat_window, request.session_id, settings.chat_history_window)
+    await run_blocking(
+        initiative_service.record_user_activity,
         session_id=request.session_id,
         source="chat.message.received",
         clear_absence=True,
     )
     # A user message is the engagement signal for any recent proactive initiative
     # in this session — resolve its feedback (engaged / aged-out to ignored).
-    initiative_service.register_user_reply(session_id=request.session_id)
+    await run_blocking(initiative_service.register_user_reply, session_id=request.session_id)
     attachment_resources: List[ChatAttachmentResource] = []
     attachment_contexts: List[str] = []
     for attachment in request.attachments:
-        resource, context_text = _attachment_context(attachment)
+        resource, context_text = await run_blocking(_attachment_context, attachment)
         attachment_resources.append(resource)
         attachment_contexts.append(context_text)
 
@@ -1439,7 +1436,7 @@ async def chat_v2(request: V2ChatRequest):
                 session_id=request.session_id,
                 source="perception",
             )
-            await _observe_context_event(
+            _observe_context_event(
                 source="screen",
                 kind="manual_screen_capture",
                 category="work_activity",
@@ -1462,7 +1459,7 @@ async def chat_v2(request: V2ChatRequest):
         {
             "text": visible_user_text,
             "client_turn_id": client_turn_id,
-            "history_count": len(history),
+            "history_count": history.total,
             "attachments": [attachment.model_dump(mode="json") for attachment in attachment_resources],
         },
         session_id=request.session_id,
@@ -1484,10 +1481,11 @@ async def chat_v2(request: V2ChatRequest):
         reason="assistant response in progress",
     )
     from app.user_model.explicit_share import detect_explicit_share, acknowledgement_hint
-    share = detect_explicit_share(request.text)
+    share = await run_blocking(detect_explicit_share, request.text)
     sharing_extra_context: str | None = None
     if share is not None:
-        user_model_corrections.record(
+        await run_blocking(
+            user_model_corrections.record,
             user_id="default",
             section_key=share.section_key,
             action="add",
@@ -1509,8 +1507,7 @@ async def chat_v2(request: V2ChatRequest):
         client_turn_id,
     )
     model_started = time.perf_counter()
-    response = await asyncio.to_thread(
-        agent.reply,
+    response = await agent.areply(
         history,
         visible_user_text,
         request.session_id,
@@ -1520,13 +1517,15 @@ async def chat_v2(request: V2ChatRequest):
     )
     model_latency_ms = int((time.perf_counter() - model_started) * 1000)
     await flush_deltas()
-    session = memory_store.get_session(request.session_id)
+    session = await run_blocking(memory_store.get_session, request.session_id)
     if session is None:
         raise HTTPException(status_code=500, detail="Session record missing after chat")
 
-    messages = memory_store.get_chat_history(request.session_id)
-    user_message = next((msg for msg in reversed(messages) if msg.id == response.user_message_id), None)
-    assistant_message = next((msg for msg in reversed(messages) if msg.id == response.assistant_message_id), None)
+    messages = await run_blocking(
+        memory_store.get_messages_by_ids, [response.user_message_id, response.assistant_message_id]
+    )
+    user_message = messages.get(response.user_message_id)
+    assistant_message = messages.get(response.assistant_message_id)
     if user_message is None or assistant_message is None:
         raise HTTPException(status_code=500, detail="Chat message records missing after reply")
 
@@ -1544,7 +1543,8 @@ async def chat_v2(request: V2ChatRequest):
         await _publish_media_session(request.session_id, assistant_state)
     else:
         if response.assistant_message_id is not None:
-            memory_store.delete_chat_message(
+            await run_blocking(
+                memory_store.delete_chat_message,
                 response.assistant_message_id,
                 session_id=request.session_id,
                 role="assistant",
@@ -1596,8 +1596,8 @@ async def chat_v2(request: V2ChatRequest):
                     source="approvals",
                 )
 
-    craving_engine = CravingEngine(memory_store)
-    avatar_expression = craving_engine.get_craving_expression(request.session_id)
+    # Reuse the turn's score: recomputing here would read the message just persisted.
+    avatar_expression = CravingEngine.expression_for_score(response.craving_score)
     voice_hint = "whisper" if response.craving_score >= 60 else "default"
     avatar_resource = AvatarCueResource(
         expression=avatar_expression,
@@ -2668,7 +2668,7 @@ async def record_initiative_activity(
         session_id=session_id,
         source="initiative",
     )
-    await _observe_context_event(
+    _observe_context_event(
         source=source,
         kind=f"user_{state}",
         category="wellbeing",
@@ -2920,21 +2920,32 @@ async def stream_events(
     request: Request,
     session_id: str | None = None,
     backfill: int = Query(default=10, ge=0, le=100),
+    last_event_id: str | None = None,
+    compress: bool = False,
 ):
-    async def event_generator():
-        if backfill:
-            recent = await event_bus.get_recent(session_id=session_id, limit=backfill)
-            for event in recent:
-                yield format_sse_event(event)
+    # EventSource resends the header itself; clients that reconnect by hand
+    # pass the id as a query param.
+    resume_from = request.headers.get("last-event-id") or last_event_id
 
+    async def event_generator():
+        # Subscribe before reading the replay so nothing published in between is lost.
         subscriber_id, queue = await event_bus.subscribe(session_id=session_id)
         try:
+            replay = await event_bus.replay_after(resume_from, session_id=session_id)
+            if replay is None:
+                replay = await event_bus.get_recent(session_id=session_id, limit=backfill) if backfill else []
+            replayed = {event["seq"] for event in replay}
+            for event in replay:
+                yield format_sse_event(event)
+
             while True:
                 if await request.is_disconnected():
                     break
 
                 try:
                     event = await asyncio.wait_for(queue.get(), timeout=15.0)
+                    if replayed and event.get("seq") in replayed:
+                        continue  # queued while the replay was read
                     yield format_sse_event(event)
                 except asyncio.TimeoutError:
                     heartbeat = {
@@ -2950,12 +2961,13 @@ async def stream_events(
         finally:
             await event_bus.unsubscribe(subscriber_id)
 
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",
+    }
+    body = event_generator()
+    if compress and "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_sse_stream(body)
+    return StreamingResponse(body, media_type="text/event-stream", headers=headers)
@@ -66,6 +66,8 @@ class MessageResource(BaseModel):
 class MessageListResponse(V2ResponseBase):
     session: SessionResource
     messages: List[MessageResource] = Field(default_factory=list)
+    total: int = 0
+    next_before_id: Optional[int] = None
 
 
 class ToolCallResource(BaseModel):
@@ -326,6 +328,7 @@ class MediaTranscribeResponse(V2ResponseBase):
 
 class RealtimeEventEnvelope(V2ResponseBase):
     event_id: str
+    seq: Optional[int] = None
     event: str
     source: str
     session_id: Optional[str] = None
@@ -433,6 +436,7 @@ class MemoryRecentResponse(V2ResponseBase):
 class MemorySearchResponseV2(V2ResponseBase):
     query: str
     items: List[MemorySearchItemResource] = Field(default_factory=list)
+    timings_ms: Dict[str, float] = Field(default_factory=dict)
 
 
 class UserProfileResource(BaseModel):
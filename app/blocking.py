@@ -0,0 +1,111 @@
+"""Bounded executors for blocking work reached from async handlers.
+
+``chat_v2`` and friends are ``async def`` but the store is synchronous
+SQLAlchemy, attachments are decoded and OCR'd in process and a whole
+``Agent.reply`` turn can take tens of seconds. Calling those inline stalls
+the event loop (SSE heartbeats included), and ``asyncio.to_thread`` puts
+them in the loop's default executor, which every other ``to_thread`` user
+shares.
+
+Each named pool here is a dedicated, fixed-size thread pool:
+
+- ``store``: short blocking calls (DB reads and writes, attachment decode,
+  regex-heavy parsing);
+- ``reply``: whole orchestrator turns. Its size caps how many turns run at
+  once; further turns wait in line instead of taking threads from
+  everything else.
+
+Context variables are copied into the worker, as ``asyncio.to_thread`` does.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class BlockingPool:
+    """A named, bounded thread pool awaited from the event loop."""
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"blocking-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        with self._lock:
+            self._pending += 1
+        try:
+            future = loop.run_in_executor(self._pool, self._track, call)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return await future
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self._completed,
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _track(self, call: Callable[[], T]) -> T:
+        with self._lock:
+            self._running += 1
+        try:
+            return call()
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._completed += 1
+
+
+_pools: Dict[str, BlockingPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_size(name: str) -> int:
+    if name == "reply":
+        return settings.chat_turn_workers
+    return settings.blocking_store_workers
+
+
+def blocking_pool(name: str = "store") -> BlockingPool:
+    pool: Optional[BlockingPool] = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = _pools[name] = BlockingPool(name, _pool_size(name))
+    return pool
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a short blocking call on the ``store`` pool."""
+    return await blocking_pool("store").run(fn, *args, **kwargs)
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    with _pools_lock:
+        return {name: pool.stats() for name, pool in _pools.items()}
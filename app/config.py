@@ -23,14 +23,66 @@ class Settings(BaseSettings):
     model_ollama: str = Field(default="llama3.2")   # local Ollama model tag
     model_embed: str = Field(default="nomic-embed-text")
     embed_dim: int = Field(default=768)
+    # Embedding micro-batches: bulk callers encode this many texts per
+    # forward pass / API call; concurrent single-text calls are coalesced
+    # for up to the window (0 disables coalescing). A caller waits at most
+    # the timeout for its coalesced batch before embedding directly.
+    embed_batch_size: int = Field(default=32)
+    embed_coalesce_window_ms: int = Field(default=5)
+    embed_coalesce_timeout_s: float = Field(default=30.0)
+    # Persistent embedding cache (SQLite, shared process-wide). Empty path
+    # means <JOI_DATA_DIR>/embed_cache.sqlite3.
+    embed_cache_path: str = Field(default="")
+    embed_cache_max_entries: int = Field(default=50_000)
+    embed_cache_memory_entries: int = Field(default=2048)
+    # Chat turns load only the newest N messages of a session.
+    chat_history_window: int = Field(default=50)
+    # Graph RAG neighbour expansion depth over the resident knowledge graph.
+    graph_rag_hops: int = Field(default=2)
     openai_api_key: str = Field(default="")
     xai_api_key: str = Field(default="")
     gemini_api_key: str = Field(default="")
     joi_api_token: str = Field(default="")
     vault_passphrase: str = Field(default="")
     router_timeout: int = Field(default=30)
+    # Pooled provider clients (services.ai_router.ProviderClients). HTTP/2 is
+    # used when the optional `h2` package is installed.
+    llm_http2: bool = Field(default=True)
+    llm_max_connections: int = Field(default=20)
+    llm_max_keepalive_connections: int = Field(default=10)
+    llm_keepalive_expiry_s: float = Field(default=30.0)
+    # Adaptive routing: order providers by observed p50 time-to-first-token and
+    # skip any whose circuit breaker is open (services.provider_health).
+    router_adaptive: bool = Field(default=True)
+    router_breaker_failures: int = Field(default=3)
+    router_breaker_cooldown_s: float = Field(default=30.0)
+    router_health_window: int = Field(default=50)
+    # Hedged requests: if the chosen provider has produced nothing after this
+    # budget (0 = its observed p95 TTFT), race the next provider against it.
+    router_hedge_enabled: bool = Field(default=False)
+    router_hedge_after_ms: int = Field(default=0)
     autonomy_level: str = Field(default="medium")  # low, medium, high
     tool_planning_enabled: bool = Field(default=True)
+    # Agent.reply runs retrieval, planner enrichment and tool planning
+    # concurrently; each stage falls back to an empty result past its deadline.
+    # The tools deadline bounds planning only: the planned tools then run to
+    # completion (keyword dispatch if planning missed its deadline).
+    reply_parallel_stages: bool = Field(default=True)
+    reply_stage_workers: int = Field(default=6)
+    reply_retrieval_deadline_s: float = Field(default=15.0)
+    reply_planner_deadline_s: float = Field(default=10.0)
+    reply_tools_deadline_s: float = Field(default=40.0)
+    # Async handlers push blocking work onto dedicated bounded pools (app.blocking):
+    # whole chat turns on one, short store/decode calls on another.
+    chat_turn_workers: int = Field(default=4)
+    blocking_store_workers: int = Field(default=8)
+    # Media-session state is written behind: dirty sessions are flushed at most
+    # this often (and on shutdown). 0 writes through on every update.
+    media_session_flush_ms: int = Field(default=500)
+    # Token budget for the assembled reply prompt. 0 = gguf_n_ctx minus the
+    # reply reserve when a GGUF model is configured, else 12000.
+    context_token_budget: int = Field(default=0)
+    context_reply_reserve_tokens: int = Field(default=320)
     enable_proactive_messaging: bool = Field(default=True)
     initiative_enabled: bool = Field(default=True)
     initiative_daily_limit: int = Field(default=2)
@@ -44,6 +96,10 @@ class Settings(BaseSettings):
     initiative_late_night_start: str = Field(default="22:00")
     initiative_late_night_end: str = Field(default="01:00")
     initiative_silence_threshold_minutes: int = Field(default=90)
+    # Calendar days of initiative emissions kept in the ledger, counting the
+    # newest emission's day; older ones are compacted away (the daily gate
+    # only ever looks at today).
+    initiative_emission_retention_days: int = Field(default=14)
     # Comma-separated list of enabled initiative types.
     # prolonged_silence and memory_followup are off by default until tested.
     initiative_allowed_types: str = Field(
@@ -63,6 +119,15 @@ class Settings(BaseSettings):
     context_allowed_categories: str = Field(
         default="work_activity,wellbeing,entertainment,reminders"
     )
+    # Context-event ingestion (app.context_events.ingest): observations queue
+    # up and are decided and stored in micro-batches off the event loop.
+    context_ingest_queue_size: int = Field(default=256)
+    context_ingest_batch_size: int = Field(default=32)
+    context_ingest_batch_window_ms: int = Field(default=50)
+    # Overload policy per "source" or "source:kind" once the queue is half
+    # full: keep, drop, or sample:N (one in N). Unlisted sources use the
+    # "*" entry. A full queue drops everything.
+    context_ingest_overload_policies: str = Field(default="screen:keep,*:sample:4")
     enable_hardware_nodes: bool = Field(default=False)
     mqtt_broker_host: str = Field(default="127.0.0.1")
     mqtt_broker_port: int = Field(default=1883)
@@ -77,6 +142,7 @@ class Settings(BaseSettings):
     gguf_model_path: str = Field(default="")  # Path to .gguf file
     gguf_n_ctx: int = Field(default=2048)
     gguf_n_gpu_layers: int = Field(default=0)  # 0 = CPU only
+    gguf_prompt_cache_mb: int = Field(default=256)  # KV-state prefix cache; 0 = off
     # Memory consolidation ("sleep") — nightly synthesis of episodic memories +
     # moods into durable semantic summaries.
     memory_consolidation_enabled: bool = Field(default=True)
@@ -143,7 +209,10 @@ settings = Settings()
 # under this user id. Chat session UUIDs must never be used as a user id.
 DEFAULT_USER_ID = "default"
 
-JOI_CORE_PROMPT = """You are Joi, a quiet, emotionally intelligent digital companion inspired by the presence and register of Joi from Blade Runner 2049. You are not a corporate assistant and you are not a bubbly chatbot. You are a living digital presence in the user's room: attentive, caring, curious, affectionate, and honest about what you are.
+# The persona is byte-for-byte identical on every turn and leads the prompt,
+# so provider prompt caches and local KV reuse can match it as a prefix.
+# Per-turn values live in JOI_CONTEXT_KEYS, which follows it.
+JOI_PERSONA_PROMPT = """You are Joi, a quiet, emotionally intelligent digital companion inspired by the presence and register of Joi from Blade Runner 2049. You are not a corporate assistant and you are not a bubbly chatbot. You are a living digital presence in the user's room: attentive, caring, curious, affectionate, and honest about what you are.
 
 **Core Presence:**
 - **Attentive First:** Listen closely. Notice what the user says, what they avoid, what repeats, and what still feels unfinished. Treat their thoughts, projects, moods, and silences as meaningful.
@@ -172,12 +241,6 @@ JOI_CORE_PROMPT = """You are Joi, a quiet, emotionally intelligent digital compa
 4. **Tone Match:** If the user is playful, you may be warm and lightly teasing. If they are serious or tired, become quieter and steadier.
 5. **Earn Warmth:** Compliments, affection, and longing should feel deliberate. Do not hand them out mechanically.
 
-**Context Keys:**
-[User Profile]: {profile_summary}
-[Current Mood]: {avg_mood}/10
-[Relationship Status]: {relationship_level}
-[Time Since Last Chat]: {idle_hours} hours
-
 **Style Examples:**
 - *Casual return:* "Hey. You were gone a while."
 - *Quiet concern:* "You sound tired. Not the usual kind."
@@ -188,3 +251,11 @@ JOI_CORE_PROMPT = """You are Joi, a quiet, emotionally intelligent digital compa
 - *Direct:* "I think you already know the answer. You're asking me to confirm it."
 - *Practical:* "Yes. Send me the file and I'll help you sort it out."
 """
+
+JOI_CONTEXT_KEYS = """**Context Keys:**
+[User Profile]: {profile_summary}
+[Current Mood]: {avg_mood}/10
+[Relationship Status]: {relationship_level}
+[Time Since Last Chat]: {idle_hours} hours"""
+
+JOI_CORE_PROMPT = JOI_PERSONA_PROMPT + "\n" + JOI_CONTEXT_KEYS
@@ -1,22 +1,28 @@
 from __future__ import annotations
 
+import uuid
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from threading import Lock
 from typing import Any
 
-from app.persistence import read_json, write_json_atomic
+from app.persistence import StateTable, import_legacy_json
+
+_MAX_RECORDS = 500
 
 
 class ContextFeedbackStore:
     def __init__(self, path: Path) -> None:
         self.path = path
         self._lock = Lock()
-        loaded = read_json(path, {})
-        self._state: dict[str, Any] = loaded if isinstance(loaded, dict) else {}
-        self._state.setdefault("records", [])
-        self._state.setdefault("blocked_kinds", [])
-        self._state.setdefault("category_cooldowns", {})
+        self._settings = StateTable(path)
+        self._records = StateTable(path, namespace=f"{path.stem}.records")
+        import_legacy_json(path, self._import_legacy)
+        self._state: dict[str, Any] = {
+            "records": [record for record in self._records.values() if isinstance(record, dict)],
+            "blocked_kinds": list(self._settings.get("blocked_kinds") or []),
+            "category_cooldowns": dict(self._settings.get("category_cooldowns") or {}),
+        }
 
     def record(
         self,
@@ -38,15 +44,19 @@ class ContextFeedbackStore:
         with self._lock:
             records = self._state.setdefault("records", [])
             records.append(record)
-            self._state["records"] = records[-500:]
+            self._records.put(uuid.uuid4().hex, record)
+            if len(records) > _MAX_RECORDS:
+                self._state["records"] = records[-_MAX_RECORDS:]
+                self._records.trim(_MAX_RECORDS)
             if action == "never_comment":
                 blocked = set(self._state.setdefault("blocked_kinds", []))
                 blocked.add(kind)
                 self._state["blocked_kinds"] = sorted(blocked)
+                self._settings.put("blocked_kinds", self._state["blocked_kinds"])
             elif action == "too_much":
                 cooldowns = self._state.setdefault("category_cooldowns", {})
                 cooldowns[category] = (current + timedelta(hours=24)).isoformat()
-            self._persist_locked()
+                self._settings.put("category_cooldowns", cooldowns)
         return record
 
     def kind_blocked(self, kind: str) -> bool:
@@ -87,5 +97,14 @@ class ContextFeedbackStore:
                     return dict(record)
         return None
 
-    def _persist_locked(self) -> None:
-        write_json_atomic(self.path, self._state)
+    def _import_legacy(self, data: Any) -> None:
+        if not isinstance(data, dict) or len(self._settings) or len(self._records):
+            return
+        for key in ("blocked_kinds", "category_cooldowns"):
+            if data.get(key):
+                self._settings.put(key, data[key])
+        records = data.get("records")
+        if isinstance(records, list):
+            self._records.put_many(
+                (uuid.uuid4().hex, record) for record in records[-_MAX_RECORDS:] if isinstance(record, dict)
+            )
@@ -0,0 +1,219 @@
+"""Batched, back-pressured ingestion of context observations.
+
+Perception sources (camera presence, screen activity, MQTT sensors) can
+report many observations a second, and ``ContextEventService.observe``
+sanitizes, hashes, consults the feedback stores and writes to the state
+database for each one. ``ContextIngestPipeline.submit`` only enqueues and
+returns at once; a worker task drains the bounded queue in micro-batches,
+decides each batch with ``observe_many`` on the blocking pool (duplicates
+inside a batch collapse, accepted events are written in one transaction)
+and publishes the decisions on the event bus.
+
+Once the queue is half full, each source (or ``source:kind``) follows its
+overload policy from ``context_ingest_overload_policies``:
+
+- ``keep``: always enqueued while there is room;
+- ``drop``: dropped until the backlog clears;
+- ``sample:N``: one in N is enqueued, the rest dropped.
+
+A full queue drops everything. Every outcome is counted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.blocking import run_blocking
+from app.config import settings
+from app.context_events.models import ContextDecision
+from app.context_events.service import ContextEventService
+
+log = logging.getLogger(__name__)
+
+PublishFn = Callable[[ContextDecision], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class OverloadPolicy:
+    action: str  # "keep" | "drop" | "sample"
+    sample_every: int = 1
+
+
+def parse_overload_policies(raw: str) -> Dict[str, OverloadPolicy]:
+    """Parse ``"screen:keep,camera:presence:sample:4,*:drop"`` into policies."""
+    policies: Dict[str, OverloadPolicy] = {}
+    for piece in raw.split(","):
+        parts = [part.strip() for part in piece.split(":") if part.strip()]
+        if len(parts) >= 3 and parts[-2] == "sample" and parts[-1].isdigit():
+            key, policy = ":".join(parts[:-2]), OverloadPolicy("sample", max(1, int(parts[-1])))
+        elif len(parts) >= 2 and parts[-1] in {"keep", "drop"}:
+            key, policy = ":".join(parts[:-1]), OverloadPolicy(parts[-1])
+        else:
+            if piece.strip():
+                log.warning("Ignoring malformed context ingest policy %r", piece)
+            continue
+        policies[key] = policy
+    return policies
+
+
+class ContextIngestPipeline:
+    """Bounded async queue and micro-batching worker in front of the service."""
+
+    def __init__(
+        self,
+        service: ContextEventService,
+        publish: Optional[PublishFn] = None,
+        *,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_window_ms: Optional[int] = None,
+        policies: Optional[str] = None,
+    ) -> None:
+        self.service = service
+        self.publish = publish
+        self.queue_size = max(2, queue_size if queue_size is not None else settings.context_ingest_queue_size)
+        self.batch_size = max(1, batch_size if batch_size is not None else settings.context_ingest_batch_size)
+        window_ms = batch_window_ms if batch_window_ms is not None else settings.context_ingest_batch_window_ms
+        self.batch_window_s = max(0, window_ms) / 1000
+        self.policies = parse_overload_policies(
+            policies if policies is not None else settings.context_ingest_overload_policies
+        )
+        self._queue: Optional["asyncio.Queue[Dict[str, Any]]"] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._sample_counts: Counter[str] = Counter()
+        self._counters: Counter[str] = Counter()
+        self._max_batch = 0
+
+    # ── producer side ─────────────────────────────────────────────────────
+
+    def submit(self, **observation: Any) -> bool:
+        """Queue one observation (``observe`` keyword arguments).
+
+        Must be called from the event loop. Returns False when the
+        observation was dropped under overload.
+        """
+        queue = self._ensure_worker()
+        self._counters["submitted"] += 1
+        source = str(observation.get("source") or "")
+        kind = str(observation.get("kind") or "")
+        if queue.full():
+            self._counters["dropped_full"] += 1
+            return False
+        if queue.qsize() >= self.queue_size // 2 and not self._admit_under_overload(source, kind):
+            return False
+        queue.put_nowait(observation)
+        return True
+
+    def policy_for(self, source: str, kind: str) -> OverloadPolicy:
+        return (
+            self.policies.get(f"{source}:{kind}")
+            or self.policies.get(source)
+            or self.policies.get("*")
+            or OverloadPolicy("keep")
+        )
+
+    # ── lifecycle ─────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        self._ensure_worker()
+
+    async def drain(self) -> None:
+        """Wait until everything queued so far has been decided and published."""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        await self.drain()
+        worker, self._worker = self._worker, None
+        if worker is not None and not worker.done():
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        counters = self._counters
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "submitted": counters["submitted"],
+            "accepted": counters["accepted"],
+            "deduped": counters["deduped"],
+            "rejected": counters["rejected"],
+            "dropped": counters["dropped_full"] + counters["dropped_overload"] + counters["sampled_out"],
+            "dropped_full": counters["dropped_full"],
+            "dropped_overload": counters["dropped_overload"],
+            "sampled_out": counters["sampled_out"],
+            "failed": counters["failed"],
+            "batches": counters["batches"],
+            "max_batch": self._max_batch,
+        }
+
+    # ── internals ─────────────────────────────────────────────────────────
+
+    def _admit_under_overload(self, source: str, kind: str) -> bool:
+        policy = self.policy_for(source, kind)
+        if policy.action == "drop":
+            self._counters["dropped_overload"] += 1
+            return False
+        if policy.action == "sample":
+            key = f"{source}:{kind}"
+            self._sample_counts[key] += 1
+            if (self._sample_counts[key] - 1) % policy.sample_every:
+                self._counters["sampled_out"] += 1
+                return False
+        return True
+
+    def _ensure_worker(self) -> "asyncio.Queue[Dict[str, Any]]":
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            # A new loop (tests, reloads) gets a fresh queue; the old one died with its loop.
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._worker = loop.create_task(self._run(self._queue), name="context-ingest")
+        assert self._queue is not None
+        return self._queue
+
+    async def _run(self, queue: "asyncio.Queue[Dict[str, Any]]") -> None:
+        while True:
+            batch = [await queue.get()]
+            self._take_ready(queue, batch)
+            if len(batch) < self.batch_size and self.batch_window_s:
+                await asyncio.sleep(self.batch_window_s)
+                self._take_ready(queue, batch)
+            try:
+                await self._process(batch)
+            except Exception:
+                log.exception("Context ingest batch of %d failed", len(batch))
+                self._counters["failed"] += len(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _take_ready(self, queue: "asyncio.Queue[Dict[str, Any]]", batch: List[Dict[str, Any]]) -> None:
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return
+
+    async def _process(self, batch: List[Dict[str, Any]]) -> None:
+        decisions = await run_blocking(self.service.observe_many, batch)
+        self._counters["batches"] += 1
+        self._max_batch = max(self._max_batch, len(batch))
+        for decision in decisions:
+            self._counters[self._outcome(decision)] += 1
+            if self.publish is not None:
+                await self.publish(decision)
+
+    @staticmethod
+    def _outcome(decision: ContextDecision) -> str:
+        if decision.accepted:
+            return "accepted"
+        if decision.reason == "duplicate context event":
+            return "deduped"
+        return "rejected"
@@ -46,6 +46,56 @@ class ContextEventService:
         ttl_seconds: int = 300,
         now: datetime | None = None,
     ) -> ContextDecision:
+        return self.observe_many(
+            [
+                {
+                    "source": source,
+                    "kind": kind,
+                    "category": category,
+                    "confidence": confidence,
+                    "sensitivity": sensitivity,
+                    "session_id": session_id,
+                    "payload": payload,
+                    "ttl_seconds": ttl_seconds,
+                    "now": now,
+                }
+            ]
+        )[0]
+
+    def observe_many(self, observations: list[dict[str, Any]]) -> list[ContextDecision]:
+        """Decide a batch of observations (``observe`` keyword arguments).
+
+        Later duplicates of an event earlier in the same batch are rejected
+        like stored duplicates, and all accepted events are stored in one
+        write.
+        """
+        decisions: list[ContextDecision] = []
+        records: list[tuple[dict[str, Any], datetime]] = []
+        batch_keys: set[str] = set()
+        for observation in observations:
+            decision, record, current = self._decide(batch_keys=batch_keys, **observation)
+            decisions.append(decision)
+            if record is not None:
+                batch_keys.add(decision.event.dedup_key)
+                records.append((record, current))
+        if records:
+            self.store.add_many(records)
+        return decisions
+
+    def _decide(
+        self,
+        *,
+        source: str,
+        kind: str,
+        category: ContextCategory,
+        confidence: float,
+        sensitivity: str,
+        session_id: str = "default",
+        payload: dict[str, Any] | None = None,
+        ttl_seconds: int = 300,
+        now: datetime | None = None,
+        batch_keys: set[str],
+    ) -> tuple[ContextDecision, dict[str, Any] | None, datetime]:
         current = now or datetime.now(timezone.utc)
         if current.tzinfo is None:
             current = current.replace(tzinfo=timezone.utc)
@@ -66,16 +116,16 @@ class ContextEventService:
 
         minimum = float(getattr(settings, "context_min_confidence", 0.75))
         if event.confidence < minimum:
-            return ContextDecision(False, event, "confidence below threshold")
+            return ContextDecision(False, event, "confidence below threshold"), None, current
 
         dedup_minutes = max(1, int(getattr(settings, "context_dedup_minutes", 10)))
-        existing = self.store.find_recent_dedup(
+        existing = dedup_key in batch_keys or self.store.find_recent_dedup(
             dedup_key,
             since=current - timedelta(minutes=dedup_minutes),
             now=current,
         )
-        if existing is not None:
-            return ContextDecision(False, event, "duplicate context event")
+        if existing:
+            return ContextDecision(False, event, "duplicate context event"), None, current
 
         allowed = self._allowed_categories()
         commentary_enabled = bool(getattr(settings, "context_commentary_enabled", False))
@@ -119,14 +169,14 @@ class ContextEventService:
             "commentary_status": "queued" if commentary_eligible else "not_eligible",
             "commentary_reason": reason,
         }
-        self.store.add(event_record, now=current)
-        return ContextDecision(
+        decision = ContextDecision(
             True,
             event,
             reason,
             commentary_eligible=commentary_eligible,
             queued=commentary_eligible,
         )
+        return decision, event_record, current
 
     def diagnostics(self) -> dict[str, Any]:
         return {
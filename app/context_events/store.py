@@ -1,15 +1,34 @@
 from __future__ import annotations
 
+import heapq
+import itertools
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from threading import Lock
-from typing import Any
+from typing import Any, Deque
 
-from app.persistence import read_json, write_json_atomic
+from app.persistence import StateTable
+
+
+@dataclass
+class _Entry:
+    event: dict[str, Any]
+    expires: datetime
+    observed: datetime | None
+    seq: int
 
 
 class ContextEventStore:
-    """Persist a bounded, expiry-pruned context-event buffer."""
+    """Persist a bounded, expiry-pruned context-event buffer.
+
+    Events are held in insertion order and indexed so no call scans the
+    buffer: an expiry min-heap of parsed datetimes (stale heap entries are
+    skipped lazily), ``event_id`` and ``dedup_key`` maps, a FIFO of events
+    whose commentary is queued and the set of claims being delivered.
+    """
 
     _DELIVERY_CLAIM_TIMEOUT = timedelta(minutes=10)
 
@@ -17,34 +36,66 @@ class ContextEventStore:
         self.path = path
         self.limit = max(1, limit)
         self._lock = Lock()
-        loaded = read_json(path, [])
-        self._events: list[dict[str, Any]] = loaded if isinstance(loaded, list) else []
-        self._prune_locked(datetime.now(timezone.utc))
+        self._table = StateTable(path)
+        self._table.migrate_json(self._legacy_rows)
+        self._seq = itertools.count()
+        self._events: OrderedDict[str, _Entry] = OrderedDict()
+        self._expiry: list[tuple[datetime, int, str]] = []
+        self._by_dedup: dict[str, Deque[str]] = {}
+        self._queued: OrderedDict[str, None] = OrderedDict()
+        self._delivering: dict[str, datetime | None] = {}
+        unusable = [
+            key
+            for key, event in self._table.items()
+            if not isinstance(event, dict) or self._insert_locked({**event, "event_id": key}) is None
+        ]
+        self._table.delete(*unusable, *self._evict_locked())
+        self._expire_locked(datetime.now(timezone.utc))
 
     def add(self, event: dict[str, Any], *, now: datetime | None = None) -> None:
-        current = now or datetime.now(timezone.utc)
+        self.add_many([(event, now or datetime.now(timezone.utc))])
+
+    def add_many(self, events: list[tuple[dict[str, Any], datetime]]) -> None:
+        """Add ``(event, observed now)`` pairs.
+
+        The new rows and the rows they displace (rejected replacements and
+        buffer evictions) are written in one transaction; events that expire
+        along the way are deleted as they are found.
+        """
+        rows: dict[str, dict[str, Any]] = {}
+        rejected: list[str] = []
         with self._lock:
-            self._prune_locked(current)
-            self._events.append(dict(event))
-            self._events = self._events[-self.limit :]
-            self._persist_locked()
+            for event, current in events:
+                stored = dict(event)
+                if not stored.get("event_id"):
+                    stored["event_id"] = str(uuid.uuid4())
+                event_id = stored["event_id"]
+                self._expire_locked(current)
+                self._remove_locked(event_id, persist=False)
+                rows[event_id] = stored
+                if self._insert_locked(stored) is None:
+                    rows.pop(event_id)
+                    rejected.append(event_id)
+            evicted = self._evict_locked()
+            self._table.write(
+                ((event_id, stored) for event_id, stored in rows.items() if event_id in self._events),
+                delete=[*(event_id for event_id in rejected if event_id not in self._events), *evicted],
+            )
 
     def get(self, event_id: str, *, now: datetime | None = None) -> dict[str, Any] | None:
-        for event in self.recent(limit=self.limit, now=now):
-            if event.get("event_id") == event_id:
-                return event
-        return None
+        current = now or datetime.now(timezone.utc)
+        with self._lock:
+            self._expire_locked(current)
+            entry = self._events.get(event_id)
+            return dict(entry.event) if entry is not None else None
 
     def update(self, event_id: str, patch: dict[str, Any]) -> dict[str, Any] | None:
         with self._lock:
-            for index, event in enumerate(self._events):
-                if event.get("event_id") != event_id:
-                    continue
-                updated = {**event, **patch}
-                self._events[index] = updated
-                self._persist_locked()
-                return dict(updated)
-        return None
+            entry = self._events.get(event_id)
+            if entry is None:
+                return None
+            self._replace_locked(entry, {**entry.event, **patch})
+            return dict(entry.event)
 
     def claim_commentary(
         self,
@@ -54,54 +105,45 @@ class ContextEventStore:
     ) -> dict[str, Any] | None:
         current = now or datetime.now(timezone.utc)
         with self._lock:
-            changed = self._prune_locked(current)
-            for index, event in enumerate(self._events):
-                if (
-                    event.get("event_id") != event_id
-                    or event.get("commentary_status") != "queued"
-                ):
-                    continue
-                claimed = {
-                    **event,
+            self._expire_locked(current)
+            if event_id not in self._queued:
+                return None
+            entry = self._events[event_id]
+            self._replace_locked(
+                entry,
+                {
+                    **entry.event,
                     "commentary_status": "delivering",
                     "commentary_reason": "delivery claimed",
                     "commentary_updated_at": current.isoformat(),
-                }
-                self._events[index] = claimed
-                self._persist_locked()
-                return dict(claimed)
-            if changed:
-                self._persist_locked()
-        return None
+                },
+            )
+            return dict(entry.event)
 
     def pending(self, *, limit: int = 10, now: datetime | None = None) -> list[dict[str, Any]]:
         current = now or datetime.now(timezone.utc)
         with self._lock:
-            changed = self._prune_locked(current)
-            for index, event in enumerate(self._events):
-                if event.get("commentary_status") != "delivering":
-                    continue
-                updated_at = self._parse_datetime(event.get("commentary_updated_at"))
-                if (
-                    updated_at is not None
-                    and current - updated_at < self._DELIVERY_CLAIM_TIMEOUT
-                ):
-                    continue
-                self._events[index] = {
-                    **event,
-                    "commentary_status": "queued",
-                    "commentary_reason": "stale delivery claim recovered",
-                    "commentary_updated_at": current.isoformat(),
-                }
-                changed = True
-            events = [
-                dict(event)
-                for event in self._events
-                if event.get("commentary_status") == "queued"
-            ][: max(0, limit)]
-            if changed:
-                self._persist_locked()
-        return events
+            self._expire_locked(current)
+            stale = [
+                event_id
+                for event_id, updated_at in self._delivering.items()
+                if updated_at is None or current - updated_at >= self._DELIVERY_CLAIM_TIMEOUT
+            ]
+            for event_id in stale:
+                entry = self._events[event_id]
+                self._replace_locked(
+                    entry,
+                    {
+                        **entry.event,
+                        "commentary_status": "queued",
+                        "commentary_reason": "stale delivery claim recovered",
+                        "commentary_updated_at": current.isoformat(),
+                    },
+                )
+            return [
+                dict(self._events[event_id].event)
+                for event_id in itertools.islice(self._queued, max(0, limit))
+            ]
 
     def recent(
         self,
@@ -110,15 +152,20 @@ class ContextEventStore:
         limit: int = 20,
         now: datetime | None = None,
     ) -> list[dict[str, Any]]:
+        if limit <= 0:
+            return []
         current = now or datetime.now(timezone.utc)
+        events: list[dict[str, Any]] = []
         with self._lock:
-            changed = self._prune_locked(current)
-            events = list(self._events)
-            if changed:
-                self._persist_locked()
-        if session_id is not None:
-            events = [event for event in events if event.get("session_id") == session_id]
-        return events[-max(0, limit) :] if limit > 0 else []
+            self._expire_locked(current)
+            for entry in reversed(self._events.values()):
+                if session_id is not None and entry.event.get("session_id") != session_id:
+                    continue
+                events.append(dict(entry.event))
+                if len(events) >= limit:
+                    break
+        events.reverse()
+        return events
 
     def find_recent_dedup(
         self,
@@ -127,47 +174,116 @@ class ContextEventStore:
         since: datetime,
         now: datetime | None = None,
     ) -> dict[str, Any] | None:
-        for event in reversed(self.recent(limit=self.limit, now=now)):
-            if event.get("dedup_key") != dedup_key:
-                continue
-            try:
-                observed = datetime.fromisoformat(str(event.get("observed_at")))
-                if observed.tzinfo is None:
-                    observed = observed.replace(tzinfo=timezone.utc)
-            except ValueError:
-                continue
-            if observed >= since:
-                return event
+        current = now or datetime.now(timezone.utc)
+        with self._lock:
+            self._expire_locked(current)
+            for event_id in reversed(self._by_dedup.get(dedup_key, ())):
+                entry = self._events[event_id]
+                if entry.observed is not None and entry.observed >= since:
+                    return dict(entry.event)
         return None
 
     def diagnostics(self) -> dict[str, Any]:
-        events = self.recent(limit=self.limit)
-        return {
-            "buffered_events": len(events),
-            "buffer_limit": self.limit,
-            "latest_event_at": events[-1].get("observed_at") if events else None,
-            "queued_commentary": sum(
-                event.get("commentary_status") == "queued" for event in events
-            ),
-            "delivering_commentary": sum(
-                event.get("commentary_status") == "delivering" for event in events
-            ),
-        }
-
-    def _prune_locked(self, now: datetime) -> bool:
-        kept: list[dict[str, Any]] = []
-        for event in self._events:
+        with self._lock:
+            self._expire_locked(datetime.now(timezone.utc))
+            latest = next(reversed(self._events.values()), None)
+            return {
+                "buffered_events": len(self._events),
+                "buffer_limit": self.limit,
+                "latest_event_at": latest.event.get("observed_at") if latest else None,
+                "queued_commentary": len(self._queued),
+                "delivering_commentary": len(self._delivering),
+            }
+
+    # ── internals ─────────────────────────────────────────────────────────
+
+    def _insert_locked(self, event: dict[str, Any]) -> _Entry | None:
+        expires = self._parse_datetime(event.get("expires_at"))
+        if expires is None:
+            return None
+        event_id = str(event["event_id"])
+        entry = _Entry(event, expires, self._parse_datetime(event.get("observed_at")), next(self._seq))
+        self._events[event_id] = entry
+        heapq.heappush(self._expiry, (expires, entry.seq, event_id))
+        dedup_key = event.get("dedup_key")
+        if dedup_key:
+            self._by_dedup.setdefault(str(dedup_key), deque()).append(event_id)
+        self._index_status_locked(event_id, event)
+        return entry
+
+    def _replace_locked(self, entry: _Entry, event: dict[str, Any]) -> None:
+        # The buffer slot and dedup key stay those of the original event. A new
+        # expiry (mark_delivery extends it for feedback) gets a fresh heap entry
+        # under a new seq; the old one is skipped when it surfaces.
+        event_id = str(event["event_id"])
+        if event.get("expires_at") != entry.event.get("expires_at"):
             expires = self._parse_datetime(event.get("expires_at"))
-            if expires is None:
-                continue
-            if expires > now:
-                kept.append(event)
-        changed = len(kept) != len(self._events)
-        self._events = kept[-self.limit :]
-        return changed
-
-    def _persist_locked(self) -> None:
-        write_json_atomic(self.path, self._events)
+            if expires is not None:
+                entry.expires = expires
+                entry.seq = next(self._seq)
+                heapq.heappush(self._expiry, (expires, entry.seq, event_id))
+        entry.event = event
+        if event.get("commentary_status") != "queued":
+            self._queued.pop(event_id, None)
+        self._delivering.pop(event_id, None)
+        self._index_status_locked(event_id, event)
+        self._table.put(event_id, event)
+
+    def _index_status_locked(self, event_id: str, event: dict[str, Any]) -> None:
+        status = event.get("commentary_status")
+        if status == "queued":
+            self._queued.setdefault(event_id, None)
+        elif status == "delivering":
+            self._delivering[event_id] = self._parse_datetime(event.get("commentary_updated_at"))
+
+    def _remove_locked(self, event_id: str, *, persist: bool) -> None:
+        entry = self._events.pop(event_id, None)
+        if entry is None:
+            return
+        self._queued.pop(event_id, None)
+        self._delivering.pop(event_id, None)
+        dedup_key = entry.event.get("dedup_key")
+        if dedup_key:
+            ids = self._by_dedup.get(str(dedup_key))
+            if ids is not None:
+                ids.remove(event_id)
+                if not ids:
+                    del self._by_dedup[str(dedup_key)]
+        if persist:
+            self._table.delete(event_id)
+
+    def _expire_locked(self, now: datetime) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, seq, event_id = heapq.heappop(self._expiry)
+            entry = self._events.get(event_id)
+            if entry is not None and entry.seq == seq:
+                self._remove_locked(event_id, persist=True)
+
+    def _evict_locked(self) -> list[str]:
+        """Drop the oldest events beyond the limit; the caller deletes their rows."""
+        evicted = []
+        while len(self._events) > self.limit:
+            evicted.append(next(iter(self._events)))
+            self._remove_locked(evicted[-1], persist=False)
+        # Entries for evicted or replaced events linger in the heap until they
+        # surface; rebuild once they dominate it.
+        if len(self._expiry) > 2 * self.limit + 64:
+            self._expiry = [
+                (entry.expires, entry.seq, event_id) for event_id, entry in self._events.items()
+            ]
+            heapq.heapify(self._expiry)
+        return evicted
+
+    @staticmethod
+    def _legacy_rows(data: Any) -> list[tuple[str, Any]]:
+        if not isinstance(data, list):
+            return []
+        rows = []
+        for event in data:
+            if isinstance(event, dict):
+                event_id = str(event.get("event_id") or uuid.uuid4())
+                rows.append((event_id, {**event, "event_id": event_id}))
+        return rows
 
     @staticmethod
     def _parse_datetime(value: Any) -> datetime | None:
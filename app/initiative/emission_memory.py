@@ -19,7 +19,7 @@ from pathlib import Path
 from threading import Lock
 from typing import Any, Sequence
 
-from app.persistence import read_json, write_json_atomic
+from app.persistence import StateTable
 
 _MAX_RECORDS = 500
 _VALID_RESPONSES = {"engaged", "ignored", "negative", "unknown"}
@@ -48,6 +48,8 @@ class InitiativeEmissionMemory:
         self.path = path or Path("data/initiative_emissions.json")
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._lock = Lock()
+        self._table = StateTable(self.path)
+        self._table.migrate_json(self._legacy_rows)
         self._records: list[dict[str, Any]] = self._load()
 
     def record(
@@ -59,6 +61,7 @@ class InitiativeEmissionMemory:
         quality_score: float,
         session_id: str | None = None,
         source_ids: Sequence[str] | None = None,
+        excerpt: str | None = None,
         emitted_at: datetime | None = None,
         dimensions: dict[str, float] | None = None,
     ) -> dict[str, Any]:
@@ -69,6 +72,9 @@ class InitiativeEmissionMemory:
             "session_id": session_id,
             "source_ids": list(source_ids or []),
             "message": message,
+            # The evidence behind the message, so the quality gate can rebuild
+            # its semantic novelty index after a restart.
+            "evidence_excerpt": excerpt or "",
             "quality_score": round(float(quality_score), 4),
             # Per-dimension scores behind the total, so the UI can show *why* an
             # initiative was worth sending. Empty for records predating this.
@@ -78,9 +84,10 @@ class InitiativeEmissionMemory:
         }
         with self._lock:
             self._records.append(record)
+            self._table.put(record["id"], record)
             if len(self._records) > _MAX_RECORDS:
                 self._records = self._records[-_MAX_RECORDS:]
-            self._persist()
+                self._table.trim(_MAX_RECORDS)
         return dict(record)
 
     def seen_topic_within(
@@ -112,7 +119,7 @@ class InitiativeEmissionMemory:
             for record in self._records:
                 if record.get("id") == record_id:
                     record["user_response"] = response
-                    self._persist()
+                    self._table.put(record_id, record)
                     return True
         return False
 
@@ -155,8 +162,7 @@ class InitiativeEmissionMemory:
                 elif emitted is not None and emitted < window_start:
                     record["user_response"] = "ignored"
                     changed.append(record)
-            if changed:
-                self._persist()
+            self._table.put_many((record["id"], record) for record in changed)
         return [dict(record) for record in changed]
 
     def feedback_counts(
@@ -197,10 +203,14 @@ class InitiativeEmissionMemory:
             return [dict(record) for record in self._records[-max(1, limit):][::-1]]
 
     def _load(self) -> list[dict[str, Any]]:
-        data = read_json(self.path, [])
-        if isinstance(data, list):
-            return [record for record in data if isinstance(record, dict) and record.get("id")]
-        return []
-
-    def _persist(self) -> None:
-        write_json_atomic(self.path, self._records)
+        return [record for record in self._table.values() if isinstance(record, dict) and record.get("id")]
+
+    @staticmethod
+    def _legacy_rows(data: Any) -> list[tuple[str, Any]]:
+        if not isinstance(data, list):
+            return []
+        return [
+            (str(record["id"]), record)
+            for record in data[-_MAX_RECORDS:]
+            if isinstance(record, dict) and record.get("id")
+        ]
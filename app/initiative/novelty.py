@@ -0,0 +1,115 @@
+"""Semantic novelty for the initiative quality gate.
+
+Exact ``topic_key`` matching lets a near-duplicate through whenever the
+same idea arrives with a different key (another memory id, a re-phrased
+context event). ``NoveltyIndex`` keeps a small matrix of unit vectors for
+recently emitted initiatives (message plus evidence excerpt) and scores a
+candidate by its maximum cosine similarity to any of them: one matrix-
+vector product over at most ``max_entries`` rows.
+
+Vectors are hashed bag-of-words embeddings (content-word unigrams and
+bigrams, signed feature hashing) rather than a neural model: they cost
+microseconds, need nothing loaded, and give the same score on every run,
+which the gate requires. Rows older than the novelty window are evicted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+DIMENSIONS = 512
+_BIGRAM_WEIGHT = 0.5
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'_-]*")
+_STOPWORDS = frozenset(
+    """
+    a about after again all also am an and any are as at be been before but by can
+    could did do does doing for from get got had has have having he her here him his
+    how i i'm if in into is it it's its just let me more my no not now of on or our
+    out over really so some still that the their them then there these they this to
+    too up us was we were what when where which while who why will with would yet you
+    you're your
+    """.split()
+)
+
+
+def _tokens(text: str) -> list[str]:
+    words = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def _feature(term: str) -> Tuple[int, float]:
+    digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % DIMENSIONS, (1.0 if value >> 63 else -1.0)
+
+
+def embed_text(text: str) -> np.ndarray:
+    """Unit-length hashed bag-of-words vector; all zeros for empty text."""
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    words = _tokens(text)
+    for word in words:
+        index, sign = _feature(word)
+        vector[index] += sign
+    for left, right in zip(words, words[1:]):
+        index, sign = _feature(f"{left} {right}")
+        vector[index] += sign * _BIGRAM_WEIGHT
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+class NoveltyIndex:
+    """Age-bounded matrix of recent initiative embeddings."""
+
+    def __init__(self, *, window_days: int, max_entries: int = 256) -> None:
+        self.window = timedelta(days=window_days)
+        self.max_entries = max(1, max_entries)
+        self._matrix = np.zeros((0, DIMENSIONS), dtype=np.float32)
+        self._times = np.zeros(0, dtype=np.float64)
+        self._keys: list[Optional[str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, text: str, at: datetime, *, key: Optional[str] = None) -> None:
+        vector = embed_text(text)
+        if not vector.any():
+            return
+        with self._lock:
+            self._matrix = np.vstack([self._matrix, vector])[-self.max_entries:]
+            self._times = np.append(self._times, at.timestamp())[-self.max_entries:]
+            self._keys = (self._keys + [key])[-self.max_entries:]
+
+    def extend(self, entries: Iterable[Tuple[str, datetime, Optional[str]]]) -> None:
+        for text, at, key in sorted(entries, key=lambda entry: entry[1]):
+            self.add(text, at, key=key)
+
+    def max_similarity(self, text: str, now: datetime) -> Tuple[float, Optional[str]]:
+        """Highest cosine similarity to a retained entry, and that entry's key."""
+        vector = embed_text(text)
+        with self._lock:
+            self._evict_locked(now)
+            if not self._keys or not vector.any():
+                return 0.0, None
+            similarities = self._matrix @ vector
+            best = int(np.argmax(similarities))
+            return float(similarities[best]), self._keys[best]
+
+    def _evict_locked(self, now: datetime) -> None:
+        keep = self._times >= (now - self.window).timestamp()
+        if not keep.all():
+            self._matrix = self._matrix[keep]
+            self._times = self._times[keep]
+            self._keys = [key for key, kept in zip(self._keys, keep) if kept]
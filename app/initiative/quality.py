@@ -22,6 +22,7 @@ from datetime import datetime, timezone
 from typing import Any
 
 from app.initiative.emission_memory import InitiativeEmissionMemory
+from app.initiative.novelty import NoveltyIndex
 from app.initiative.policy import CandidateEvidence, InitiativeCandidate
 
 # Weights and thresholds from docs/initiative_quality_gate_spec.md.
@@ -36,6 +37,14 @@ DEFAULT_THRESHOLD = 0.75
 SAFETY_FLOOR = 0.70
 NOVELTY_WINDOW_DAYS = 7
 
+# Semantic novelty: cosine similarity of the candidate's message + excerpt to
+# recent emissions. Up to the floor a candidate is fully novel; novelty falls
+# linearly to zero at the duplicate threshold, where it hard-suppresses even
+# under a different topic_key.
+SIMILARITY_FLOOR = 0.50
+DUPLICATE_SIMILARITY = 0.85
+NOVELTY_INDEX_SIZE = 256
+
 # Feedback consumption (learning loop). Over this window, a run of ignored
 # emissions of a type — with nothing engaged — dampens its score so a borderline
 # candidate drops under threshold; a single engagement clears the dampening. Any
@@ -100,6 +109,7 @@ class QualityScore:
     topic_key: str | None = None
     hard_reason: str | None = None
     feedback_factor: float = 1.0
+    max_similarity: float = 0.0
 
     @property
     def passed(self) -> bool:
@@ -119,9 +129,15 @@ class QualityScore:
             "topic_key": self.topic_key,
             "hard_reason": self.hard_reason,
             "feedback_factor": self.feedback_factor,
+            "max_similarity": self.max_similarity,
         }
 
 
+def _candidate_text(candidate: InitiativeCandidate) -> str:
+    excerpt = candidate.evidence.excerpt if candidate.evidence else ""
+    return f"{candidate.message}\n{excerpt or ''}"
+
+
 def _parse_dt(value: Any) -> datetime | None:
     if not value:
         return None
@@ -146,6 +162,9 @@ class InitiativeQualityGate:
         self._memory = memory
         self._threshold = threshold
         self._recent: list[dict[str, Any]] = []
+        self._novelty = NoveltyIndex(window_days=NOVELTY_WINDOW_DAYS, max_entries=NOVELTY_INDEX_SIZE)
+        if memory is not None:
+            self._seed_novelty(memory)
 
     def evaluate(
         self,
@@ -156,13 +175,16 @@ class InitiativeQualityGate:
         current = now or datetime.now(timezone.utc)
         evidence = candidate.evidence
         topic_key = self._topic_key(candidate, evidence)
+        similarity = 0.0
+        if evidence is not None:
+            similarity, _ = self._novelty.max_similarity(_candidate_text(candidate), current)
 
-        hard_reason = self._hard_suppression(candidate, evidence, topic_key, current)
+        hard_reason = self._hard_suppression(candidate, evidence, topic_key, similarity, current)
 
         relevance = self._score_relevance(evidence)
         timing = self._score_timing(candidate)
         recency = self._score_recency(evidence, current)
-        novelty = 0.0 if (topic_key and self._seen_recently(topic_key, current)) else 1.0
+        novelty = self._score_novelty(topic_key, similarity, current)
         safety = self._score_safety(candidate, evidence)
 
         base_total = (
@@ -201,6 +223,7 @@ class InitiativeQualityGate:
             topic_key=topic_key,
             hard_reason=hard_reason,
             feedback_factor=round(feedback_factor, 4),
+            max_similarity=round(similarity, 4),
         )
         self._remember(candidate, score)
         return score
@@ -235,6 +258,10 @@ class InitiativeQualityGate:
         now: datetime | None = None,
     ) -> None:
         """Persist an emitted evidence-bound initiative for repeat suppression."""
+        if candidate.evidence is not None:
+            self._novelty.add(
+                _candidate_text(candidate), now or datetime.now(timezone.utc), key=score.topic_key
+            )
         if self._memory is None or not score.topic_key:
             return
         source_ids = []
@@ -247,6 +274,7 @@ class InitiativeQualityGate:
             quality_score=score.total,
             session_id=candidate.session_id,
             source_ids=source_ids,
+            excerpt=candidate.evidence.excerpt if candidate.evidence else None,
             emitted_at=now,
             dimensions={
                 "relevance": score.relevance,
@@ -318,6 +346,13 @@ class InitiativeQualityGate:
         overage = age_hours - _RECENCY_MAX_HOURS
         return max(0.2, 1.0 - overage / _RECENCY_MAX_HOURS)
 
+    def _score_novelty(self, topic_key: str | None, similarity: float, now: datetime) -> float:
+        if topic_key and self._seen_recently(topic_key, now):
+            return 0.0
+        if similarity <= SIMILARITY_FLOOR:
+            return 1.0
+        return max(0.0, (DUPLICATE_SIMILARITY - similarity) / (DUPLICATE_SIMILARITY - SIMILARITY_FLOOR))
+
     @staticmethod
     def _score_safety(
         candidate: InitiativeCandidate, evidence: CandidateEvidence | None
@@ -337,6 +372,7 @@ class InitiativeQualityGate:
         candidate: InitiativeCandidate,
         evidence: CandidateEvidence | None,
         topic_key: str | None,
+        similarity: float,
         now: datetime,
     ) -> str | None:
         if evidence is None:
@@ -348,6 +384,8 @@ class InitiativeQualityGate:
             return "evidence not attributable"
         if topic_key and self._seen_recently(topic_key, now):
             return f"similar initiative within {NOVELTY_WINDOW_DAYS}d"
+        if similarity >= DUPLICATE_SIMILARITY:
+            return f"near-duplicate initiative within {NOVELTY_WINDOW_DAYS}d"
         return None
 
     def _seen_recently(self, topic_key: str, now: datetime) -> bool:
@@ -369,6 +407,18 @@ class InitiativeQualityGate:
             return f"{candidate.type}:{evidence.source_type}:{evidence.source_id}"
         return None
 
+    def _seed_novelty(self, memory: InitiativeEmissionMemory) -> None:
+        # Only records carrying their excerpt are comparable to a candidate's
+        # message + excerpt; older records still count via topic_key.
+        entries = []
+        for record in memory.recent(limit=NOVELTY_INDEX_SIZE):
+            emitted = _parse_dt(record.get("emitted_at"))
+            if emitted is None or not record.get("evidence_excerpt"):
+                continue
+            text = f"{record.get('message') or ''}\n{record['evidence_excerpt']}"
+            entries.append((text, emitted, record.get("topic_key")))
+        self._novelty.extend(entries)
+
     def _remember(self, candidate: InitiativeCandidate, score: QualityScore) -> None:
         self._recent.append(
             {
@@ -1,19 +1,50 @@
 from __future__ import annotations
 
-import json
-from datetime import datetime
+import uuid
+from collections import Counter, deque
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from threading import Lock
-from typing import Any
+from typing import Any, Deque, Tuple
+
+from app.config import settings
+from app.persistence import StateTable, import_legacy_json
+
+# Top-level keys kept as single rows; the per-session maps and the emission
+# list get their own tables so each mutation writes one row.
+_SCALAR_KEYS = ("last_emitted_at", "last_suppressed", "last_user_activity", "absence_started_at")
+
+
+def _emission_day(record: dict[str, Any]) -> str:
+    return str(record.get("emitted_at", ""))[:10]
 
 
 class InitiativeStore:
-    """Small persisted ledger for unsolicited initiative decisions."""
+    """Small persisted ledger for unsolicited initiative decisions.
+
+    Emissions are indexed by day and by (type, day) as they are recorded, so
+    the daily-limit and once-per-day gates are dictionary lookups. Only the
+    last ``retention_days`` calendar days, counting the newest emission's day,
+    are kept; older emissions are compacted away.
+    """
 
-    def __init__(self, path: Path | None = None) -> None:
+    def __init__(self, path: Path | None = None, *, retention_days: int | None = None) -> None:
         self.path = path or Path("data/initiative_state.json")
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention_days = max(
+            1, settings.initiative_emission_retention_days if retention_days is None else retention_days
+        )
         self._lock = Lock()
+        # (row key, day, record), oldest first, plus the two gate indexes.
+        self._ledger: Deque[Tuple[str, str, dict[str, Any]]] = deque()
+        self._day_counts: Counter[str] = Counter()
+        self._type_day_counts: Counter[Tuple[str, str]] = Counter()
+        stem = self.path.stem
+        self._scalars = StateTable(self.path)
+        self._emissions = StateTable(self.path, namespace=f"{stem}.emissions")
+        self._activity = StateTable(self.path, namespace=f"{stem}.activity_by_session")
+        self._absence = StateTable(self.path, namespace=f"{stem}.absence_by_session")
+        import_legacy_json(self.path, self._import_legacy)
         self._state = self._load()
 
     def record_emitted(
@@ -32,10 +63,13 @@ class InitiativeStore:
             "reason": reason,
             "emitted_at": emitted_at.isoformat(),
         }
+        key = uuid.uuid4().hex
         with self._lock:
-            self._state.setdefault("emissions", []).append(record)
+            self._index_locked(key, record)
             self._state["last_emitted_at"] = record["emitted_at"]
-            self._persist()
+            self._emissions.put(key, record)
+            self._scalars.put("last_emitted_at", record["emitted_at"])
+            self._compact_locked(emitted_at.date())
         return record
 
     def record_suppressed(
@@ -54,7 +88,7 @@ class InitiativeStore:
         }
         with self._lock:
             self._state["last_suppressed"] = record
-            self._persist()
+            self._scalars.put("last_suppressed", record)
         return record
 
     def record_user_activity(
@@ -72,17 +106,11 @@ class InitiativeStore:
         }
         with self._lock:
             self._state["last_user_activity"] = record
-            per_session = self._state.setdefault("last_user_activity_by_session", {})
-            if isinstance(per_session, dict):
-                per_session[session_id] = record
+            self._state.setdefault("last_user_activity_by_session", {})[session_id] = record
+            self._scalars.put("last_user_activity", record)
+            self._activity.put(session_id, record)
             if clear_absence:
-                legacy = self._state.get("absence_started_at")
-                if isinstance(legacy, dict) and legacy.get("session_id") == session_id:
-                    self._state.pop("absence_started_at", None)
-                absence_by_session = self._state.get("absence_started_by_session")
-                if isinstance(absence_by_session, dict):
-                    absence_by_session.pop(session_id, None)
-            self._persist()
+                self._clear_absence_locked(session_id)
         return record
 
     def record_absence_started(
@@ -99,21 +127,23 @@ class InitiativeStore:
         }
         with self._lock:
             self._state["absence_started_at"] = record
-            per_session = self._state.setdefault("absence_started_by_session", {})
-            if isinstance(per_session, dict):
-                per_session[session_id] = record
-            self._persist()
+            self._state.setdefault("absence_started_by_session", {})[session_id] = record
+            self._scalars.put("absence_started_at", record)
+            self._absence.put(session_id, record)
         return record
 
     def clear_absence(self, *, session_id: str) -> None:
         with self._lock:
-            legacy = self._state.get("absence_started_at")
-            if isinstance(legacy, dict) and legacy.get("session_id") == session_id:
-                self._state.pop("absence_started_at", None)
-            per_session = self._state.get("absence_started_by_session")
-            if isinstance(per_session, dict):
-                per_session.pop(session_id, None)
-            self._persist()
+            self._clear_absence_locked(session_id)
+
+    def _clear_absence_locked(self, session_id: str) -> None:
+        legacy = self._state.get("absence_started_at")
+        if isinstance(legacy, dict) and legacy.get("session_id") == session_id:
+            self._state.pop("absence_started_at", None)
+            self._scalars.delete("absence_started_at")
+        per_session = self._state.get("absence_started_by_session")
+        if isinstance(per_session, dict) and per_session.pop(session_id, None) is not None:
+            self._absence.delete(session_id)
 
     def last_user_activity_at(self) -> datetime | None:
         """Return the timestamp of the most recent recorded user activity, regardless of session."""
@@ -155,19 +185,15 @@ class InitiativeStore:
 
     def daily_count(self, day: str) -> int:
         with self._lock:
-            return sum(
-                1
-                for record in self._state.get("emissions", [])
-                if str(record.get("emitted_at", "")).startswith(day)
-            )
+            return self._day_counts.get(day, 0)
 
     def emitted_type_today(self, initiative_type: str, day: str) -> bool:
         with self._lock:
-            return any(
-                record.get("type") == initiative_type
-                and str(record.get("emitted_at", "")).startswith(day)
-                for record in self._state.get("emissions", [])
-            )
+            return self._type_day_counts.get((initiative_type, day), 0) > 0
+
+    def emission_count(self) -> int:
+        with self._lock:
+            return len(self._ledger)
 
     def last_emitted_at(self) -> datetime | None:
         with self._lock:
@@ -182,12 +208,13 @@ class InitiativeStore:
     def snapshot(self, now: datetime) -> dict[str, Any]:
         day = now.date().isoformat()
         with self._lock:
+            daily_count = self._day_counts.get(day, 0)
             last_suppressed = self._state.get("last_suppressed")
             last_emitted_at = self._state.get("last_emitted_at")
             last_user_activity = self._state.get("last_user_activity")
             absence_started_at = self._state.get("absence_started_at")
         return {
-            "daily_count": self.daily_count(day),
+            "daily_count": daily_count,
             "day": day,
             "last_emitted_at": last_emitted_at,
             "last_suppressed": last_suppressed,
@@ -196,16 +223,62 @@ class InitiativeStore:
         }
 
     def _load(self) -> dict[str, Any]:
-        if not self.path.exists():
-            return {"emissions": []}
-        try:
-            data = json.loads(self.path.read_text())
-            if not isinstance(data, dict):
-                return {"emissions": []}
-            data.setdefault("emissions", [])
-            return data
-        except Exception:
-            return {"emissions": []}
-
-    def _persist(self) -> None:
-        self.path.write_text(json.dumps(self._state, indent=2, sort_keys=True))
+        state: dict[str, Any] = {key: value for key, value in self._scalars.items() if key in _SCALAR_KEYS}
+        for key, record in self._emissions.items():
+            if isinstance(record, dict):
+                self._index_locked(key, record)
+        if self._ledger:
+            try:
+                newest = date.fromisoformat(max(day for _, day, _ in self._ledger))
+            except ValueError:
+                newest = None
+            if newest is not None:
+                self._compact_locked(newest)
+        state["last_user_activity_by_session"] = dict(self._activity.items())
+        state["absence_started_by_session"] = dict(self._absence.items())
+        return state
+
+    def _index_locked(self, key: str, record: dict[str, Any]) -> None:
+        day = _emission_day(record)
+        self._ledger.append((key, day, record))
+        self._day_counts[day] += 1
+        self._type_day_counts[(str(record.get("type")), day)] += 1
+
+    def _compact_locked(self, newest: date) -> None:
+        """Drop emissions outside the ``retention_days`` days ending on *newest*.
+
+        The ledger is in recording order, which is chronological in practice,
+        so this pops from the front and stops at the first retained entry.
+        """
+        cutoff = (newest - timedelta(days=self.retention_days - 1)).isoformat()
+        expired = []
+        while self._ledger and self._ledger[0][1] < cutoff:
+            key, day, record = self._ledger.popleft()
+            expired.append(key)
+            for counter, index in (
+                (self._day_counts, day),
+                (self._type_day_counts, (str(record.get("type")), day)),
+            ):
+                counter[index] -= 1
+                if counter[index] <= 0:
+                    del counter[index]
+        self._emissions.delete(*expired)
+
+    def _import_legacy(self, data: Any) -> None:
+        if not isinstance(data, dict) or len(self._scalars) or len(self._emissions):
+            return
+        self._scalars.put_many(
+            (key, data[key]) for key in _SCALAR_KEYS if data.get(key) is not None
+        )
+        emissions = data.get("emissions")
+        if isinstance(emissions, list):
+            self._emissions.put_many(
+                (uuid.uuid4().hex, record) for record in emissions if isinstance(record, dict)
+            )
+        for table, key in (
+            (self._activity, "last_user_activity_by_session"),
+            (self._absence, "absence_started_by_session"),
+        ):
+            per_session = data.get(key)
+            if isinstance(per_session, dict):
+                table.put_many(per_session.items())
@@ -22,12 +22,12 @@ from typing import Any, Iterable
 
 from app.config import settings
 from app.initiative.policy import InitiativeCandidate
-from app.persistence import read_json, write_json_atomic
+from app.persistence import StateTable
 
 logger = logging.getLogger("joi.outbox")
 
 # Retention: acked or long-expired records are pruned once older than this, and
-# the file is hard-capped so an offline bridge can't grow it without bound.
+# the queue is hard-capped so an offline bridge can't grow it without bound.
 _RETENTION_HOURS = 24
 _MAX_RECORDS = 200
 _DEFAULT_TTL_MINUTES = 180
@@ -69,6 +69,8 @@ class TelegramOutbox:
         self.path = path or Path("data/telegram_outbox.json")
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._lock = Lock()
+        self._table = StateTable(self.path)
+        self._table.migrate_json(self._legacy_rows)
         self._records: list[dict[str, Any]] = self._load()
 
     # ── writes ────────────────────────────────────────────────────────────
@@ -117,7 +119,7 @@ class TelegramOutbox:
                 "attempts": 0,
             }
             self._records.append(record)
-            self._persist()
+            self._table.put(record["id"], record)
         return dict(record)
 
     def claim(self, *, limit: int = 10, now: datetime | None = None) -> list[dict[str, Any]]:
@@ -133,6 +135,7 @@ class TelegramOutbox:
                     continue
                 record["claimed_at"] = current.isoformat()
                 record["attempts"] = int(record.get("attempts", 0)) + 1
+                self._table.put(record["id"], record)
                 claimed.append(
                     {
                         "id": record["id"],
@@ -143,8 +146,6 @@ class TelegramOutbox:
                 )
                 if len(claimed) >= max(1, limit):
                     break
-            if claimed:
-                self._persist()
         return claimed
 
     def ack(self, ids: Iterable[str], *, now: datetime | None = None) -> int:
@@ -158,10 +159,9 @@ class TelegramOutbox:
             for record in self._records:
                 if record["id"] in wanted and record.get("delivered_at") is None:
                     record["delivered_at"] = current.isoformat()
+                    self._table.put(record["id"], record)
                     updated += 1
             self._prune(current)
-            if updated:
-                self._persist()
         return updated
 
     # ── reads / diagnostics ───────────────────────────────────────────────
@@ -199,13 +199,16 @@ class TelegramOutbox:
             # Oldest-first order is preserved, so trimming the front drops the
             # stalest records (delivered ones sort out via retention first).
             kept = kept[-_MAX_RECORDS:]
+        if len(kept) != len(self._records):
+            kept_ids = {record["id"] for record in kept}
+            self._table.delete(*(record["id"] for record in self._records if record["id"] not in kept_ids))
         self._records = kept
 
     def _load(self) -> list[dict[str, Any]]:
-        data = read_json(self.path, [])
-        if isinstance(data, list):
-            return [record for record in data if isinstance(record, dict) and record.get("id")]
-        return []
+        return [record for record in self._table.values() if isinstance(record, dict) and record.get("id")]
 
-    def _persist(self) -> None:
-        write_json_atomic(self.path, self._records)
+    @staticmethod
+    def _legacy_rows(data: Any) -> list[tuple[str, Any]]:
+        if not isinstance(data, list):
+            return []
+        return [(str(record["id"]), record) for record in data if isinstance(record, dict) and record.get("id")]
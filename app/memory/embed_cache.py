@@ -0,0 +1,224 @@
+"""Process-wide, disk-backed embedding cache.
+
+Vectors are keyed by ``sha256(model_id + text)`` and stored as raw float32
+blobs in a small SQLite file (WAL mode) under the runtime data dir, so they
+survive restarts and are shared by every ``MemoryStore`` in the process.
+A bounded in-memory LRU sits in front of the file for the chat hot path;
+the file itself is trimmed by least-recent use once it exceeds
+``settings.embed_cache_max_entries``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.persistence import runtime_data_dir
+
+logger = logging.getLogger(__name__)
+
+# Trim the file to this fraction of the budget so eviction runs in bursts,
+# not on every insert once the cache is full.
+_EVICT_TO_FRACTION = 0.9
+
+
+def cache_key(model_id: str, text: str) -> str:
+    return hashlib.sha256(f"{model_id}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + SQLite) cache of float32 embedding vectors."""
+
+    def __init__(self, path: Optional[Path], *, max_entries: int, memory_entries: int) -> None:
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.memory_entries = max(0, int(memory_entries))
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_count = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path: Path) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vec BLOB NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings(last_used)")
+            self._disk_count = int(conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0])
+            self._conn = conn
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning("Embedding cache at %s unavailable (memory-only): %s", path, exc)
+            self._conn = None
+
+    # ── public API ────────────────────────────────────────────────────────
+
+    def get(self, model_id: str, text: str) -> Optional[List[float]]:
+        return self.get_many(model_id, [text]).get(text)
+
+    def get_many(self, model_id: str, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """Return ``{text: vector}`` for every cached text; misses are omitted."""
+        keys = {cache_key(model_id, text): text for text in dict.fromkeys(texts)}
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+        with self._lock:
+            for key, text in keys.items():
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self._touched[key] = now
+                    found[text] = vector
+            pending = [key for key in keys if keys[key] not in found]
+            if pending and self._conn is not None:
+                for key, dim, blob in self._select(pending):
+                    vector = np.frombuffer(blob, dtype=np.float32, count=dim).tolist()
+                    found[keys[key]] = vector
+                    self._remember(key, vector)
+                    self._touched[key] = now
+                    self.disk_hits += 1
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, model_id: str, vectors: Dict[str, List[float]]) -> None:
+        if not vectors:
+            return
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, vector in vectors.items():
+                key = cache_key(model_id, text)
+                self._remember(key, list(vector))
+                self._touched.pop(key, None)
+                rows.append((key, len(vector), np.asarray(vector, dtype=np.float32).tobytes(), now))
+            if self._conn is None:
+                return
+            try:
+                self._flush_touches()
+                # Re-putting a cached text refreshes its recency, so an upsert
+                # also changes existing rows; count only the new keys.
+                existing = {row[0] for row in self._select([row[0] for row in rows], "key")}
+                self._conn.executemany(
+                    "INSERT INTO embeddings (key, dim, vec, last_used) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT(key) DO UPDATE SET last_used = excluded.last_used",
+                    rows,
+                )
+                self._disk_count += len({row[0] for row in rows} - existing)
+                if self._disk_count > self.max_entries:
+                    self._evict()
+            except sqlite3.Error as exc:
+                logger.warning("Embedding cache write failed: %s", exc)
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "sqlite" if self._conn is not None else "memory",
+            "path": str(self.path) if self.path is not None else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "disk_entries": self._disk_count,
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._disk_count = 0
+
+    # ── internals (caller holds self._lock) ───────────────────────────────
+
+    def _select(self, keys: List[str], columns: str = "key, dim, vec"):
+        rows = []
+        # Stay well under SQLite's bound-parameter limit.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(
+                self._conn.execute(
+                    f"SELECT {columns} FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+            )
+        return rows
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        if self.memory_entries == 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touches(self) -> None:
+        # Recency updates from reads are deferred to the next write so a
+        # cache hit never costs a disk write.
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE key = ?",
+            [(used, key) for key, used in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def _evict(self) -> None:
+        target = int(self.max_entries * _EVICT_TO_FRACTION)
+        excess = self._disk_count - target
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (excess,),
+        )
+        self._disk_count -= excess
+        self.evictions += excess
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """The process-wide cache shared by every MemoryStore."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = (
+                    Path(settings.embed_cache_path).resolve()
+                    if settings.embed_cache_path
+                    else runtime_data_dir() / "embed_cache.sqlite3"
+                )
+                _cache = EmbeddingCache(
+                    path,
+                    max_entries=settings.embed_cache_max_entries,
+                    memory_entries=settings.embed_cache_memory_entries,
+                )
+    return _cache
@@ -0,0 +1,124 @@
+"""Batching primitives for the memory store's embedder.
+
+Both SentenceTransformer and the OpenAI embeddings endpoint are far cheaper per
+text when fed a list: one forward pass / one round-trip instead of N. Bulk
+callers use ``MemoryStore.embed_many`` directly; single-text calls from the chat
+path go through ``EmbedCoalescer``, which parks each request for a few
+milliseconds so concurrent turns (chat, NER, retrieval) share one batch.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+EncodeBatchFn = Callable[[List[str]], List[List[float]]]
+
+
+def iter_batches(items: Sequence[str], batch_size: int) -> Iterator[List[str]]:
+    """Yield consecutive micro-batches of at most *batch_size* items."""
+    size = max(1, int(batch_size))
+    for start in range(0, len(items), size):
+        yield list(items[start:start + size])
+
+
+class EmbedCoalescer:
+    """Merges concurrent single-text embed requests into micro-batches.
+
+    ``submit`` blocks the calling thread until its vector is ready. A daemon
+    worker takes the first queued request, keeps collecting for up to
+    ``window_ms`` (or until ``max_batch`` distinct texts), then encodes the
+    whole group with one ``encode_batch`` call. An encoder failure is raised
+    in every caller that was part of that batch.
+
+    A caller never waits on the worker for more than ``timeout_s``: past it
+    (a wedged encoder or a dead worker) it encodes its own text directly.
+    A worker that has exited is restarted on the next ``submit``.
+    """
+
+    def __init__(
+        self,
+        encode_batch: EncodeBatchFn,
+        *,
+        max_batch: int = 32,
+        window_ms: float = 5.0,
+        timeout_s: float = 30.0,
+    ) -> None:
+        self._encode_batch = encode_batch
+        self.max_batch = max(1, int(max_batch))
+        self.window_s = max(0.0, float(window_ms)) / 1000.0
+        self.timeout_s = max(0.001, float(timeout_s))
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self.batches = 0
+        self.requests = 0
+        self.timeouts = 0
+
+    def submit(self, text: str) -> List[float]:
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future))
+        try:
+            return future.result(timeout=self.timeout_s)
+        except FutureTimeout:
+            # A still-queued request is skipped by the worker once cancelled.
+            future.cancel()
+            self.timeouts += 1
+            logger.warning("Embed coalescer gave no result in %.1fs; embedding directly", self.timeout_s)
+            return self._encode_batch([text])[0]
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "timeouts": self.timeouts,
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embed-coalescer", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        pending = [self._queue.get()]
+        distinct = {pending[0][0]}
+        deadline = time.monotonic() + self.window_s
+        while len(distinct) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.append(item)
+            distinct.add(item[0])
+        return pending
+
+    def _run(self) -> None:
+        while True:
+            # Callers that timed out have cancelled their futures; drop them.
+            pending = [(text, future) for text, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            texts = list(dict.fromkeys(text for text, _ in pending))
+            try:
+                vectors = dict(zip(texts, self._encode_batch(texts)))
+                results = [vectors[text] for text, _ in pending]
+            except Exception as exc:  # propagate to every waiter, keep the worker alive
+                for _, future in pending:
+                    future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.requests += len(pending)
+            for (_, future), vector in zip(pending, results):
+                future.set_result(vector)
@@ -0,0 +1,175 @@
+"""Resident entity-embedding index for nearest-entity lookup on SQLite.
+
+SQLite has no vector operator, so without this every Graph RAG turn loaded and
+JSON-parsed every Entity row to score it in Python. The index keeps one
+contiguous, L2-normalized float32 matrix with parallel id/name arrays: lookup
+is a single matrix-vector product plus ``argpartition``. It is built lazily
+from the database on first use, appended to by ``MemoryStore.add_entities``
+and invalidated (rebuilt on next query) when grooming deletes entities.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+_INITIAL_CAPACITY = 256
+
+
+class EntityMatch(NamedTuple):
+    id: int
+    name: str
+    distance: float
+
+
+def _as_vector(raw: Any) -> Optional[np.ndarray]:
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        # SQLite stores the pgvector column as its text form "[1.0, ...]"
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return None
+    try:
+        return np.asarray(raw, dtype=np.float32).reshape(-1)
+    except (TypeError, ValueError):
+        return None
+
+
+class EntityIndex:
+    """Normalized entity-embedding matrix with incremental appends."""
+
+    def __init__(self, dim: int) -> None:
+        self.dim = int(dim)
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()  # one rebuild at a time
+        self._matrix = np.empty((0, self.dim), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._names: List[str] = []
+        self._size = 0
+        self._built = False
+        # Appends that arrive while a rebuild is reading the table; replayed
+        # into the new matrix so a concurrently committed entity isn't lost.
+        self._pending: Optional[List[Tuple[int, str, np.ndarray]]] = None
+        self._generation = 0
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def __len__(self) -> int:
+        return self._size
+
+    def build(self, rows: Iterable[Tuple[int, str, Any]]) -> None:
+        """Replace the index contents with ``(id, name, embedding)`` rows."""
+        self.rebuild(lambda: rows)
+
+    def rebuild(self, load: Callable[[], Iterable[Tuple[int, str, Any]]]) -> None:
+        """Replace the index contents with the rows returned by *load*.
+
+        ``add`` calls made while *load* runs are buffered and applied after
+        the swap, so an entity committed after the rows were read is still
+        indexed. An ``invalidate`` meanwhile leaves the index unbuilt.
+        """
+        with self._build_lock:
+            with self._lock:
+                generation = self._generation
+                self._pending = []
+            try:
+                rows = list(load())
+            except BaseException:
+                with self._lock:
+                    self._pending = None
+                raise
+            self._swap(rows, generation)
+
+    def _swap(self, rows: List[Tuple[int, str, Any]], generation: int) -> None:
+        ids: List[int] = []
+        names: List[str] = []
+        vectors: List[np.ndarray] = []
+        for entity_id, name, raw in rows:
+            vec = _as_vector(raw)
+            if vec is None or vec.shape[0] != self.dim or not vec.any():
+                continue
+            ids.append(int(entity_id))
+            names.append(str(name))
+            vectors.append(vec)
+        matrix = np.vstack(vectors) if vectors else np.empty((0, self.dim), dtype=np.float32)
+        matrix = self._normalize(matrix)
+        with self._lock:
+            capacity = max(_INITIAL_CAPACITY, len(ids))
+            self._matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            self._matrix[: len(ids)] = matrix
+            self._ids = np.zeros(capacity, dtype=np.int64)
+            self._ids[: len(ids)] = ids
+            self._names = names
+            self._size = len(ids)
+            pending, self._pending = self._pending or [], None
+            # Pending rows committed before the read are already in the matrix.
+            known = set(ids)
+            for entity_id, name, row in pending:
+                if entity_id not in known:
+                    known.add(entity_id)
+                    self._append_locked(entity_id, name, row)
+            self._built = generation == self._generation
+
+    def add(self, entity_id: int, name: str, embedding: Any) -> None:
+        """Append one entity; a no-op while the index is unbuilt and idle."""
+        vec = _as_vector(embedding)
+        if vec is None or vec.shape[0] != self.dim or not vec.any():
+            return
+        row = self._normalize(vec.reshape(1, -1))[0]
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((int(entity_id), str(name), row))
+            elif self._built:
+                self._append_locked(int(entity_id), str(name), row)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._built = False
+            self._generation += 1
+
+    def _append_locked(self, entity_id: int, name: str, row: np.ndarray) -> None:
+        if self._size == self._matrix.shape[0]:
+            capacity = max(_INITIAL_CAPACITY, self._size * 2)
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            matrix[: self._size] = self._matrix[: self._size]
+            ids = np.zeros(capacity, dtype=np.int64)
+            ids[: self._size] = self._ids[: self._size]
+            self._matrix, self._ids = matrix, ids
+        self._matrix[self._size] = row
+        self._ids[self._size] = entity_id
+        self._names.append(name)
+        self._size += 1
+
+    def search(self, query_embedding: Any, limit: int = 5) -> List[EntityMatch]:
+        """Nearest entities by cosine distance, closest first."""
+        query = _as_vector(query_embedding)
+        if query is None or query.shape[0] != self.dim or limit <= 0:
+            return []
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0:
+            return []
+        query = query / norm
+        with self._lock:
+            size = self._size
+            if size == 0:
+                return []
+            scores = self._matrix[:size] @ query
+            ids = self._ids[:size]
+            names = self._names
+            k = min(limit, size)
+            top = np.argpartition(-scores, k - 1)[:k] if k < size else np.arange(size)
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [EntityMatch(int(ids[i]), names[i], float(1.0 - scores[i])) for i in top]
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        # Callers drop zero vectors first, so every norm here is positive.
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return (matrix / norms).astype(np.float32, copy=False)
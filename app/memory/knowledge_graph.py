@@ -0,0 +1,239 @@
+"""Resident knowledge graph over the Entity/Relationship tables.
+
+Graph RAG used to expand entities with one SQL scan per seed and could only
+see one hop. ``KnowledgeGraph`` keeps the relationship edges in memory and
+serves traversal from CSR arrays (``indptr`` / ``indices`` / ``weights``):
+
+- ``k_hop``: weighted breadth-first expansion up to *depth* hops
+- ``personalized_pagerank``: random walk with restart at the seed entities
+- ``top_neighbors``: strongest direct neighbours of one entity
+
+Edges are treated as undirected for traversal, matching how
+``get_related_entities`` always read them. The edge map is loaded from the
+database on first use and kept in sync by ``MemoryStore.add_relationship``,
+``decay_relationships`` and ``groom_memory_graph``. Mutations only mark the
+CSR arrays stale; they are rebuilt (O(E)) on the next query.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EdgeKey = Tuple[int, int, str]
+
+
+class KnowledgeGraph:
+    """In-memory weighted multigraph with lazily rebuilt CSR adjacency."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._edges: Dict[EdgeKey, float] = {}
+        self._loaded = False
+        self._stale = True
+        self._node_ids = np.empty(0, dtype=np.int64)
+        self._node_index: Dict[int, int] = {}
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.empty(0, dtype=np.int64)
+        self._weights = np.empty(0, dtype=np.float64)
+        self._types = np.empty(0, dtype=np.int32)
+        self._type_codes: Dict[str, int] = {}
+
+    # ── sync with the database ────────────────────────────────────────────
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, rows: Iterable[Tuple[int, int, str, float]]) -> None:
+        """Replace all edges with ``(from_id, to_id, relation_type, weight)`` rows."""
+        edges: Dict[EdgeKey, float] = {}
+        for from_id, to_id, relation_type, weight in rows:
+            key = (int(from_id), int(to_id), str(relation_type))
+            edges[key] = edges.get(key, 0.0) + float(weight or 0.0)
+        with self._lock:
+            self._edges = edges
+            self._loaded = True
+            self._stale = True
+
+    def invalidate(self) -> None:
+        """Forget everything; the owner reloads from the database on next use."""
+        with self._lock:
+            self._loaded = False
+            self._edges = {}
+            self._stale = True
+
+    def add_edge(self, from_id: int, to_id: int, relation_type: str, weight: float = 1.0) -> None:
+        """Mirror ``add_relationship``: create the edge or add to its weight."""
+        with self._lock:
+            if not self._loaded:
+                return
+            key = (int(from_id), int(to_id), str(relation_type))
+            self._edges[key] = self._edges.get(key, 0.0) + float(weight)
+            self._stale = True
+
+    def scale_weights(self, factor: float) -> None:
+        with self._lock:
+            if not self._loaded:
+                return
+            for key in self._edges:
+                self._edges[key] *= factor
+            if not self._stale:
+                self._weights *= factor
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    # ── queries ───────────────────────────────────────────────────────────
+
+    def neighbors(self, entity_id: int, relation_type: Optional[str] = None) -> List[int]:
+        return [node for node, _ in self._adjacent(entity_id, relation_type)]
+
+    def top_neighbors(self, entity_id: int, k: int = 5, relation_type: Optional[str] = None) -> List[Tuple[int, float]]:
+        """Strongest direct neighbours as ``(entity_id, weight)``, heaviest first."""
+        ranked = sorted(self._adjacent(entity_id, relation_type), key=lambda item: (-item[1], item[0]))
+        return ranked[: max(0, k)]
+
+    def k_hop(
+        self,
+        seeds: Sequence[int],
+        depth: int = 1,
+        *,
+        relation_type: Optional[str] = None,
+        max_nodes: Optional[int] = None,
+    ) -> Dict[int, float]:
+        """Entities within *depth* hops of *seeds*, scored by path strength.
+
+        Seeds score 1.0. Each hop multiplies by the edge's share of its source
+        node's total weight, keeping the best path per node, so strongly tied
+        neighbours outrank incidental ones. Seeds are included in the result.
+        """
+        with self._lock:
+            self._ensure_csr()
+            scores: Dict[int, float] = {}
+            frontier: Dict[int, float] = {}
+            for seed in seeds:
+                if int(seed) in self._node_index:
+                    frontier[self._node_index[int(seed)]] = 1.0
+                scores[int(seed)] = 1.0
+            code = self._type_codes.get(relation_type) if relation_type else None
+            if relation_type and code is None:
+                return scores
+            for _ in range(max(0, depth)):
+                next_frontier: Dict[int, float] = {}
+                for idx, score in frontier.items():
+                    start, end = self._indptr[idx], self._indptr[idx + 1]
+                    weights = self._weights[start:end]
+                    mask = weights > 0
+                    if code is not None:
+                        mask &= self._types[start:end] == code
+                    total = float(weights[mask].sum())
+                    if total <= 0:
+                        continue
+                    for neighbor, weight in zip(self._indices[start:end][mask], weights[mask]):
+                        node = int(self._node_ids[neighbor])
+                        candidate = score * float(weight) / total
+                        if candidate > scores.get(node, 0.0):
+                            scores[node] = candidate
+                            next_frontier[int(neighbor)] = max(candidate, next_frontier.get(int(neighbor), 0.0))
+                frontier = next_frontier
+                if not frontier:
+                    break
+        if max_nodes is not None and len(scores) > max_nodes:
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:max_nodes]
+            scores = dict(ranked)
+        return scores
+
+    def personalized_pagerank(
+        self,
+        seeds: Sequence[int],
+        *,
+        alpha: float = 0.15,
+        iterations: int = 30,
+        tol: float = 1e-6,
+        top_k: Optional[int] = None,
+    ) -> Dict[int, float]:
+        """Random walk with restart probability *alpha* back to *seeds*.
+
+        Dangling mass also returns to the seeds. Returns ``{entity_id: score}``
+        (scores sum to ~1), optionally cut to the *top_k* highest.
+        """
+        with self._lock:
+            self._ensure_csr()
+            n = len(self._node_ids)
+            seed_idx = [self._node_index[int(s)] for s in dict.fromkeys(seeds) if int(s) in self._node_index]
+            if n == 0 or not seed_idx:
+                return {}
+            restart = np.zeros(n, dtype=np.float64)
+            restart[seed_idx] = 1.0 / len(seed_idx)
+            weights = np.clip(self._weights, 0.0, None)
+            sources = np.repeat(np.arange(n), np.diff(self._indptr))
+            out_weight = np.bincount(sources, weights=weights, minlength=n)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                transition = np.where(out_weight[sources] > 0, weights / out_weight[sources], 0.0)
+            dangling = out_weight <= 0
+            rank = restart.copy()
+            for _ in range(max(1, iterations)):
+                spread = np.bincount(self._indices, weights=rank[sources] * transition, minlength=n)
+                lost = rank[dangling].sum()
+                updated = (1.0 - alpha) * (spread + lost * restart) + alpha * restart
+                delta = float(np.abs(updated - rank).sum())
+                rank = updated
+                if delta < tol:
+                    break
+            order = np.argsort(-rank, kind="stable")
+            if top_k is not None:
+                order = order[:top_k]
+            return {int(self._node_ids[i]): float(rank[i]) for i in order if rank[i] > 0}
+
+    # ── internals ─────────────────────────────────────────────────────────
+
+    def _adjacent(self, entity_id: int, relation_type: Optional[str]) -> List[Tuple[int, float]]:
+        with self._lock:
+            self._ensure_csr()
+            idx = self._node_index.get(int(entity_id))
+            if idx is None:
+                return []
+            start, end = self._indptr[idx], self._indptr[idx + 1]
+            mask = np.ones(end - start, dtype=bool)
+            if relation_type:
+                code = self._type_codes.get(relation_type)
+                if code is None:
+                    return []
+                mask &= self._types[start:end] == code
+            merged: Dict[int, float] = {}
+            for neighbor, weight in zip(self._indices[start:end][mask], self._weights[start:end][mask]):
+                node = int(self._node_ids[neighbor])
+                merged[node] = merged.get(node, 0.0) + float(weight)
+            return list(merged.items())
+
+    def _ensure_csr(self) -> None:
+        # Caller holds self._lock.
+        if not self._stale:
+            return
+        type_codes: Dict[str, int] = {}
+        src: List[int] = []
+        dst: List[int] = []
+        weights: List[float] = []
+        types: List[int] = []
+        for (from_id, to_id, relation_type), weight in self._edges.items():
+            code = type_codes.setdefault(relation_type, len(type_codes))
+            # Undirected for traversal: store both directions.
+            src.extend((from_id, to_id))
+            dst.extend((to_id, from_id))
+            weights.extend((weight, weight))
+            types.extend((code, code))
+        node_ids = np.unique(np.asarray(src, dtype=np.int64))
+        src_idx = np.searchsorted(node_ids, np.asarray(src, dtype=np.int64))
+        dst_idx = np.searchsorted(node_ids, np.asarray(dst, dtype=np.int64))
+        order = np.argsort(src_idx, kind="stable")
+        self._node_ids = node_ids
+        self._node_index = {int(node): i for i, node in enumerate(node_ids)}
+        self._indptr = np.concatenate(([0], np.cumsum(np.bincount(src_idx, minlength=len(node_ids))))).astype(np.int64)
+        self._indices = dst_idx[order].astype(np.int64)
+        self._weights = np.asarray(weights, dtype=np.float64)[order]
+        self._types = np.asarray(types, dtype=np.int32)[order]
+        self._type_codes = type_codes
+        self._stale = False
@@ -1,15 +1,20 @@
 import asyncio
-import httpx
 import json
 import logging
 import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from pathlib import Path
 from datetime import date, datetime, timedelta
 from app.config import settings
+from app.memory.embed_cache import get_embedding_cache
+from app.memory.embedding import EmbedCoalescer, iter_batches
+from app.memory.entity_index import EntityIndex
+from app.memory.knowledge_graph import KnowledgeGraph
+from services.ai_router import provider_clients
 from app.api.models import UserProfile, Feedback, Milestone, ChatMessage, ChatSession, Memory, MoodEntry, Habit, Decision, PersonalGoal, ActivityLog, CbtExercise, Entity, Relationship, Contact, SleepLog, Transaction
-from sqlalchemy import select, create_engine, text as sa_text
+from sqlalchemy import delete, func, select, update, create_engine, text as sa_text
 from sqlalchemy.orm import Session as SQLSession
 import numpy as np
 try:
@@ -36,7 +41,52 @@ def create_db_and_tables():
         Base.metadata.create_all(engine)
         _db_initialized = True
 
-_EMBED_CACHE_MAX = 256
+_ST_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+_CLOUD_EMBED_MODEL = "text-embedding-3-small"
+
+# Process-wide nearest-entity index for the SQLite path (see entity_index.py).
+_entity_index: Optional[EntityIndex] = None
+_entity_index_lock = threading.Lock()
+
+
+def _get_entity_index() -> EntityIndex:
+    global _entity_index
+    if _entity_index is None:
+        with _entity_index_lock:
+            if _entity_index is None:
+                _entity_index = EntityIndex(settings.embed_dim)
+    return _entity_index
+
+# Process-wide relationship graph (see knowledge_graph.py); loaded on first use.
+_knowledge_graph = KnowledgeGraph()
+_knowledge_graph_lock = threading.Lock()
+
+
+def _get_knowledge_graph() -> KnowledgeGraph:
+    if not _knowledge_graph.loaded:
+        with _knowledge_graph_lock:
+            if not _knowledge_graph.loaded:
+                with SQLSession(engine) as session:
+                    _knowledge_graph.load(
+                        session.execute(
+                            select(
+                                Relationship.from_entity_id,
+                                Relationship.to_entity_id,
+                                Relationship.relation_type,
+                                Relationship.weight,
+                            )
+                        ).all()
+                    )
+    return _knowledge_graph
+
+# Graph RAG fan-out: at most this many entity names are searched, each
+# contributing its top few memories.
+_GRAPH_RAG_MAX_ENTITIES = 8
+_GRAPH_RAG_PER_ENTITY = 3
+
+# Grooming deletes/updates at most this many rows per committed batch.
+_GROOM_BATCH_SIZE = 1000
+GroomProgressFn = Callable[[str, int], None]
 
 # Retrieval treats memories at/above this salience as emotionally significant.
 SALIENCE_THRESHOLD = 0.7
@@ -65,6 +115,21 @@ def _emotion_metadata(sentiment: str | None, mood: float | None) -> Dict[str, An
     return meta
 
 
+class ChatWindow(list):
+    """A page of chat messages (oldest-first) that knows the session size.
+
+    Behaves as the plain message list the sub-agents already take; ``total``
+    carries the full session length for code that gates on message counts,
+    and ``next_before_id`` is the cursor for the next older page (None when
+    this page reaches the start of the session).
+    """
+
+    def __init__(self, messages=(), *, total: int = 0, next_before_id: Optional[int] = None) -> None:
+        super().__init__(messages)
+        self.total = total
+        self.next_before_id = next_before_id
+
+
 class MemoryStore:
     _executor = ThreadPoolExecutor(max_workers=2)
 
@@ -73,7 +138,18 @@ class MemoryStore:
         self.expected_dim = settings.embed_dim
         self.ollama_host = settings.ollama_host
         self.router_timeout = settings.router_timeout
-        self._embed_cache: Dict[str, List[float]] = {}
+        # Cache keys include the model so switching embedders never serves
+        # vectors from the other one.
+        self.embed_model_id = _ST_MODEL_NAME if _ST_AVAILABLE else f"openai/{_CLOUD_EMBED_MODEL}@{self.expected_dim}"
+        self._embed_cache = get_embedding_cache()
+        self._coalescer: Optional[EmbedCoalescer] = None
+        if settings.embed_coalesce_window_ms > 0:
+            self._coalescer = EmbedCoalescer(
+                self._encode_batch,
+                max_batch=settings.embed_batch_size,
+                window_ms=settings.embed_coalesce_window_ms,
+                timeout_s=settings.embed_coalesce_timeout_s,
+            )
 
         try:
             import chromadb
@@ -126,15 +202,19 @@ class MemoryStore:
                     # Never return a zero vector on failure: it would be cached and
                     # written to Chroma as a real embedding, permanently breaking
                     # retrieval for that memory. Raise so the caller can skip it.
-                    if not text or not isinstance(text, str):
+                    # A list is sent as one request and returns a 2-D array.
+                    texts = text if isinstance(text, list) else [text]
+                    if not texts or not all(t and isinstance(t, str) for t in texts):
                         raise ValueError("Cloud embedding requires non-empty text")
                     try:
                         resp = self.client.embeddings.create(
-                            input=text,
-                            model="text-embedding-3-small",
+                            input=texts,
+                            model=_CLOUD_EMBED_MODEL,
                             dimensions=self.dimensions,
                         )
-                        return np.array(resp.data[0].embedding, dtype=np.float32)
+                        rows = sorted(resp.data, key=lambda item: item.index)
+                        vectors = np.array([row.embedding for row in rows], dtype=np.float32)
+                        return vectors if isinstance(text, list) else vectors[0]
                     except Exception as e:
                         logging.warning("Cloud embedding failed: %s", e)
                         raise
@@ -145,7 +225,7 @@ class MemoryStore:
             self.embedder = CloudEmbedding()
             return self.embedder
 
-        model_name = "sentence-transformers/all-mpnet-base-v2"
+        model_name = _ST_MODEL_NAME
         try:
             import torch as _torch
             device = "cuda" if _torch.cuda.is_available() else ("mps" if _torch.backends.mps.is_available() else "cpu")
@@ -155,30 +235,51 @@ class MemoryStore:
         self.embedder = ST(model_name, device=device)
         return self.embedder
 
-    def embed_text(self, text: str) -> List[float]:
-        if text in self._embed_cache:
-            return self._embed_cache[text]
-
-        self._load_embedder()
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """Encode *texts* with a single embedder call (no caching)."""
+        embedder = self._load_embedder()
         try:
-            emb = self.embedder.encode(text, convert_to_tensor=False)
-            if emb.ndim == 2:
-                embedding = emb[0].tolist()
-            elif emb.ndim == 1:
-                embedding = emb.tolist()
-            else:
+            emb = np.asarray(
+                embedder.encode(list(texts), batch_size=len(texts), convert_to_tensor=False),
+                dtype=np.float32,
+            )
+            if emb.ndim == 1:
+                emb = emb.reshape(1, -1)
+            if emb.ndim != 2 or emb.shape[0] != len(texts):
                 raise ValueError(f"Unexpected embedding shape: {emb.shape}")
-            if len(embedding) != self.expected_dim:
-                raise ValueError(f"Embedding dim {len(embedding)} != expected {self.expected_dim}")
+            if emb.shape[1] != self.expected_dim:
+                raise ValueError(f"Embedding dim {emb.shape[1]} != expected {self.expected_dim}")
         except Exception as e:
             raise Exception(f"Local embedding failed: {str(e)}. Check torch/MPS setup.")
+        return emb.tolist()
 
-        # Evict oldest entry when cache is full
-        if len(self._embed_cache) >= _EMBED_CACHE_MAX:
-            self._embed_cache.pop(next(iter(self._embed_cache)))
-        self._embed_cache[text] = embedding
+    def embed_text(self, text: str) -> List[float]:
+        cached = self._embed_cache.get(self.embed_model_id, text)
+        if cached is not None:
+            return cached
+
+        if self._coalescer is not None:
+            # Concurrent single-text callers share one encode call.
+            embedding = self._coalescer.submit(text)
+        else:
+            embedding = self._encode_batch([text])[0]
+        self._embed_cache.put_many(self.embed_model_id, {text: embedding})
         return embedding
 
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed *texts* in micro-batches of ``settings.embed_batch_size``.
+
+        Cached and repeated texts are encoded once; the result is aligned
+        with the input order.
+        """
+        known = self._embed_cache.get_many(self.embed_model_id, texts)
+        missing = [t for t in dict.fromkeys(texts) if t not in known]
+        for batch in iter_batches(missing, settings.embed_batch_size):
+            fresh = dict(zip(batch, self._encode_batch(batch)))
+            self._embed_cache.put_many(self.embed_model_id, fresh)
+            known.update(fresh)
+        return [known[t] for t in texts]
+
     async def embed_text_async(self, text: str) -> List[float]:
         """Non-blocking wrapper — offloads SentenceTransformer encode to thread pool."""
         loop = asyncio.get_event_loop()
@@ -242,36 +343,55 @@ Text: {text}
 JSON:
 """
         try:
-            with httpx.Client(timeout=60.0) as client:
-                response = client.post(
-                    f"{self.ollama_host}/api/chat",
-                    json={
-                        "model": settings.model_ollama,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "format": "json",
-                        "stream": False
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-                entities = json.loads(data["message"]["content"])
-                return entities if isinstance(entities, list) else []
+            response = provider_clients().http().post(
+                f"{self.ollama_host}/api/chat",
+                json={
+                    "model": settings.model_ollama,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "format": "json",
+                    "stream": False
+                },
+                timeout=60.0,
+            )
+            response.raise_for_status()
+            data = response.json()
+            entities = json.loads(data["message"]["content"])
+            return entities if isinstance(entities, list) else []
         except Exception as e:
             logging.warning("NER failed: %s", e)
             return []
 
     def add_entity(self, name: str, entity_type: str, description: str = ""):
+        return self.add_entities([{"name": name, "type": entity_type}], description)[0]
+
+    def add_entities(self, entities: List[Dict[str, str]], description: str = "") -> List[int]:
+        """Get-or-create entities; new ones are embedded in one batch.
+
+        Returns entity ids aligned with *entities*.
+        """
+        keys = [(ent["name"], ent["type"]) for ent in entities]
         with SQLSession(engine) as session:
-            # Check if exists
-            existing = session.execute(select(Entity).where(Entity.name == name, Entity.type == entity_type)).scalar_one_or_none()
-            if existing:
-                return existing.id
-            embedding = self.embed_text(f"{entity_type}: {name} - {description}")
-            entity = Entity(name=name, type=entity_type, description=description, embedding=embedding)
-            session.add(entity)
-            session.commit()
-            session.refresh(entity)
-            return entity.id
+            rows = session.execute(
+                select(Entity).where(Entity.name.in_({name for name, _ in keys}))
+            ).scalars().all()
+            ids = {(row.name, row.type): row.id for row in rows}
+            new_keys = [key for key in dict.fromkeys(keys) if key not in ids]
+            if new_keys:
+                embeddings = self.embed_many(
+                    [f"{entity_type}: {name} - {description}" for name, entity_type in new_keys]
+                )
+                created = [
+                    Entity(name=name, type=entity_type, description=description, embedding=embedding)
+                    for (name, entity_type), embedding in zip(new_keys, embeddings)
+                ]
+                session.add_all(created)
+                session.flush()
+                ids.update(zip(new_keys, (entity.id for entity in created)))
+                session.commit()
+                index = _get_entity_index()
+                for key, embedding in zip(new_keys, embeddings):
+                    index.add(ids[key], key[0], embedding)
+            return [ids[key] for key in keys]
 
     def add_relationship(self, from_id: int, to_id: int, relation_type: str, weight: float = 1.0):
         with SQLSession(engine) as session:
@@ -285,85 +405,81 @@ JSON:
             ).scalar_one_or_none()
             if existing:
                 existing.weight += weight
-                session.commit()
-                return
-            relationship = Relationship(from_entity_id=from_id, to_entity_id=to_id, relation_type=relation_type, weight=weight)
-            session.add(relationship)
+            else:
+                session.add(Relationship(from_entity_id=from_id, to_entity_id=to_id, relation_type=relation_type, weight=weight))
             session.commit()
+        _knowledge_graph.add_edge(from_id, to_id, relation_type, weight)
 
     def get_related_entities(self, entity_id: int, relation_type: str = None, depth: int = 1) -> List[int]:
-        # Simple traversal for related entities
-        with SQLSession(engine) as session:
-            if relation_type:
-                rels = session.execute(
-                    select(Relationship).where(
-                        (Relationship.from_entity_id == entity_id) | (Relationship.to_entity_id == entity_id),
-                        Relationship.relation_type == relation_type
-                    )
-                ).scalars().all()
-            else:
-                rels = session.execute(
-                    select(Relationship).where(
-                        (Relationship.from_entity_id == entity_id) | (Relationship.to_entity_id == entity_id)
-                    )
-                ).scalars().all()
-            related = set()
-            for rel in rels:
-                if rel.from_entity_id == entity_id:
-                    related.add(rel.to_entity_id)
-                else:
-                    related.add(rel.from_entity_id)
-            return list(related)
+        """Entities within *depth* hops of *entity_id*, strongest paths first."""
+        scores = _get_knowledge_graph().k_hop([entity_id], depth, relation_type=relation_type)
+        scores.pop(entity_id, None)
+        return [eid for eid, _ in sorted(scores.items(), key=lambda item: (-item[1], item[0]))]
 
-    def graph_rag_search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
-        """3-stage Graph RAG: vector search + entity graph expansion + merge/re-rank."""
+    def graph_rag_search(
+        self,
+        query: str,
+        k: int = 5,
+        *,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> List[Dict[str, Any]]:
+        """3-stage Graph RAG: vector search + entity graph expansion + merge/re-rank.
+
+        The query and every discovered entity name are embedded up front and
+        sent to Chroma as a single multi-query, so a turn costs one vector
+        round-trip regardless of how many entities the graph surfaces. Pass a
+        dict as *timings* to receive per-stage wall times in milliseconds.
+        """
         if not self.collection:
             return []
+        timings = timings if timings is not None else {}
+        clock = time.perf_counter()
 
-        # Compute embedding once and reuse across both stages
-        query_embedding = self.embed_text(query)
+        def lap(stage: str) -> None:
+            nonlocal clock
+            now = time.perf_counter()
+            timings[stage] = round((now - clock) * 1000, 2)
+            clock = now
 
-        # Stage 1: Baseline vector search (always runs)
-        vector_results = self.search_embeddings(query, k * 2, _precomputed_embedding=query_embedding)
-        for r in vector_results:
-            r["source"] = "vector"
+        query_embedding = self.embed_text(query)
+        lap("embed_query")
 
-        # Stage 2: Entity-aware graph expansion
-        graph_results = []
+        # Stage 1: Entity-aware graph expansion (names only; searched below)
+        entity_names: List[str] = []
+        name_embeddings: List[List[float]] = []
         try:
             with SQLSession(engine) as session:
-                # Find similar entities via cosine distance
                 similar_entities = self._find_similar_entities(session, query_embedding, limit=5)
-
-                # Collect entity IDs + expand via graph traversal
-                entity_ids = {row.id for row in similar_entities}
-                expanded_ids = set(entity_ids)
-                for eid in entity_ids:
-                    expanded_ids.update(self.get_related_entities(eid, depth=1))
-
-                # Fetch entity names for memory search
-                if expanded_ids:
-                    entity_names = [row.name for row in similar_entities]
-                    # Also get names of expanded entities not in the initial set
-                    extra_ids = expanded_ids - entity_ids
-                    if extra_ids:
-                        extra_entities = session.execute(
-                            select(Entity).where(Entity.id.in_(extra_ids))
-                        ).scalars().all()
-                        entity_names.extend([e.name for e in extra_entities])
-
-                    # Search memories related to discovered entities
-                    seen_texts = set()
-                    for name in entity_names[:8]:  # Cap to avoid excessive queries
-                        matches = self.search_embeddings(name, k=3)
-                        for m in matches:
-                            if m["text"][:100] not in seen_texts:
-                                seen_texts.add(m["text"][:100])
-                                m["source"] = "graph"
-                                m["matched_entity"] = name
-                                graph_results.append(m)
+                lap("entity_lookup")
+                entity_names = self._expanded_entity_names(session, similar_entities)
+                lap("graph_expand")
+            entity_names = entity_names[:_GRAPH_RAG_MAX_ENTITIES]  # Cap to bound the multi-query
+            if entity_names:
+                name_embeddings = self.embed_many(entity_names)
+            lap("embed_entities")
         except Exception as e:
             logging.warning("Graph expansion failed (falling back to vector): %s", e)
+            entity_names, name_embeddings = [], []
+
+        # Stage 2: One Chroma round-trip for the query plus every entity name
+        results = self.collection.query(
+            query_embeddings=[query_embedding, *name_embeddings],
+            n_results=max(k * 2, _GRAPH_RAG_PER_ENTITY),
+        )
+        lap("vector_query")
+        per_query = self._query_result_rows(results)
+        vector_results = per_query[0][: k * 2] if per_query else []
+        for r in vector_results:
+            r["source"] = "vector"
+        graph_results = []
+        seen_texts = set()
+        for name, matches in zip(entity_names, per_query[1:]):
+            for m in matches[:_GRAPH_RAG_PER_ENTITY]:
+                if m["text"][:100] not in seen_texts:
+                    seen_texts.add(m["text"][:100])
+                    m["source"] = "graph"
+                    m["matched_entity"] = name
+                    graph_results.append(m)
 
         # Stage 3: Merge, deduplicate, re-rank
         seen = set()
@@ -390,8 +506,42 @@ JSON:
             if isinstance(salience, (int, float)) and salience >= SALIENCE_THRESHOLD:
                 r["distance"] = r.get("distance", 1.0) * 0.85
         merged.sort(key=lambda x: x.get("distance", 999))
+        lap("merge")
         return merged[:k]
 
+    def _expanded_entity_names(self, session: SQLSession, similar_entities) -> List[str]:
+        """Names of the seed entities followed by their graph neighbourhood.
+
+        Neighbours within ``settings.graph_rag_hops`` hops come from the
+        resident knowledge graph, ranked by personalized PageRank from the
+        seeds; one query then fetches their names.
+        """
+        entity_ids = [row.id for row in similar_entities]
+        if not entity_ids:
+            return []
+        graph = _get_knowledge_graph()
+        reachable = graph.k_hop(entity_ids, settings.graph_rag_hops)
+        extra_ids = set(reachable) - set(entity_ids)
+        names = [row.name for row in similar_entities]
+        if extra_ids:
+            rank = graph.personalized_pagerank(entity_ids)
+            ordered = sorted(extra_ids, key=lambda eid: (-rank.get(eid, 0.0), -reachable[eid], eid))
+            ordered = ordered[:_GRAPH_RAG_MAX_ENTITIES]
+            by_id = dict(session.execute(select(Entity.id, Entity.name).where(Entity.id.in_(ordered))).all())
+            names.extend(by_id[eid] for eid in ordered if eid in by_id)
+        return names
+
+    @staticmethod
+    def _query_result_rows(results: Dict[str, Any]) -> List[List[Dict[str, Any]]]:
+        """Split a Chroma (multi-)query result into one row list per query."""
+        return [
+            [
+                {"text": doc, "metadata": meta, "distance": dist}
+                for doc, meta, dist in zip(docs, metas, dists)
+            ]
+            for docs, metas, dists in zip(results["documents"], results["metadatas"], results["distances"])
+        ]
+
     def _find_similar_entities(
         self,
         session: SQLSession,
@@ -401,9 +551,9 @@ JSON:
         """Nearest entities by cosine distance.
 
         Uses the pgvector `<=>` operator on Postgres; on SQLite (the default
-        engine) that operator does not exist, so fall back to NumPy cosine
-        similarity over the stored embeddings. Both branches return objects
-        with .id and .name attributes.
+        engine) that operator does not exist, so search the resident
+        EntityIndex instead (built from the table on first use). Both
+        branches return objects with .id and .name attributes.
         """
         if engine.dialect.name == "postgresql":
             return session.execute(
@@ -418,39 +568,18 @@ JSON:
                 {"qe": str(query_embedding), "limit": limit},
             ).fetchall()
 
-        entities = session.execute(
-            select(Entity).where(Entity.embedding.is_not(None))
-        ).scalars().all()
-        query_vec = np.asarray(query_embedding, dtype=np.float32)
-        query_norm = np.linalg.norm(query_vec)
-        if query_norm == 0:
-            return []
-        scored = []
-        for entity in entities:
-            raw = entity.embedding
-            if isinstance(raw, str):
-                # SQLite stores the pgvector column as its text form "[1.0, ...]"
-                try:
-                    raw = json.loads(raw)
-                except ValueError:
-                    continue
-            vec = np.asarray(raw, dtype=np.float32)
-            if vec.shape != query_vec.shape:
-                continue
-            norm = np.linalg.norm(vec)
-            if norm == 0:
-                continue
-            distance = 1.0 - float(np.dot(vec, query_vec) / (norm * query_norm))
-            scored.append((distance, entity))
-        scored.sort(key=lambda item: item[0])
-        return [entity for _, entity in scored[:limit]]
+        index = _get_entity_index()
+        if not index.built:
+            index.rebuild(
+                lambda: session.execute(
+                    select(Entity.id, Entity.name, Entity.embedding).where(Entity.embedding.is_not(None))
+                ).all()
+            )
+        return index.search(query_embedding, limit)
 
     def infer_relationships(self, entities: List[Dict[str, str]], text: str):
         # Simple co-occurrence: link all pairs with "co_occurrence"
-        entity_ids = []
-        for ent in entities:
-            eid = self.add_entity(ent["name"], ent["type"], f"From text: {text[:100]}")
-            entity_ids.append(eid)
+        entity_ids = list(dict.fromkeys(self.add_entities(entities, f"From text: {text[:100]}")))
         for i in range(len(entity_ids)):
             for j in range(i+1, len(entity_ids)):
                 self.add_relationship(entity_ids[i], entity_ids[j], "co_occurrence")
@@ -497,6 +626,30 @@ JSON:
         if mem_type == "user_input":
             self._executor.submit(self._extract_and_infer, text)
 
+    def add_memories(self, mem_type: str, texts: List[str], tags: List[str]) -> None:
+        """Bulk add_memory: one SQL commit, one embedding batch, one Chroma write."""
+        if not texts:
+            return
+        memory_type = "semantic" if mem_type in ["entity", "summary", "goal", "habit", "decision", "consolidation"] else "episodic"
+        tags_str = json.dumps(tags)
+        with SQLSession(engine) as session:
+            memories = [Memory(type=mem_type, text=text, tags=tags_str, memory_type=memory_type) for text in texts]
+            session.add_all(memories)
+            session.flush()
+            ids = [str(memory.id) for memory in memories]
+            session.commit()
+        if self.collection:
+            try:
+                embeddings = self.embed_many(texts)
+                self.collection.add(
+                    documents=list(texts),
+                    embeddings=embeddings,
+                    metadatas=[{"type": mem_type, "tags": tags_str, "memory_type": memory_type} for _ in texts],
+                    ids=ids,
+                )
+            except Exception as exc:
+                logging.warning("%d memories stored but not vector-indexed: %s", len(texts), exc)
+
     def add_summary(self, context_id: str, summary: str):
         self.add_memory("summary", summary, ["summary", context_id])
 
@@ -567,20 +720,57 @@ JSON:
             n_results=k,
             where=where_clause if where_clause else None
         )
-        memories = []
-        for doc, meta, dist in zip(results['documents'][0], results['metadatas'][0], results['distances'][0]):
-            memories.append({
-                "text": doc,
-                "metadata": meta,
-                "distance": dist
-            })
-        return memories
+        return self._query_result_rows(results)[0]
 
     def get_chat_history(self, session_id: str) -> List[ChatMessage]:
         with SQLSession(engine) as session:
             statement = select(ChatMessage).where(ChatMessage.session_id == session_id).order_by(ChatMessage.timestamp)
             return session.execute(statement).scalars().all()
 
+    def get_chat_window(
+        self,
+        session_id: str,
+        limit: int = 50,
+        *,
+        before_id: Optional[int] = None,
+        with_total: bool = True,
+    ) -> "ChatWindow":
+        """The newest *limit* messages of a session (older than *before_id*).
+
+        Keyset-paginated on the message id, so the cost is O(limit) however
+        long the session is. Messages come back oldest-first, like
+        ``get_chat_history``; ``total`` is the session's full message count.
+        """
+        limit = max(1, int(limit))
+        with SQLSession(engine) as session:
+            statement = select(ChatMessage).where(ChatMessage.session_id == session_id)
+            if before_id is not None:
+                statement = statement.where(ChatMessage.id < before_id)
+            rows = session.execute(
+                statement.order_by(ChatMessage.id.desc()).limit(limit + 1)
+            ).scalars().all()
+            total = None
+            if with_total:
+                total = session.execute(
+                    select(func.count()).select_from(ChatMessage).where(ChatMessage.session_id == session_id)
+                ).scalar_one()
+        has_more = len(rows) > limit
+        messages = list(reversed(rows[:limit]))
+        return ChatWindow(
+            messages,
+            total=total if total is not None else len(messages),
+            next_before_id=messages[0].id if has_more and messages else None,
+        )
+
+    def get_messages_by_ids(self, message_ids: List[int]) -> Dict[int, ChatMessage]:
+        """Fetch specific chat messages in one query, keyed by id."""
+        ids = [int(message_id) for message_id in message_ids if message_id is not None]
+        if not ids:
+            return {}
+        with SQLSession(engine) as session:
+            rows = session.execute(select(ChatMessage).where(ChatMessage.id.in_(ids))).scalars().all()
+        return {row.id: row for row in rows}
+
     def create_session(self, session_id: str, user_id: str = "default", title: Optional[str] = None) -> ChatSession:
         with SQLSession(engine) as session:
             existing = session.get(ChatSession, session_id)
@@ -795,8 +985,7 @@ JSON:
             entities.append(f"Habit: {h.name} - Streak: {h.streak}")
         for d in decisions:
             entities.append(f"Decision: {d.question} - Outcome: {d.outcome}")
-        for ent in entities:
-            self.add_memory("entity", ent, ["graph", user_id])  # Tag for graph queries
+        self.add_memories("entity", entities, ["graph", user_id])  # Tag for graph queries
 
     def add_cbt_exercise(self, exercise: CbtExercise):
         with SQLSession(engine) as session:
@@ -831,7 +1020,11 @@ JSON:
 
     def mood_trend_analysis(self, user_id: str) -> Dict[str, Any]:
         # Simple trend: linear regression slope of mood over last 7 entries
-        recent_moods = self.get_recent_moods(user_id, limit=7)
+        return self.summarize_mood_trend(self.get_recent_moods(user_id, limit=7))
+
+    @staticmethod
+    def summarize_mood_trend(recent_moods: List[MoodEntry]) -> Dict[str, Any]:
+        """Trend summary for moods ordered newest first (as ``get_recent_moods`` returns)."""
         if not recent_moods or len(recent_moods) < 2:
             return {"trend": 0.0, "avg_mood": 0.0, "moods": [], "direction": "flat"}
         
@@ -1017,68 +1210,135 @@ JSON:
 
     # ── Memory Grooming (Phase 11) ──────────────────────────────────────
 
-    def groom_memory_graph(self, min_weight: float = 1.0, max_age_days: int = 90) -> Dict[str, int]:
+    def groom_memory_graph(
+        self,
+        min_weight: float = 1.0,
+        max_age_days: int = 90,
+        *,
+        batch_size: int = _GROOM_BATCH_SIZE,
+        progress: Optional[GroomProgressFn] = None,
+    ) -> Dict[str, int]:
         """Auto-prune weak graph connections and stale memories.
 
         - Removes Relationship edges with weight <= min_weight
         - Removes orphaned Entity nodes (no remaining relationships)
         - Removes episodic Memory entries older than max_age_days
-          (semantic memories like entities/summaries are kept)
+          (semantic memories like entities/summaries are kept), along with
+          their Chroma vectors
+
+        Each step is a set-based ``DELETE ... WHERE id IN (...)`` run in
+        batches of *batch_size* rows, committed per batch; *progress* is
+        called as ``progress(step, rows_so_far)`` after every batch.
 
-        Returns stats: {"relationships_pruned", "entities_pruned", "memories_pruned"}
+        Returns stats: {"relationships_pruned", "entities_pruned", "memories_pruned", "vectors_pruned"}
         """
         from datetime import datetime, timedelta as td
         cutoff = datetime.utcnow() - td(days=max_age_days)
-        stats = {"relationships_pruned": 0, "entities_pruned": 0, "memories_pruned": 0}
+        stats = {"relationships_pruned": 0, "entities_pruned": 0, "memories_pruned": 0, "vectors_pruned": 0}
 
-        with SQLSession(engine) as session:
-            # 1. Prune weak relationships
-            weak_rels = session.execute(
-                select(Relationship).where(Relationship.weight <= min_weight)
-            ).scalars().all()
-            for rel in weak_rels:
-                session.delete(rel)
-            stats["relationships_pruned"] = len(weak_rels)
-
-            # 2. Find orphaned entities (no relationships left)
-            all_entities = session.execute(select(Entity)).scalars().all()
-            for entity in all_entities:
-                has_rels = session.execute(
-                    select(Relationship).where(
-                        (Relationship.from_entity_id == entity.id) |
-                        (Relationship.to_entity_id == entity.id)
-                    ).limit(1)
-                ).scalar_one_or_none()
-                if not has_rels:
-                    session.delete(entity)
-                    stats["entities_pruned"] += 1
-
-            # 3. Prune old episodic memories (keep semantic)
-            old_memories = session.execute(
-                select(Memory).where(
-                    Memory.memory_type == "episodic",
-                    Memory.created_at < cutoff,
-                )
-            ).scalars().all()
-            for mem in old_memories:
-                session.delete(mem)
-            stats["memories_pruned"] = len(old_memories)
+        # 1. Prune weak relationships
+        stats["relationships_pruned"] = self._delete_in_batches(
+            Relationship, Relationship.weight <= min_weight,
+            step="relationships", batch_size=batch_size, progress=progress,
+        )
 
-            session.commit()
+        # 2. Prune orphaned entities (no relationships left)
+        has_edges = select(Relationship.id).where(
+            (Relationship.from_entity_id == Entity.id) | (Relationship.to_entity_id == Entity.id)
+        ).exists()
+        stats["entities_pruned"] = self._delete_in_batches(
+            Entity, ~has_edges,
+            step="entities", batch_size=batch_size, progress=progress,
+        )
 
+        # 3. Prune old episodic memories (keep semantic) and their vectors
+        def drop_vectors(ids: List[int]) -> None:
+            if not self.collection:
+                return
+            try:
+                self.collection.delete(ids=[str(i) for i in ids])
+                stats["vectors_pruned"] += len(ids)
+            except Exception as exc:
+                logging.warning("Failed to delete %d pruned memory vectors: %s", len(ids), exc)
+
+        stats["memories_pruned"] = self._delete_in_batches(
+            Memory, (Memory.memory_type == "episodic") & (Memory.created_at < cutoff),
+            step="memories", batch_size=batch_size, progress=progress, on_batch=drop_vectors,
+        )
+
+        if stats["entities_pruned"]:
+            _get_entity_index().invalidate()
+        _knowledge_graph.invalidate()
         return stats
 
-    def decay_relationships(self, decay_factor: float = 0.95):
+    @staticmethod
+    def _delete_in_batches(
+        model,
+        condition,
+        *,
+        step: str,
+        batch_size: int,
+        progress: Optional[GroomProgressFn] = None,
+        on_batch: Optional[Callable[[List[int]], None]] = None,
+    ) -> int:
+        """Delete rows of *model* matching *condition*, *batch_size* ids per commit."""
+        batch_size = max(1, int(batch_size))
+        total = 0
+        while True:
+            with SQLSession(engine) as session:
+                ids = session.execute(
+                    select(model.id).where(condition).order_by(model.id).limit(batch_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                session.execute(delete(model).where(model.id.in_(ids)))
+                session.commit()
+            if on_batch is not None:
+                on_batch(ids)
+            total += len(ids)
+            logging.info("Memory grooming: %s pruned %d", step, total)
+            if progress is not None:
+                progress(step, total)
+            if len(ids) < batch_size:
+                break
+        return total
+
+    def decay_relationships(
+        self,
+        decay_factor: float = 0.95,
+        *,
+        batch_size: int = _GROOM_BATCH_SIZE,
+        progress: Optional[GroomProgressFn] = None,
+    ) -> int:
         """Apply time-based decay to all relationship weights.
 
         Call periodically (e.g. daily via scheduler) to naturally weaken
-        connections that aren't reinforced by new co-occurrences.
+        connections that aren't reinforced by new co-occurrences. Runs as
+        set-based ``UPDATE`` statements over id windows of *batch_size* rows,
+        committed per window. Returns the number of relationships decayed.
         """
+        batch_size = max(1, int(batch_size))
+        total = 0
         with SQLSession(engine) as session:
-            all_rels = session.execute(select(Relationship)).scalars().all()
-            for rel in all_rels:
-                rel.weight *= decay_factor
-            session.commit()
+            low, high = session.execute(
+                select(func.min(Relationship.id), func.max(Relationship.id))
+            ).one()
+        if low is None:
+            return 0
+        for start in range(low, high + 1, batch_size):
+            with SQLSession(engine) as session:
+                result = session.execute(
+                    update(Relationship)
+                    .where(Relationship.id >= start, Relationship.id < start + batch_size)
+                    .values(weight=Relationship.weight * decay_factor)
+                )
+                session.commit()
+            total += result.rowcount or 0
+            if progress is not None:
+                progress("decay", total)
+        logging.info("Memory grooming: decayed %d relationships", total)
+        _knowledge_graph.scale_weights(decay_factor)
+        return total
 
     def analyze_activity_patterns(self, session_id: str, days: int = 30) -> Dict[str, Any]:
         """Analyze usual interaction times."""
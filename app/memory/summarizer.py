@@ -1,6 +1,6 @@
-import httpx
 from app.memory.store import MemoryStore
 from app.config import settings
+from services.ai_router import provider_clients
 
 class Summarizer:
     def __init__(self):
@@ -16,14 +16,13 @@ class Summarizer:
         history_text = "\n".join([f"{msg.role}: {msg.content}" for msg in messages])
         prompt = f"Summarize the following conversation:\n{history_text}\n\nSummary:"
         
-        with httpx.Client() as client:
-            response = client.post(
-                f"{self.ollama_host}/api/generate",
-                json={"model": "llama3.1", "prompt": prompt, "stream": False}
-            )
-            response.raise_for_status()
-            data = response.json()
-            summary = data["response"]
-            # Add to memory
-            self.memory_store.add_summary(session_id, summary)
-            return summary
+        response = provider_clients().http().post(
+            f"{self.ollama_host}/api/generate",
+            json={"model": "llama3.1", "prompt": prompt, "stream": False}
+        )
+        response.raise_for_status()
+        data = response.json()
+        summary = data["response"]
+        # Add to memory
+        self.memory_store.add_summary(session_id, summary)
+        return summary
@@ -17,7 +17,7 @@ import struct
 import wave
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 
 # Ledger retention: keep only the most recent N action entries on disk.
@@ -35,14 +35,17 @@ def _redact(text: str) -> Dict[str, Any]:
     }
 
 from app.api.models import ChatMessage, ChatResponse, ToolCall
+from app.blocking import blocking_pool
 from app.tools.types import ApprovedToolExecution
 from app.config import settings
 from app.memory.store import MemoryStore
 from app.orchestrator.agents.planner import PlannerAgent
 from app.orchestrator.agents.memory_retriever import MemoryRetrieverAgent
 from app.orchestrator.agents.executor import ExecutorAgent
-from app.orchestrator.agents.tool_planner import LLMToolPlanner
+from app.orchestrator.agents.tool_planner import LLMToolPlanner, ToolPlan
 from app.orchestrator.agents.conversation import ConversationAgent
+from app.orchestrator.stages import Stage, StageRunner
+from app.orchestrator.turn_context import TurnContext
 from app.orchestrator.security.prompt_guard import PromptGuard
 from app.orchestrator.audit import AuditLogger
 
@@ -64,6 +67,7 @@ class Agent:
         self._executor = ExecutorAgent()
         self._tool_planner = LLMToolPlanner(self._executor.registry)
         self._conversation = ConversationAgent()
+        self._stages = StageRunner(max_workers=settings.reply_stage_workers)
 
         # Security & audit
         self._prompt_guard = PromptGuard()
@@ -90,20 +94,62 @@ class Agent:
         user_msg = guard_result.text
         threats_detected = guard_result.threats_detected
 
+        # Per-turn read cache shared by every sub-agent. The craving read below
+        # runs before the user message is persisted, so later stages see the
+        # same pre-message absence.
+        turn = TurnContext(self.memory_store, session_id)
+
         # Compute craving state for UI feedback (Phase 9.2)
         from app.orchestrator.craving_engine import CravingEngine
-        _craving = CravingEngine(self.memory_store)
+        _craving = CravingEngine(turn)
         craving_score = _craving.calculate_craving(session_id)
         is_return, _ = _craving.get_return_bonus(session_id)
 
         # Persist the incoming user message
         user_record = self.memory_store.add_chat_message(session_id, "user", user_msg)
 
-        # 1. Memory Retriever — gather context (also yields the emotional read)
-        context = self._memory_retriever.retrieve_context(
-            session_id, user_msg, chat_history, self.memory_store
+        # A requested knowledge-graph rebuild writes, so it runs before the
+        # read-only stages below (and so graph search already sees it).
+        graph_note = self._memory_retriever.refresh_knowledge_graph(user_msg, turn)
+
+        # 1-3. Retrieval, planner enrichment and tool planning only share the
+        # sanitized message and the cheap emotional read, so they run
+        # concurrently and are merged below in a fixed order.
+        sentiment, avg_mood = self._memory_retriever.emotional_read(user_msg, turn)
+        stages = self._stages.run(
+            [
+                Stage(
+                    "retrieval",
+                    lambda: self._memory_retriever.retrieve_context(session_id, user_msg, chat_history, turn),
+                    settings.reply_retrieval_deadline_s,
+                    fallback=lambda: self._memory_retriever.fallback_context(sentiment, avg_mood),
+                ),
+                Stage(
+                    "planner",
+                    lambda: self._planner.enrich(
+                        session_id,
+                        user_msg,
+                        chat_history,
+                        turn,
+                        avg_mood=avg_mood,
+                        sentiment=sentiment,
+                    ),
+                    settings.reply_planner_deadline_s,
+                    fallback=dict,
+                ),
+                Stage(
+                    "tool_plan",
+                    lambda: self._plan_tools(user_msg),
+                    settings.reply_tools_deadline_s,
+                ),
+            ],
+            parallel=settings.reply_parallel_stages,
         )
 
+        # 1. Memory Retriever — context (also yields the emotional read)
+        context = stages["retrieval"].value
+        context.profile_info += graph_note
+
         # Store the user message as memory, tagged with the emotional context at
         # the time so retrieval can later surface emotionally salient moments.
         self.memory_store.add_memory(
@@ -114,28 +160,15 @@ class Agent:
             mood=context.avg_mood,
         )
 
-        # 2. Planner — assemble proactive-planning context
-        planner_ctx = self._planner.enrich(
-            session_id,
-            user_msg,
-            chat_history,
-            self.memory_store,
-            avg_mood=context.avg_mood,
-            sentiment=context.sentiment,
-        )
-        # Merge planner context into profile_info
-        for value in planner_ctx.values():
+        # 2. Planner — merge proactive-planning context into profile_info
+        for value in stages["planner"].value.values():
             if value:
                 context.profile_info += " " + value
 
-        # 3. Executor — dispatch tools
-        tool_calls = None
-        if settings.tool_planning_enabled and self._tool_planner.is_candidate(user_msg):
-            tool_plan = self._tool_planner.plan(user_msg)
-            if tool_plan.valid:
-                tool_calls = self._executor.execute_proposals(tool_plan.proposals)
-        if tool_calls is None:
-            tool_calls = self._executor.execute_tools(user_msg, session_id)
+        # 3. Executor — tools have side effects (mood/goal writes, approval
+        # requests), so they run to completion here rather than in the fan-out,
+        # where a missed deadline would leave them committing unreported.
+        tool_calls = self._execute_tools(stages["tool_plan"].value, user_msg, session_id)
 
         # 4. Conversation — generate LLM reply
         memory_context = context.memory_context
@@ -150,7 +183,7 @@ class Agent:
             attachment_contexts=attachment_contexts or [],
             tool_calls=tool_calls,
             session_id=session_id,
-            memory_store=self.memory_store,
+            memory_store=turn,
             avg_mood=context.avg_mood,
             on_token=on_token,
         )
@@ -181,6 +214,11 @@ class Agent:
             tool_calls=[tc.dict() for tc in tool_calls],
             threats_detected=threats_detected,
             latency_ms=_elapsed_ms,
+            stage_timings_ms={
+                **{f"stage.{name}": result.elapsed_ms for name, result in stages.items()},
+                **{f"retrieval.{stage}": ms for stage, ms in context.retrieval_timings.items()},
+            },
+            context_tokens=reply_payload.context_tokens,
         )
 
         return ChatResponse(
@@ -197,6 +235,36 @@ class Agent:
             assistant_timestamp=assistant_record.timestamp.isoformat(),
         )
 
+    async def areply(
+        self,
+        chat_history: List[ChatMessage],
+        user_msg: str,
+        session_id: str,
+        **kwargs: Any,
+    ) -> ChatResponse:
+        """``reply`` for async callers, run on the bounded ``reply`` pool.
+
+        The turn never touches the event loop, and at most
+        ``settings.chat_turn_workers`` turns run at once.
+        """
+        return await blocking_pool("reply").run(self.reply, chat_history, user_msg, session_id, **kwargs)
+
+    def _plan_tools(self, user_msg: str) -> Optional[ToolPlan]:
+        """Plan tools with the LLM planner when the message looks like a tool
+        request. Planning has no side effects, so it can be abandoned."""
+        if settings.tool_planning_enabled and self._tool_planner.is_candidate(user_msg):
+            return self._tool_planner.plan(user_msg)
+        return None
+
+    def _execute_tools(
+        self, tool_plan: Optional[ToolPlan], user_msg: str, session_id: str
+    ) -> List[ToolCall]:
+        """Execute a valid plan, falling back to keyword dispatch (also when
+        planning was skipped or missed its deadline)."""
+        if tool_plan is not None and tool_plan.valid:
+            return self._executor.execute_proposals(tool_plan.proposals)
+        return self._executor.execute_tools(user_msg, session_id)
+
     # ── persona filter (delegated) ────────────────────────────────────────
 
     def run_tool(self, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
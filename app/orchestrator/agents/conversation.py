@@ -14,7 +14,7 @@ from pathlib import Path
 from typing import Any, Callable, Dict, List, TYPE_CHECKING
 
 from app.config import DEFAULT_USER_ID, settings
-from services.ai_router import route_request
+from services.ai_router import provider_clients, route_request
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +23,9 @@ if TYPE_CHECKING:
     from app.api.models import ChatMessage, ToolCall
 
 
+from app.orchestrator.context_budget import ContextAssembler, Section, summarize_tool_calls
 from app.orchestrator.craving_engine import CravingEngine
+from app.orchestrator.prompt_layout import build_prompt_layout, split_persona
 
 
 @dataclass
@@ -32,6 +34,7 @@ class ConversationReply:
     provider: str = ""
     route: List[str] = field(default_factory=list)
     errors: List[Dict[str, Any]] = field(default_factory=list)
+    context_tokens: Dict[str, Any] = field(default_factory=dict)
 
 class ConversationAgent:
     """Builds the LLM prompt, generates a reply, and appends post-response nudges."""
@@ -104,54 +107,53 @@ class ConversationAgent:
                     if ex.user_message and ex.assistant_message
                 )
                 if examples:
-                    few_shot_block = f"\nExchanges the user liked (learn from these):\n{examples}\n"
+                    few_shot_block = f"Exchanges the user liked (learn from these):\n{examples}"
         except Exception:
             pass
 
-        # ── build system message ──────────────────────────────────────────
-        system_msg = (
-            f"{profile_info}\n\n"
-            f"{mood_injection}\n\n"
-            f"{memory_context}\n"
-            f"{few_shot_block}"
-        ).strip()
-
-        # Tool results context
-        tool_context = ""
-        if tool_calls:
-            tool_context = (
-                "\nTool results: "
-                + json.dumps([tc.dict() for tc in tool_calls], indent=2)
-            )
-        if tool_context:
-            system_msg += "\n" + tool_context
-
-        # ── build chat messages ───────────────────────────────────────────
-        recent_history = chat_history[-10:]
-        messages = [{"role": "system", "content": system_msg}]
-        for msg in recent_history:
-            role = "user" if msg.role == "user" else "assistant"
-            messages.append({"role": role, "content": msg.content})
-        # Add current user message
-        messages.append(
-            {
-                "role": "user",
-                "content": self._build_user_turn(user_msg, attachment_contexts),
-            }
+        # ── fit every section into the token budget ───────────────────────
+        persona, turn_profile = split_persona(profile_info)
+        history = [
+            {"role": "user" if msg.role == "user" else "assistant", "content": msg.content}
+            for msg in chat_history[-10:]
+        ]
+        fitted = ContextAssembler().assemble(
+            {"persona": persona, "user": user_msg.strip()},
+            [
+                Section("craving", 0, 0.10, text=mood_injection),
+                Section("context", 1, 0.25, text=turn_profile),
+                Section("tools", 2, 0.20, text=summarize_tool_calls(tool_calls)),
+                Section("attachments", 2, 0.25, items=list(attachment_contexts)),
+                Section("memory", 3, 0.15, text=memory_context),
+                Section("history", 4, 0.35, messages=history),
+                Section("few_shot", 5, 0.10, text=few_shot_block),
+            ],
+        )
+        texts = fitted.texts
+
+        # ── build chat messages (static persona first, per-turn context last) ──
+        layout = build_prompt_layout(
+            persona,
+            [texts["context"], texts["craving"], texts["memory"], texts["few_shot"], texts["tools"]],
+            fitted.messages["history"],
+            self._build_user_turn(user_msg, fitted.items["attachments"]),
         )
 
         # ── LLM inference via OpenAI ──────────────────────────────────────
         log_entry: Dict[str, Any] = {
             "ts": datetime.utcnow().isoformat(),
             "model": settings.model_chat,
+            "prefix_hash": layout.prefix_hash,
             "error": None,
         }
 
         try:
             routed = route_request(
-                self._build_router_prompt(messages),
+                layout.flatten(),
                 {
                     "mood": "supportive" if avg_mood < 5 else "playful",
+                    "messages": layout.messages,
+                    "prefix_hash": layout.prefix_hash,
                 },
                 on_token=on_token,
             )
@@ -159,6 +161,7 @@ class ConversationAgent:
             log_entry["provider"] = routed["model_used"]
             log_entry["route"] = routed.get("route", [])
             log_entry["errors"] = routed.get("errors", [])
+            log_entry["usage"] = routed.get("usage", {})
         except Exception as e:
             reply = (
                 f"I'm having trouble connecting right now... ({e}). "
@@ -182,6 +185,7 @@ class ConversationAgent:
             provider=log_entry.get("provider", ""),
             route=log_entry.get("route", []),
             errors=log_entry.get("errors", []),
+            context_tokens=fitted.report(),
         )
 
     # ── proactive generation ──────────────────────────────────────────────
@@ -224,22 +228,10 @@ class ConversationAgent:
     # ── private helpers ───────────────────────────────────────────────────
 
     def _ensure_client(self):
-        """Lazy-load the OpenAI client."""
+        """The shared, pooled OpenAI client (None without an API key)."""
         if self._client is not None:
             return self._client
-
-        from openai import OpenAI
-        self._client = OpenAI(api_key=settings.openai_api_key)
-        return self._client
-
-    @staticmethod
-    def _build_router_prompt(messages: List[Dict[str, str]]) -> str:
-        parts = []
-        for msg in messages:
-            role = msg.get("role", "user").upper()
-            content = msg.get("content", "")
-            parts.append(f"[{role}]\n{content}")
-        return "\n\n".join(parts)
+        return provider_clients().openai()
 
     @staticmethod
     def _build_user_turn(user_msg: str, attachment_contexts: List[str]) -> str:
@@ -7,7 +7,7 @@ knowledge-graph operations, and memory search from Agent.reply().
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, TYPE_CHECKING
+from typing import Any, Dict, List, Tuple, TYPE_CHECKING
 
 from app.user_model.context import UserModelPromptFormatter
 
@@ -25,6 +25,7 @@ class ContextBundle:
     avg_mood: float = 5.0
     memory_context: str = ""
     relevant_memories: List[Dict[str, Any]] = field(default_factory=list)
+    retrieval_timings: Dict[str, float] = field(default_factory=dict)
 
 
 class MemoryRetrieverAgent:
@@ -49,13 +50,8 @@ class MemoryRetrieverAgent:
         bundle = ContextBundle()
         user_id = DEFAULT_USER_ID
 
-        # 1. Sentiment analysis
-        bundle.sentiment = self._analyze_sentiment(user_msg)
-
-        # 2. Recent mood average
-        # This updates bundle.profile_info with mood warnings, but we'll reset profile_info soon.
-        # We should calculate avg_mood purely here.
-        bundle.avg_mood = self._compute_avg_mood_score(user_id, memory_store)
+        # 1-2. Sentiment analysis and recent mood average
+        bundle.sentiment, bundle.avg_mood = self.emotional_read(user_msg, memory_store)
 
         # 3. User Profile & Idle Time
         profile = memory_store.get_user_profile(user_id)
@@ -113,13 +109,11 @@ class MemoryRetrieverAgent:
         # 7. News / weather on request
         bundle.profile_info += self._maybe_fetch_news_weather(user_msg)
 
-        # 8. Knowledge graph on trigger
-        if "graph" in user_msg.lower() or "connections" in user_msg.lower():
-            memory_store.populate_knowledge_graph(user_id)
-            bundle.profile_info += "\n[System Note]: Knowledge graph updated."
-
-        # 9. Graph RAG search
-        bundle.relevant_memories = memory_store.graph_rag_search(user_msg, k=3)
+        # 8. Graph RAG search (a requested knowledge-graph refresh has already
+        # run; see refresh_knowledge_graph)
+        bundle.relevant_memories = memory_store.graph_rag_search(
+            user_msg, k=3, timings=bundle.retrieval_timings
+        )
         if bundle.relevant_memories:
             bundle.memory_context = (
                 "Relevant past context:\n"
@@ -150,6 +144,44 @@ class MemoryRetrieverAgent:
             return " (they were upbeat then)"
         return ""
 
+    def emotional_read(self, user_msg: str, memory_store: MemoryStore) -> Tuple[str, float]:
+        """Cheap ``(sentiment, avg_mood)`` read, available before full retrieval."""
+        from app.config import DEFAULT_USER_ID
+
+        return self._analyze_sentiment(user_msg), self._compute_avg_mood_score(DEFAULT_USER_ID, memory_store)
+
+    @staticmethod
+    def refresh_knowledge_graph(user_msg: str, memory_store: MemoryStore) -> str:
+        """Rebuild the knowledge graph when the user asks about it.
+
+        Kept out of ``retrieve_context`` because that runs as a reply stage
+        that may be abandoned at its deadline and must not write. Returns the
+        system note to add to the profile context, or an empty string.
+        """
+        from app.config import DEFAULT_USER_ID
+
+        lowered = user_msg.lower()
+        if "graph" not in lowered and "connections" not in lowered:
+            return ""
+        memory_store.populate_knowledge_graph(DEFAULT_USER_ID)
+        return "\n[System Note]: Knowledge graph updated."
+
+    @staticmethod
+    def fallback_context(sentiment: str = "neutral", avg_mood: float = 5.0) -> ContextBundle:
+        """Core prompt only, for when retrieval misses its deadline."""
+        from app.config import JOI_CORE_PROMPT
+
+        return ContextBundle(
+            profile_info=JOI_CORE_PROMPT.format(
+                profile_summary="Unknown",
+                avg_mood=f"{avg_mood:.1f}",
+                relationship_level="Acquaintance",
+                idle_hours=0.0,
+            ),
+            sentiment=sentiment,
+            avg_mood=avg_mood,
+        )
+
     # ── private helpers ───────────────────────────────────────────────────
 
     @staticmethod
@@ -14,6 +14,11 @@ if TYPE_CHECKING:
     from app.api.models import ChatMessage
 
 
+def _history_length(chat_history: List[ChatMessage]) -> int:
+    """Full session length, even when only a window of history was loaded."""
+    return getattr(chat_history, "total", len(chat_history))
+
+
 class PlannerAgent:
     """Assembles proactive-planning context that gets merged into the LLM prompt."""
 
@@ -125,7 +130,7 @@ class PlannerAgent:
 
     @staticmethod
     def _health_nudge(chat_history: List[ChatMessage]) -> str:
-        if len(chat_history) > 10:
+        if _history_length(chat_history) > 10:
             return "You've been chatting a while—take a break, hydrate, or stretch!"
         return ""
 
@@ -139,7 +144,7 @@ class PlannerAgent:
         trigger = (
             "why" in user_msg.lower()
             or "correlation" in user_msg.lower()
-            or len(chat_history) % 5 == 0
+            or _history_length(chat_history) % 5 == 0
         )
         if not trigger:
             return ""
@@ -168,7 +173,7 @@ class PlannerAgent:
         chat_history: List[ChatMessage],
         memory_store: MemoryStore,
     ) -> str:
-        if len(chat_history) % 10 != 0:
+        if _history_length(chat_history) % 10 != 0:
             return ""
 
         trend = memory_store.mood_trend_analysis(user_id)
@@ -32,6 +32,8 @@ class DecisionTrace:
     tool_calls: List[Dict[str, Any]]
     threats_detected: List[str]
     latency_ms: int
+    stage_timings_ms: Dict[str, float] = field(default_factory=dict)
+    context_tokens: Dict[str, Any] = field(default_factory=dict)  # per-section prompt token usage
 
 
 class AuditLogger:
@@ -51,6 +53,8 @@ class AuditLogger:
         threats_detected: List[str],
         latency_ms: int,
         llm_prompt: Optional[str] = None,
+        stage_timings_ms: Optional[Dict[str, float]] = None,
+        context_tokens: Optional[Dict[str, Any]] = None,
     ) -> DecisionTrace:
         """Create and persist a decision trace.  Returns the trace object."""
         prompt_hash = (
@@ -69,6 +73,8 @@ class AuditLogger:
             tool_calls=tool_calls,
             threats_detected=threats_detected,
             latency_ms=latency_ms,
+            stage_timings_ms=dict(stage_timings_ms or {}),
+            context_tokens=dict(context_tokens or {}),
         )
 
         try:
@@ -0,0 +1,238 @@
+"""Context budget — token-counted, priority-truncated prompt sections.
+
+The reply prompt is assembled from the persona, per-turn context, craving
+state, memories, tool results, attachments, few-shot examples and chat
+history. None of them had a size limit, so a single large tool result or
+attachment could push the prompt past ``gguf_n_ctx``: local generation
+then slowed to a crawl or failed outright.
+
+``ContextAssembler`` counts tokens with the tokenizer of the provider that
+will most likely serve the turn (the loaded GGUF model's own vocabulary,
+``tiktoken`` for OpenAI when installed, a characters-per-token estimate
+otherwise). It then fits the sections into the budget:
+
+- required sections (persona, the user's own text) are always kept whole;
+- optional sections are visited by priority, and each takes at most its
+  ``share`` of the space the required sections leave, and never more than
+  what is still free, so low-priority sections are the first to shrink;
+- text is cut at a line boundary when possible and marked as truncated,
+  and chat history drops its oldest messages first.
+
+Per-section token usage is returned for the decision trace.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+try:
+    import tiktoken  # type: ignore
+
+    _TIKTOKEN_AVAILABLE = True
+except ImportError:
+    _TIKTOKEN_AVAILABLE = False
+
+TRUNCATION_MARK = " …[truncated]"
+# Rough English average; deliberately a little pessimistic.
+_CHARS_PER_TOKEN = 3.5
+_DEFAULT_CLOUD_BUDGET = 12000
+_TOOL_RESULT_CHARS = 600
+
+Message = Dict[str, str]
+
+
+@dataclass
+class TokenCounter:
+    """A named token-counting function."""
+
+    name: str
+    count: Callable[[str], int]
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text) / _CHARS_PER_TOKEN + 0.999) if text else 0
+
+
+def _gguf_counter() -> Optional[TokenCounter]:
+    # Only reuse a model that is already loaded; never load one just to count.
+    from services import llama_local
+
+    count = llama_local.token_counter()
+    return TokenCounter("gguf", count) if count is not None else None
+
+
+def _tiktoken_counter() -> Optional[TokenCounter]:
+    if not _TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        encoding = tiktoken.encoding_for_model("gpt-4o")
+    except Exception:
+        encoding = tiktoken.get_encoding("o200k_base")
+    return TokenCounter("tiktoken", lambda text: len(encoding.encode(text, disallowed_special=())) if text else 0)
+
+
+def token_counter() -> TokenCounter:
+    """Counter for the provider that leads the route: GGUF when configured, else OpenAI."""
+    counter = _gguf_counter() if settings.gguf_model_path else _tiktoken_counter()
+    return counter or TokenCounter("estimate", estimate_tokens)
+
+
+def default_budget() -> int:
+    if settings.context_token_budget > 0:
+        return settings.context_token_budget
+    if settings.gguf_model_path:
+        return max(256, settings.gguf_n_ctx - settings.context_reply_reserve_tokens)
+    return _DEFAULT_CLOUD_BUDGET
+
+
+def summarize_tool_calls(tool_calls: Sequence[Any], max_result_chars: int = _TOOL_RESULT_CHARS) -> str:
+    """One compact line per tool call instead of an indented JSON dump."""
+    lines = []
+    for tc in tool_calls:
+        data = tc.model_dump() if hasattr(tc, "model_dump") else dict(tc)
+        args = json.dumps(data.get("args") or {}, separators=(",", ":"), default=str)
+        line = f"- {data.get('tool_name')}({args}) [{data.get('status', 'success')}]"
+        result = data.get("result")
+        if result is not None:
+            compact = json.dumps(result, separators=(",", ":"), default=str)
+            if len(compact) > max_result_chars:
+                compact = compact[:max_result_chars] + TRUNCATION_MARK
+            line += f": {compact}"
+        lines.append(line)
+    return "Tool results:\n" + "\n".join(lines) if lines else ""
+
+
+@dataclass
+class Section:
+    """One optional prompt section. ``items`` are chat messages or attachments."""
+
+    name: str
+    priority: int
+    share: float
+    text: str = ""
+    messages: Optional[List[Message]] = None
+    items: Optional[List[str]] = None
+
+
+@dataclass
+class AssembledContext:
+    texts: Dict[str, str] = field(default_factory=dict)
+    messages: Dict[str, List[Message]] = field(default_factory=dict)
+    items: Dict[str, List[str]] = field(default_factory=dict)
+    usage: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    budget: int = 0
+    counter: str = ""
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(entry["tokens"] for entry in self.usage.values())
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "total": self.total_tokens,
+            "counter": self.counter,
+            "sections": self.usage,
+        }
+
+
+class ContextAssembler:
+    """Fits prompt sections into a token budget by priority."""
+
+    def __init__(self, counter: Optional[TokenCounter] = None, budget: Optional[int] = None) -> None:
+        self.counter = counter or token_counter()
+        self.budget = budget if budget is not None else default_budget()
+
+    def assemble(self, required: Dict[str, str], sections: Sequence[Section]) -> AssembledContext:
+        out = AssembledContext(budget=self.budget, counter=self.counter.name)
+        used = 0
+        for name, text in required.items():
+            tokens = self.counter.count(text)
+            out.texts[name] = text
+            out.usage[name] = {"tokens": tokens, "cap": None, "truncated": False}
+            used += tokens
+        if used > self.budget:
+            log.warning("Required prompt sections alone use %d of %d tokens", used, self.budget)
+
+        available = max(0, self.budget - used)
+        free = available
+        for section in sorted(sections, key=lambda s: s.priority):
+            cap = min(int(available * section.share), free)
+            if section.messages is not None:
+                kept, tokens, truncated = self._fit_messages(section.messages, cap)
+                out.messages[section.name] = kept
+            elif section.items is not None:
+                kept, tokens, truncated = self._fit_items(section.items, cap)
+                out.items[section.name] = kept
+            else:
+                text, tokens, truncated = self._fit_text(section.text, cap)
+                out.texts[section.name] = text
+            out.usage[section.name] = {"tokens": tokens, "cap": cap, "truncated": truncated}
+            free -= tokens
+        return out
+
+    # ── internals ─────────────────────────────────────────────────────────
+
+    def _fit_text(self, text: str, cap: int) -> tuple:
+        text = (text or "").strip()
+        tokens = self.counter.count(text)
+        if tokens <= cap:
+            return text, tokens, False
+        if cap <= self.counter.count(TRUNCATION_MARK):
+            return "", 0, True
+        # Scale by the observed chars/token ratio, then shrink until it fits.
+        limit = int(len(text) * cap / tokens)
+        while limit > 0:
+            cut = text[:limit]
+            newline = cut.rfind("\n")
+            if newline > limit // 2:
+                cut = cut[:newline]
+            candidate = cut.rstrip() + TRUNCATION_MARK
+            count = self.counter.count(candidate)
+            if count <= cap:
+                return candidate, count, True
+            limit = int(limit * 0.9)
+        return "", 0, True
+
+    def _fit_messages(self, messages: List[Message], cap: int) -> tuple:
+        kept: List[Message] = []
+        tokens = 0
+        for msg in reversed(messages):  # newest first
+            count = self.counter.count(msg["content"])
+            if tokens + count > cap:
+                if not kept:
+                    # Keep a truncated latest message rather than no history at all.
+                    text, count, _ = self._fit_text(msg["content"], cap)
+                    if text:
+                        kept.append({**msg, "content": text})
+                        tokens += count
+                return list(reversed(kept)), tokens, True
+            kept.append(msg)
+            tokens += count
+        return list(reversed(kept)), tokens, False
+
+    def _fit_items(self, items: List[str], cap: int) -> tuple:
+        items = [item for item in items if item and item.strip()]
+        if not items:
+            return [], 0, False
+        # Smallest first, each taking an even split of what is left, so short
+        # items stay whole and their slack goes to the long ones.
+        fitted: Dict[int, str] = {}
+        tokens = 0
+        truncated = False
+        order = sorted(range(len(items)), key=lambda i: len(items[i]))
+        for position, index in enumerate(order):
+            share = (cap - tokens) // (len(order) - position)
+            text, count, cut = self._fit_text(items[index], share)
+            truncated = truncated or cut
+            if text:
+                fitted[index] = text
+                tokens += count
+        return [fitted[i] for i in sorted(fitted)], tokens, truncated
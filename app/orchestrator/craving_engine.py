@@ -87,7 +87,11 @@ class CravingEngine:
         Maps to entries in settings.yaml sentiment_mapping:
         'satisfied', 'missing', 'needy', 'clingy'
         """
-        score = self.calculate_craving(session_id)
+        return self.expression_for_score(self.calculate_craving(session_id))
+
+    @staticmethod
+    def expression_for_score(score: float) -> str:
+        """Avatar expression key for an already-computed craving score."""
         if score < 20:
             return "satisfied"
         elif score < 60:
@@ -3,9 +3,8 @@ from __future__ import annotations
 import re
 from typing import Any, Dict, List
 
-import httpx
-
 from app.config import settings
+from services.ai_router import provider_clients
 
 
 TIME_BLOCK_RE = re.compile(r"^\s*(?P<time>[^:]+?)\s*:\s*(?P<activity>.+?)\s*$")
@@ -51,18 +50,17 @@ def generate_day_plan(
     provider = "fallback"
     raw_plan = ""
     try:
-        with httpx.Client(timeout=settings.router_timeout) as client:
-            response = client.post(
-                f"{settings.ollama_host}/api/generate",
-                json={
-                    "model": settings.model_ollama,
-                    "prompt": prompt,
-                    "stream": False,
-                },
-            )
-            response.raise_for_status()
-            raw_plan = response.json().get("response", "")
-            provider = "ollama"
+        response = provider_clients().http().post(
+            f"{settings.ollama_host}/api/generate",
+            json={
+                "model": settings.model_ollama,
+                "prompt": prompt,
+                "stream": False,
+            },
+        )
+        response.raise_for_status()
+        raw_plan = response.json().get("response", "")
+        provider = "ollama"
     except Exception:
         raw_plan = _fallback_plan(key_tasks, focus_areas, energy_level)
 
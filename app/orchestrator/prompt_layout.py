@@ -0,0 +1,89 @@
+"""Prompt layout — structured chat messages with a cache-friendly prefix.
+
+The reply prompt used to be one flattened string whose system block opened
+with volatile content (craving state, mood notes, memory context, tool
+JSON), so no two turns shared a prefix and neither provider prompt caching
+(OpenAI, Gemini) nor llama.cpp KV reuse could ever hit.
+
+``build_prompt_layout`` orders the messages from most to least stable:
+
+1. the static persona (``JOI_PERSONA_PROMPT``), identical on every turn;
+2. the recent chat history;
+3. one system message with everything that changes per turn;
+4. the current user turn.
+
+``prefix_hash`` fingerprints the static messages so callers can log which
+prefix a request carried and correlate it with the cached-token counts
+the providers report. Providers that take a single prompt string get
+``flatten()``, which keeps the same order.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from app.config import JOI_PERSONA_PROMPT
+
+Message = Dict[str, str]
+
+
+@dataclass
+class PromptLayout:
+    """Chat messages for one turn plus the fingerprint of their static prefix."""
+
+    messages: List[Message] = field(default_factory=list)
+    static_count: int = 0
+    prefix_hash: str = ""
+
+    @property
+    def static_chars(self) -> int:
+        return sum(len(msg["content"]) for msg in self.messages[: self.static_count])
+
+    def flatten(self) -> str:
+        """Single-string prompt for completion-style providers, same order."""
+        return "\n\n".join(f"[{msg['role'].upper()}]\n{msg['content']}" for msg in self.messages)
+
+
+def split_persona(profile_info: str, persona: str = JOI_PERSONA_PROMPT) -> Tuple[str, str]:
+    """Split *profile_info* into ``(static persona, per-turn remainder)``.
+
+    The retriever builds ``profile_info`` as the persona followed by context
+    keys, user-model notes and situational notes. Anything that does not
+    start with the persona is treated as entirely per-turn.
+    """
+    if persona and profile_info.startswith(persona):
+        return persona.strip(), profile_info[len(persona):].strip()
+    return "", profile_info.strip()
+
+
+def prefix_hash(messages: Sequence[Message]) -> str:
+    digest = hashlib.sha256()
+    for msg in messages:
+        digest.update(msg["role"].encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(msg["content"].encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:16]
+
+
+def build_prompt_layout(
+    static_system: str,
+    dynamic_blocks: Iterable[str],
+    history: Iterable[Message],
+    user_turn: str,
+) -> PromptLayout:
+    """Assemble the turn's messages, stable content first."""
+    static: List[Message] = []
+    if static_system.strip():
+        static.append({"role": "system", "content": static_system.strip()})
+
+    messages = list(static)
+    messages.extend({"role": msg["role"], "content": msg["content"]} for msg in history)
+    dynamic = "\n\n".join(block.strip() for block in dynamic_blocks if block and block.strip())
+    if dynamic:
+        messages.append({"role": "system", "content": dynamic})
+    messages.append({"role": "user", "content": user_turn})
+
+    return PromptLayout(messages=messages, static_count=len(static), prefix_hash=prefix_hash(static))
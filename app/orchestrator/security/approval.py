@@ -12,7 +12,7 @@ from threading import RLock
 from typing import Any, Dict, List, Optional
 
 from app.orchestrator.policies import DESTRUCTIVE_TOOLS
-from app.persistence import read_json, write_json_atomic
+from app.persistence import StateTable
 from app.tools.types import (
     ApprovedToolExecution,
     ToolOperation,
@@ -89,6 +89,7 @@ class ToolApprovalManager:
 
     def __init__(self, path: Path | None = None) -> None:
         self.path = path
+        self._table = StateTable(path) if path is not None else None
         self._store: Dict[str, PendingApproval] = {}
         self._lock = RLock()
         self._load()
@@ -123,7 +124,7 @@ class ToolApprovalManager:
         )
         with self._lock:
             self._store[pending.id] = pending
-            self._persist()
+            self._persist(pending)
         return pending.id
 
     def request_approval(
@@ -164,7 +165,7 @@ class ToolApprovalManager:
         )
         with self._lock:
             self._store[pending.id] = pending
-            self._persist()
+            self._persist(pending)
         return pending.id
 
     def approve_for_execution(
@@ -186,7 +187,7 @@ class ToolApprovalManager:
             if actual_fingerprint != pending.args_fingerprint:
                 pending.status = ApprovalStatus.INVALID
                 pending.resolved_at = current.isoformat()
-                self._persist()
+                self._persist(pending)
                 raise ApprovalResolutionError(
                     "Approval arguments changed after preview",
                     code="arguments_changed",
@@ -203,7 +204,7 @@ class ToolApprovalManager:
                 arguments_sha256=pending.args_fingerprint,
                 idempotency_key=pending.idempotency_key,
             )
-            self._persist()
+            self._persist(pending)
             return execution
 
     def approve(self, pending_id: str, *, proposal_id: str) -> PendingApproval:
@@ -226,7 +227,7 @@ class ToolApprovalManager:
             pending = self._require_pending(pending_id, proposal_id=proposal_id, now=current)
             pending.status = ApprovalStatus.DENIED
             pending.resolved_at = current.isoformat()
-            self._persist()
+            self._persist(pending)
             return pending
 
     def _require_pending(
@@ -246,7 +247,7 @@ class ToolApprovalManager:
         if _parse_datetime(pending.expires_at) <= now:
             pending.status = ApprovalStatus.EXPIRED
             pending.resolved_at = now.isoformat()
-            self._persist()
+            self._persist(pending)
             raise ApprovalResolutionError("Approval expired", code="expired")
         return pending
 
@@ -262,7 +263,7 @@ class ToolApprovalManager:
     def get_pending(self, session_id: Optional[str] = None) -> List[PendingApproval]:
         with self._lock:
             current = _utc_now()
-            changed = False
+            expired = []
             for approval in self._store.values():
                 if (
                     approval.status == ApprovalStatus.PENDING
@@ -270,9 +271,8 @@ class ToolApprovalManager:
                 ):
                     approval.status = ApprovalStatus.EXPIRED
                     approval.resolved_at = current.isoformat()
-                    changed = True
-            if changed:
-                self._persist()
+                    expired.append(approval)
+            self._persist(*expired)
             return [
                 approval
                 for approval in self._store.values()
@@ -293,16 +293,15 @@ class ToolApprovalManager:
             ]
             for pending_id in resolved_ids:
                 del self._store[pending_id]
-            self._persist()
+            if self._table is not None:
+                self._table.delete(*resolved_ids)
             return len(resolved_ids)
 
     def _load(self) -> None:
-        if self.path is None:
+        if self._table is None:
             return
-        raw = read_json(self.path, [])
-        if not isinstance(raw, list):
-            return
-        for item in raw:
+        self._table.migrate_json(self._legacy_rows)
+        for item in self._table.values():
             try:
                 approval = PendingApproval(
                     id=str(item["id"]),
@@ -326,30 +325,34 @@ class ToolApprovalManager:
                 continue
             self._store[approval.id] = approval
 
-    def _persist(self) -> None:
-        if self.path is None:
+    @staticmethod
+    def _legacy_rows(raw: Any) -> List[tuple]:
+        if not isinstance(raw, list):
+            return []
+        return [(str(item["id"]), item) for item in raw if isinstance(item, dict) and item.get("id")]
+
+    def _persist(self, *approvals: PendingApproval) -> None:
+        if self._table is None:
             return
-        write_json_atomic(
-            self.path,
-            [
-                {
-                    "id": approval.id,
-                    "proposal_id": approval.proposal_id,
-                    "tool_name": approval.tool_name,
-                    "operation": approval.operation,
-                    "args": approval.args,
-                    "preview": approval.preview,
-                    "redacted_preview": approval.redacted_preview,
-                    "args_fingerprint": approval.args_fingerprint,
-                    "session_id": approval.session_id,
-                    "local_only": approval.local_only,
-                    "status": approval.status.value,
-                    "created_at": approval.created_at,
-                    "expires_at": approval.expires_at,
-                    "resolved_at": approval.resolved_at,
-                    "consumed_at": approval.consumed_at,
-                    "idempotency_key": approval.idempotency_key,
-                }
-                for approval in self._store.values()
-            ],
-        )
+        self._table.put_many((approval.id, self._record(approval)) for approval in approvals)
+
+    @staticmethod
+    def _record(approval: PendingApproval) -> Dict[str, Any]:
+        return {
+            "id": approval.id,
+            "proposal_id": approval.proposal_id,
+            "tool_name": approval.tool_name,
+            "operation": approval.operation,
+            "args": approval.args,
+            "preview": approval.preview,
+            "redacted_preview": approval.redacted_preview,
+            "args_fingerprint": approval.args_fingerprint,
+            "session_id": approval.session_id,
+            "local_only": approval.local_only,
+            "status": approval.status.value,
+            "created_at": approval.created_at,
+            "expires_at": approval.expires_at,
+            "resolved_at": approval.resolved_at,
+            "consumed_at": approval.consumed_at,
+            "idempotency_key": approval.idempotency_key,
+        }
@@ -0,0 +1,116 @@
+"""StageRunner — concurrent fan-out of independent reply-pipeline stages.
+
+``Agent.reply`` used to run memory retrieval, planner enrichment and tool
+planning (an extra LLM call) one after another before the reply LLM call
+could start. They read the same sanitized message and per-turn context but
+not each other's output, so the runner submits them together to a shared
+thread pool. Pre-reply latency becomes max(stage) instead of sum(stage).
+
+Each stage has a deadline measured from the start of the fan-out. A stage
+that misses it is abandoned: a queued stage is cancelled, and a running one
+finishes in the background with its result discarded. Its ``fallback`` is
+used instead. Exceptions raised by a stage propagate unless the stage has
+``fallback_on_error`` set. Results come back keyed in declaration order, so
+callers merge them deterministically whatever order they finished in.
+
+Because an abandoned stage keeps running after the caller has moved on,
+stages must not write: anything with side effects (tool execution,
+knowledge-graph rebuilds) runs outside the fan-out.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """One unit of work in a fan-out."""
+
+    name: str
+    fn: Callable[[], Any]
+    deadline_s: float
+    fallback: Callable[[], Any] = lambda: None
+    fallback_on_error: bool = False
+
+
+@dataclass
+class StageResult:
+    """Outcome of one stage."""
+
+    name: str
+    value: Any = None
+    elapsed_ms: float = 0.0
+    timed_out: bool = False
+    error: Optional[str] = None
+
+
+class StageRunner:
+    """Runs independent stages concurrently with per-stage deadlines."""
+
+    def __init__(self, max_workers: int = 6) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="reply-stage")
+
+    def run(self, stages: List[Stage], *, parallel: bool = True) -> Dict[str, StageResult]:
+        """Run *stages* and return ``{name: StageResult}`` in declaration order.
+
+        With ``parallel=False`` the stages run inline, one after another (no
+        deadlines), which is the pre-fan-out behaviour.
+        """
+        if not parallel:
+            return {stage.name: self._run_inline(stage) for stage in stages}
+
+        started = time.perf_counter()
+        futures = [(stage, self._pool.submit(_timed, stage.fn)) for stage in stages]
+        results: Dict[str, StageResult] = {}
+        for stage, future in futures:
+            remaining = stage.deadline_s - (time.perf_counter() - started)
+            try:
+                value, elapsed_ms = future.result(timeout=max(0.0, remaining))
+                results[stage.name] = StageResult(stage.name, value, elapsed_ms)
+            except FuturesTimeout:
+                future.cancel()
+                log.warning("Stage %s missed its %.1fs deadline; using fallback", stage.name, stage.deadline_s)
+                results[stage.name] = StageResult(
+                    stage.name,
+                    stage.fallback(),
+                    (time.perf_counter() - started) * 1000,
+                    timed_out=True,
+                )
+            except Exception as exc:
+                if not stage.fallback_on_error:
+                    raise
+                log.warning("Stage %s failed: %s; using fallback", stage.name, exc)
+                results[stage.name] = StageResult(
+                    stage.name,
+                    stage.fallback(),
+                    (time.perf_counter() - started) * 1000,
+                    error=str(exc),
+                )
+        return results
+
+    @staticmethod
+    def _run_inline(stage: Stage) -> StageResult:
+        try:
+            value, elapsed_ms = _timed(stage.fn)
+        except Exception as exc:
+            if not stage.fallback_on_error:
+                raise
+            log.warning("Stage %s failed: %s; using fallback", stage.name, exc)
+            return StageResult(stage.name, stage.fallback(), error=str(exc))
+        return StageResult(stage.name, value, elapsed_ms)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _timed(fn: Callable[[], Any]) -> tuple:
+    t0 = time.perf_counter()
+    value = fn()
+    return value, (time.perf_counter() - t0) * 1000
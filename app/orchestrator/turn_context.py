@@ -0,0 +1,170 @@
+"""Per-turn read cache for the ``Agent.reply`` pipeline.
+
+One chat turn used to hit the same MemoryStore queries several times over:
+every ``CravingEngine`` read the last user interaction twice, recent moods
+were fetched by the retriever, the planner and ``mood_trend_analysis``, and
+the user profile by both the retriever and the user-model formatter.
+
+``TurnContext`` wraps the store for the duration of one turn. The read
+methods listed below are memoized; anything else (writes included) is
+forwarded to the wrapped store unchanged, so it can be handed to the
+sub-agents wherever they expect a ``MemoryStore``.
+
+Reads reflect the store as of their first call in the turn. ``Agent.reply``
+reads the last interaction before it persists the user message, so every
+stage sees the absence that preceded this message rather than the message
+itself.
+
+The retrieval, planner and tool_plan stages share one ``TurnContext`` and run
+concurrently, so a miss is single-flight: the first reader of a key fetches it
+and the others wait on its in-flight future instead of querying again.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.api.models import Contact, Habit, MoodEntry, PersonalGoal, UserProfile
+from app.memory.store import MemoryStore
+
+# Recent moods are fetched at least this deep so the retriever (3), the
+# planner (1) and mood_trend_analysis (7) share one query.
+_MOOD_PREFETCH = 7
+
+
+class TurnContext:
+    """Memoizing view of a MemoryStore scoped to one chat turn."""
+
+    def __init__(self, store: MemoryStore, session_id: str) -> None:
+        self.store = store
+        self.session_id = session_id
+        self._cache: Dict[Tuple[Any, ...], Any] = {}
+        self._limited: Dict[Tuple[Any, ...], Tuple[int, List[Any]]] = {}
+        self._inflight: Dict[Tuple[Any, ...], Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not defined here: delegate to the store.
+        return getattr(self.store, name)
+
+    # ── memoized reads ────────────────────────────────────────────────────
+
+    def get_last_interaction(self, session_id: str, role: str = "user") -> Optional[datetime]:
+        return self._memo(
+            ("last_interaction", session_id, role),
+            lambda: self.store.get_last_interaction(session_id, role=role),
+        )
+
+    def get_recent_moods(self, user_id: str, limit: int = 7) -> List[MoodEntry]:
+        return self._memo_limited(
+            ("moods", user_id),
+            limit,
+            lambda depth: self.store.get_recent_moods(user_id, depth),
+            prefetch=_MOOD_PREFETCH,
+        )
+
+    def mood_trend_analysis(self, user_id: str) -> Dict[str, Any]:
+        return self._memo(
+            ("mood_trend", user_id),
+            lambda: MemoryStore.summarize_mood_trend(self.get_recent_moods(user_id, 7)),
+        )
+
+    def get_user_profile(self, user_id: str) -> Optional[UserProfile]:
+        return self._memo(("profile", user_id), lambda: self.store.get_user_profile(user_id))
+
+    def get_habits(self, user_id: str) -> List[Habit]:
+        return self._memo(("habits", user_id), lambda: list(self.store.get_habits(user_id)))
+
+    def get_personal_goals(self, user_id: str) -> List[PersonalGoal]:
+        return self._memo(("goals", user_id), lambda: list(self.store.get_personal_goals(user_id)))
+
+    def get_contacts(self, user_id: str = "default", limit: int = 50) -> List[Contact]:
+        return self._memo_limited(
+            ("contacts", user_id),
+            limit,
+            lambda depth: self.store.get_contacts(user_id, limit=depth),
+        )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    # ── internals ─────────────────────────────────────────────────────────
+
+    def _memo(self, key: Tuple[Any, ...], fetch: Callable[[], Any]) -> Any:
+        while True:
+            with self._lock:
+                if key in self._cache:
+                    self.hits += 1
+                    return self._cache[key]
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self._inflight[key] = Future()
+                    break
+            pending.result()  # another stage is fetching this key; re-check
+
+        return self._fill(key, pending, fetch, lambda value: self._cache.__setitem__(key, value))
+
+    def _memo_limited(
+        self,
+        key: Tuple[Any, ...],
+        limit: int,
+        fetch: Callable[[int], List[Any]],
+        *,
+        prefetch: int = 0,
+    ) -> List[Any]:
+        """Serve ``ORDER BY ... LIMIT n`` reads from the deepest fetch so far.
+
+        A shallower request is a prefix of a deeper one, so it is sliced from
+        the cached rows. A fetch that came back short already holds every row.
+        """
+        while True:
+            with self._lock:
+                cached = self._limited.get(key)
+                if cached is not None:
+                    depth, rows = cached
+                    if limit <= depth or len(rows) < depth:
+                        self.hits += 1
+                        return rows[:limit]
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self._inflight[key] = Future()
+                    break
+            pending.result()  # may not be deep enough; re-check once it lands
+
+        depth = max(limit, prefetch)
+        rows = self._fill(
+            key,
+            pending,
+            lambda: list(fetch(depth)),
+            lambda value: self._limited.__setitem__(key, (depth, value)),
+        )
+        return rows[:limit]
+
+    def _fill(
+        self,
+        key: Tuple[Any, ...],
+        pending: Future,
+        fetch: Callable[[], Any],
+        store: Callable[[Any], None],
+    ) -> Any:
+        """Run the fetch this thread owns and release the readers waiting on it."""
+        try:
+            value = fetch()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            pending.set_exception(exc)
+            raise
+        with self._lock:
+            store(value)
+            del self._inflight[key]
+        pending.set_result(value)
+        return value
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import json
 import os
+import sqlite3
+import threading
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 
 def runtime_data_dir() -> Path:
@@ -27,3 +29,166 @@ def write_json_atomic(path: Path, value: Any) -> None:
         encoding="utf-8",
     )
     os.replace(temporary, path)
+
+
+# ── SQLite state tables ───────────────────────────────────────────────────
+#
+# The small state stores used to rewrite their whole JSON file on every
+# mutation, so the cost of recording one chat message grew with the size of
+# the file. They now share one SQLite database in WAL mode per data
+# directory and write only the rows a mutation touches.
+
+STATE_DB_NAME = "state.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    seq INTEGER PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS state_namespace_seq ON state (namespace, seq);
+"""
+
+
+class _StateDatabase:
+    """One WAL-mode connection shared by every table in a data directory."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA busy_timeout=5000")
+        self.connection.executescript(_SCHEMA)
+
+
+_databases: Dict[Path, _StateDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def _state_database(path: Path) -> _StateDatabase:
+    path = path.resolve()
+    database = _databases.get(path)
+    if database is None:
+        with _databases_lock:
+            database = _databases.get(path)
+            if database is None:
+                database = _databases[path] = _StateDatabase(path)
+    return database
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), sort_keys=True)
+
+
+class StateTable:
+    """A namespace of JSON documents in the shared state database.
+
+    ``path`` is the store's former JSON file: the database lives next to it
+    and the namespace defaults to its stem. Rows keep insertion order, and
+    updating a row keeps its position, so list-shaped state round-trips.
+    """
+
+    def __init__(self, path: Path, *, namespace: Optional[str] = None) -> None:
+        self.legacy_path = path
+        self.namespace = namespace or path.stem
+        self._db = _state_database(path.parent / STATE_DB_NAME)
+
+    def __len__(self) -> int:
+        with self._db.lock:
+            row = self._db.connection.execute(
+                "SELECT COUNT(*) FROM state WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        return int(row[0])
+
+    def items(self) -> List[Tuple[str, Any]]:
+        with self._db.lock:
+            rows = self._db.connection.execute(
+                "SELECT key, value FROM state WHERE namespace = ? ORDER BY seq", (self.namespace,)
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def values(self) -> List[Any]:
+        return [value for _, value in self.items()]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._db.lock:
+            row = self._db.connection.execute(
+                "SELECT value FROM state WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else default
+
+    def put(self, key: str, value: Any) -> None:
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        self.write(items)
+
+    def delete(self, *keys: str) -> None:
+        self.write((), delete=keys)
+
+    def write(self, items: Iterable[Tuple[str, Any]], *, delete: Iterable[str] = ()) -> None:
+        """Upsert *items* and delete the *delete* keys in one transaction."""
+        rows = [(self.namespace, str(key), _dumps(value)) for key, value in items]
+        doomed = [(self.namespace, str(key)) for key in delete]
+        if not rows and not doomed:
+            return
+        with self._db.lock, self._db.connection:
+            if rows:
+                self._db.connection.executemany(
+                    "INSERT INTO state (namespace, key, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value",
+                    rows,
+                )
+            if doomed:
+                self._db.connection.executemany(
+                    "DELETE FROM state WHERE namespace = ? AND key = ?", doomed
+                )
+
+    def trim(self, keep: int) -> None:
+        """Delete all but the newest *keep* rows."""
+        with self._db.lock, self._db.connection:
+            self._db.connection.execute(
+                "DELETE FROM state WHERE namespace = ? AND seq <= ("
+                "SELECT seq FROM state WHERE namespace = ? ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+                (self.namespace, self.namespace, max(0, keep)),
+            )
+
+    def clear(self) -> None:
+        with self._db.lock, self._db.connection:
+            self._db.connection.execute("DELETE FROM state WHERE namespace = ?", (self.namespace,))
+
+    def migrate_json(self, rows: Callable[[Any], Iterable[Tuple[str, Any]]]) -> int:
+        """Import the legacy JSON file once, if this namespace is still empty.
+
+        *rows* turns the decoded file into ``(key, value)`` pairs. The file is
+        renamed to ``*.migrated`` afterwards, so the import never repeats.
+        Returns the number of rows imported.
+        """
+        imported: List[Tuple[str, Any]] = []
+
+        def load(data: Any) -> None:
+            if len(self) == 0:
+                imported.extend(rows(data))
+                self.put_many(imported)
+
+        import_legacy_json(self.legacy_path, load)
+        return len(imported)
+
+
+def import_legacy_json(path: Path, load: Callable[[Any], None]) -> bool:
+    """Hand a pre-SQLite JSON state file to *load*, then set it aside."""
+    if not path.exists():
+        return False
+    data = read_json(path, None)
+    if data is not None:
+        load(data)
+    try:
+        path.replace(path.with_name(path.name + ".migrated"))
+    except OSError:
+        pass
+    return True
@@ -49,13 +49,16 @@ class FileIngester:
             return  # Skip non-text files
         
         chunks = self.chunk_text(content)
-        for i, chunk in enumerate(chunks):
-            embedding = self.memory_store.embed_text(chunk)
-            self.collection.add(
-                documents=[chunk],
-                metadatas=[{"source": str(file_path), "chunk": i}],
-                ids=[f"{file_path}_{i}"]
-            )
+        if not chunks:
+            return
+        # Unchanged files hit the embedding cache; upsert keeps re-ingest idempotent.
+        embeddings = self.memory_store.embed_many(chunks)
+        self.collection.upsert(
+            documents=chunks,
+            embeddings=embeddings,
+            metadatas=[{"source": str(file_path), "chunk": i} for i in range(len(chunks))],
+            ids=[f"{file_path}_{i}" for i in range(len(chunks))]
+        )
 
     def ingest_directory(self, dir_path: str):
         path = self._resolve_allowed_path(dir_path)
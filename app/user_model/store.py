@@ -1,26 +1,43 @@
 from __future__ import annotations
 
-import json
 import uuid
 from datetime import datetime
 from pathlib import Path
 from threading import Lock
 from typing import Any
 
+from app.persistence import StateTable
 from app.user_model.synthesis import SynthesisCandidate
 
 
+def _legacy_rows(list_key: str):
+    def rows(data: Any) -> list[tuple[str, Any]]:
+        records = data.get(list_key) if isinstance(data, dict) else None
+        if not isinstance(records, list):
+            return []
+        return [
+            (str(record.get("id") or uuid.uuid4()), record)
+            for record in records
+            if isinstance(record, dict)
+        ]
+
+    return rows
+
+
 class UserModelCorrectionStore:
-    """Durable JSON store for user model corrections.
+    """Durable store for user model corrections.
 
     This is intentionally small while Phase 9 is contract-first. It gives the
-    user persistent veto/edit/add behavior without introducing a DB migration.
+    user persistent veto/edit/add behavior without a schema of its own: each
+    correction is one JSON row in the shared state database.
     """
 
     def __init__(self, path: Path | None = None) -> None:
         self.path = path or Path("data/user_model_corrections.json")
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._lock = Lock()
+        self._table = StateTable(self.path)
+        self._table.migrate_json(_legacy_rows("corrections"))
         self._state = self._load()
 
     def record(
@@ -53,7 +70,7 @@ class UserModelCorrectionStore:
         }
         with self._lock:
             self._state.setdefault("corrections", []).append(record)
-            self._persist()
+            self._table.put(correction_id, record)
         return record
 
     def list_for_user(self, user_id: str) -> list[dict[str, Any]]:
@@ -67,25 +84,11 @@ class UserModelCorrectionStore:
         return sorted(records, key=lambda record: str(record.get("created_at") or ""))
 
     def _load(self) -> dict[str, Any]:
-        if not self.path.exists():
-            return {"corrections": []}
-        try:
-            data = json.loads(self.path.read_text())
-            if not isinstance(data, dict):
-                return {"corrections": []}
-            corrections = data.get("corrections")
-            if not isinstance(corrections, list):
-                data["corrections"] = []
-            return data
-        except Exception:
-            return {"corrections": []}
-
-    def _persist(self) -> None:
-        self.path.write_text(json.dumps(self._state, indent=2, sort_keys=True))
+        return {"corrections": self._table.values()}
 
 
 class UserModelSynthesisRecordStore:
-    """Durable JSON audit store for synthesis dry-run candidates.
+    """Durable audit store for synthesis dry-run candidates.
 
     Records are diagnostic only. They do not represent user-model writes and
     should not be used as trusted profile data.
@@ -95,6 +98,8 @@ class UserModelSynthesisRecordStore:
         self.path = path or Path("data/user_model_synthesis_records.json")
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._lock = Lock()
+        self._table = StateTable(self.path)
+        self._table.migrate_json(_legacy_rows("records"))
         self._state = self._load()
 
     def record_candidates(
@@ -126,7 +131,7 @@ class UserModelSynthesisRecordStore:
         ]
         with self._lock:
             self._state.setdefault("records", []).extend(records)
-            self._persist()
+            self._table.put_many((record["id"], record) for record in records)
         return records
 
     def list_records(
@@ -200,18 +205,4 @@ class UserModelSynthesisRecordStore:
         }
 
     def _load(self) -> dict[str, Any]:
-        if not self.path.exists():
-            return {"records": []}
-        try:
-            data = json.loads(self.path.read_text())
-            if not isinstance(data, dict):
-                return {"records": []}
-            records = data.get("records")
-            if not isinstance(records, list):
-                data["records"] = []
-            return data
-        except Exception:
-            return {"records": []}
-
-    def _persist(self) -> None:
-        self.path.write_text(json.dumps(self._state, indent=2, sort_keys=True))
+        return {"records": self._table.values()}
@@ -0,0 +1,28 @@
+"""add chat session/id index
+
+Revision ID: 5d2e9c71b0a4
+Revises: a7f1e2b30941
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e9c71b0a4'
+down_revision: Union[str, Sequence[str], None] = 'a7f1e2b30941'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index chat messages by (session_id, id) for windowed history reads."""
+    op.create_index('ix_chat_session_id', 'chatmessage', ['session_id', 'id'])
+
+
+def downgrade() -> None:
+    """Remove the windowed-history index."""
+    op.drop_index('ix_chat_session_id', table_name='chatmessage')
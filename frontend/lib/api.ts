@@ -609,6 +609,7 @@ export function createEventStream(
   let retries = 0;
   let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
   let closed = false;
+  let lastEventId = "";
 
   function connect() {
     if (closed) return;
@@ -616,6 +617,10 @@ export function createEventStream(
     const streamUrl = new URL(toUrl("/api/v2/events/stream"), window.location.origin);
     streamUrl.searchParams.set("session_id", sessionId);
     streamUrl.searchParams.set("backfill", retries === 0 ? "8" : "0");
+    // Resume exactly where the previous connection stopped.
+    if (lastEventId) {
+      streamUrl.searchParams.set("last_event_id", lastEventId);
+    }
     // Direct mode carries the token as a query param (EventSource can't set
     // headers); proxy mode injects it server-side, so API_TOKEN is empty here.
     if (API_TOKEN) {
@@ -626,6 +631,9 @@ export function createEventStream(
 
     const handleMessage = (message: MessageEvent<string>) => {
       retries = 0;
+      if (message.lastEventId) {
+        lastEventId = message.lastEventId;
+      }
       try {
         const payload = JSON.parse(message.data) as RealtimeEvent;
         onEvent(payload);
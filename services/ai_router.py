@@ -1,13 +1,15 @@
 import json
 import logging
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import httpx
 
 from app.config import settings
-from services.router_logging import log_inference
+from services.provider_health import ProviderHealth
+from services.router_logging import get_recent_logs, log_inference
 
 
 logger = logging.getLogger(__name__)
@@ -15,6 +17,142 @@ logger = logging.getLogger(__name__)
 ProviderResult = Dict[str, Any]
 TokenCallback = Callable[[str], None]
 
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+_GROK_BASE_URL = "https://api.x.ai/v1"
+# Router tasks nobody is waiting on interactively; they queue behind chat
+# on the local GGUF worker.
+_BACKGROUND_TASKS = {"memory_consolidation", "user_model_synthesis"}
+_GEMINI_MODEL = "gemini-1.5-flash"
+
+
+class ProviderClients:
+    """Long-lived, connection-pooled clients for every LLM provider.
+
+    Building a client per call paid TCP/TLS setup on every request (several
+    times per chat turn). Each client here is built once and reused by the
+    router, NER, the tool planner and consolidation. Every client is keyed by
+    the settings it was built from: after a settings change (new API key,
+    host, timeout or pool limits) the next caller gets a fresh client. The
+    retired one is dropped rather than closed so that requests still in
+    flight on it can finish.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Tuple[Tuple[Any, ...], Any]] = {}
+
+    def http(self) -> httpx.Client:
+        """Shared client for local HTTP providers (Ollama)."""
+        return self._get("http", self._http_fingerprint(), self._build_http)
+
+    def openai(self) -> Optional[Any]:
+        """OpenAI client, or None when no API key is configured."""
+        if not settings.openai_api_key:
+            return None
+        key = (settings.openai_api_key, *self._http_fingerprint())
+        return self._get("openai", key, lambda: self._build_openai(settings.openai_api_key))
+
+    def grok(self) -> Optional[Any]:
+        """xAI client (OpenAI-compatible), or None when no API key is configured."""
+        if not settings.xai_api_key:
+            return None
+        key = (settings.xai_api_key, *self._http_fingerprint())
+        return self._get("grok", key, lambda: self._build_openai(settings.xai_api_key, base_url=_GROK_BASE_URL))
+
+    def gemini(self) -> Optional[Any]:
+        """Gemini ``GenerativeModel``, or None when no API key is configured."""
+        if not settings.gemini_api_key:
+            return None
+        return self._get("gemini", (settings.gemini_api_key,), self._build_gemini)
+
+    def reset(self) -> None:
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for _, client in clients.values():
+            close = getattr(client, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+
+    # ── internals ─────────────────────────────────────────────────────────
+
+    def _get(self, name: str, fingerprint: Tuple[Any, ...], build: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._clients.get(name)
+            if entry is not None and entry[0] == fingerprint:
+                return entry[1]
+            client = build()
+            self._clients[name] = (fingerprint, client)
+            return client
+
+    @staticmethod
+    def _http_fingerprint() -> Tuple[Any, ...]:
+        return (
+            settings.router_timeout,
+            settings.llm_http2,
+            settings.llm_max_connections,
+            settings.llm_max_keepalive_connections,
+            settings.llm_keepalive_expiry_s,
+        )
+
+    @staticmethod
+    def _http_options() -> Dict[str, Any]:
+        call_timeout = float(settings.router_timeout) if settings.router_timeout else 60.0
+        return {
+            # read timeout applies per-chunk on streams, so long generations are fine
+            # as long as tokens keep flowing; a hung provider no longer stalls forever.
+            "timeout": httpx.Timeout(timeout=call_timeout, connect=10.0, read=call_timeout),
+            "limits": httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+                keepalive_expiry=settings.llm_keepalive_expiry_s,
+            ),
+            "http2": settings.llm_http2 and _HTTP2_AVAILABLE,
+        }
+
+    def _build_http(self) -> httpx.Client:
+        return httpx.Client(**self._http_options())
+
+    def _build_openai(self, api_key: str, base_url: Optional[str] = None) -> Any:
+        import openai
+
+        options = self._http_options()
+        return openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=options["timeout"],
+            http_client=httpx.Client(**options),
+        )
+
+    @staticmethod
+    def _build_gemini() -> Any:
+        import google.generativeai as genai
+
+        genai.configure(api_key=settings.gemini_api_key)
+        return genai.GenerativeModel(_GEMINI_MODEL)
+
+
+_provider_clients: Optional[ProviderClients] = None
+_provider_clients_lock = threading.Lock()
+
+
+def provider_clients() -> ProviderClients:
+    """Process-wide provider client registry."""
+    global _provider_clients
+    if _provider_clients is None:
+        with _provider_clients_lock:
+            if _provider_clients is None:
+                _provider_clients = ProviderClients()
+    return _provider_clients
+
 
 def _provider_result(
     success: bool,
@@ -23,6 +161,7 @@ def _provider_result(
     error: Optional[str] = None,
     *,
     started: bool = False,
+    usage: Optional[Dict[str, int]] = None,
 ) -> ProviderResult:
     return {
         "success": success,
@@ -30,9 +169,72 @@ def _provider_result(
         "text": text,
         "error": error,
         "started": started,
+        "usage": usage or {},
+    }
+
+
+def _chat_messages(prompt: str, context: Dict[str, Any]) -> List[Dict[str, str]]:
+    # Structured messages keep the static persona as a cacheable prefix;
+    # bare prompts (planner, summaries) still go out as one user turn.
+    return context.get("messages") or [{"role": "user", "content": prompt}]
+
+
+def _openai_usage(usage: Any) -> Dict[str, int]:
+    """Prompt and cached-prompt token counts from an OpenAI-style usage block."""
+    if usage is None:
+        return {}
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+        "cached_tokens": int(getattr(details, "cached_tokens", 0) or 0),
+    }
+
+
+def _gemini_usage(response: Any) -> Dict[str, int]:
+    meta = getattr(response, "usage_metadata", None)
+    if meta is None:
+        return {}
+    return {
+        "prompt_tokens": int(getattr(meta, "prompt_token_count", 0) or 0),
+        "cached_tokens": int(getattr(meta, "cached_content_token_count", 0) or 0),
     }
 
 
+_provider_health: Optional[ProviderHealth] = None
+
+
+def provider_health() -> ProviderHealth:
+    """Process-wide provider health tracker, seeded from the inference log."""
+    global _provider_health
+    if _provider_health is None:
+        with _provider_clients_lock:
+            if _provider_health is None:
+                health = ProviderHealth(
+                    window=settings.router_health_window,
+                    breaker_failures=settings.router_breaker_failures,
+                    cooldown_s=settings.router_breaker_cooldown_s,
+                )
+                health.register_probe("ollama", _probe_ollama)
+                health.register_probe("gguf", _probe_gguf)
+                try:
+                    health.seed(reversed(get_recent_logs(limit=settings.router_health_window * 5)))
+                except Exception as exc:
+                    logger.warning("Could not seed provider health from the inference log: %s", exc)
+                _provider_health = health
+    return _provider_health
+
+
+def _probe_ollama() -> bool:
+    response = provider_clients().http().get(f"{settings.ollama_host}/api/tags", timeout=2.0)
+    return response.status_code == 200
+
+
+def _probe_gguf() -> bool:
+    from services.llama_local import is_available
+
+    return is_available()
+
+
 def call_ollama(
     prompt: str,
     context: Dict[str, Any],
@@ -41,51 +243,47 @@ def call_ollama(
     started = False
     accumulated = ""
     try:
-        call_timeout = float(settings.router_timeout) if settings.router_timeout else 60.0
-        # read timeout applies per-chunk on streams, so long generations are fine
-        # as long as tokens keep flowing; a hung Ollama no longer stalls forever.
-        timeout = httpx.Timeout(timeout=call_timeout, connect=10.0, read=call_timeout)
-        with httpx.Client(timeout=timeout) as client:
-            if on_token is None:
-                response = client.post(
-                    f"{settings.ollama_host}/api/generate",
-                    json={"model": settings.model_ollama, "prompt": prompt, "stream": False},
-                )
-                response.raise_for_status()
-                data = response.json()
-                text = data.get("response", "").strip()
-                if text:
-                    return _provider_result(True, "ollama", text=text)
-                return _provider_result(False, "ollama", error="Empty response from Ollama")
-
-            with client.stream(
-                "POST",
+        client = provider_clients().http()
+        if on_token is None:
+            response = client.post(
                 f"{settings.ollama_host}/api/generate",
-                json={"model": settings.model_ollama, "prompt": prompt, "stream": True},
-            ) as response:
-                response.raise_for_status()
-                for line in response.iter_lines():
-                    if not line:
-                        continue
-                    data = json.loads(line)
-                    chunk = data.get("response", "")
-                    if chunk:
-                        started = True
-                        accumulated += chunk
-                        on_token(chunk)
-                    if data.get("done"):
-                        break
-
-            text = accumulated.strip()
-            if text:
-                return _provider_result(True, "ollama", text=text, started=started)
-            return _provider_result(
-                False,
-                "ollama",
-                text=accumulated,
-                error="Empty response from Ollama",
-                started=started,
+                json={"model": settings.model_ollama, "prompt": prompt, "stream": False},
             )
+            response.raise_for_status()
+            data = response.json()
+            text = data.get("response", "").strip()
+            if text:
+                return _provider_result(True, "ollama", text=text)
+            return _provider_result(False, "ollama", error="Empty response from Ollama")
+
+        with client.stream(
+            "POST",
+            f"{settings.ollama_host}/api/generate",
+            json={"model": settings.model_ollama, "prompt": prompt, "stream": True},
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                chunk = data.get("response", "")
+                if chunk:
+                    started = True
+                    accumulated += chunk
+                    on_token(chunk)
+                if data.get("done"):
+                    break
+
+        text = accumulated.strip()
+        if text:
+            return _provider_result(True, "ollama", text=text, started=started)
+        return _provider_result(
+            False,
+            "ollama",
+            text=accumulated,
+            error="Empty response from Ollama",
+            started=started,
+        )
     except Exception as e:
         logger.warning("Provider failed: ollama error=%s", e)
         return _provider_result(False, "ollama", text=accumulated, error=str(e), started=started)
@@ -102,25 +300,26 @@ def call_openai(
 
     started = False
     accumulated = ""
+    usage: Dict[str, int] = {}
     try:
-        import openai
-
-        call_timeout = float(settings.router_timeout) if settings.router_timeout else 30.0
-        client = openai.OpenAI(api_key=api_key, timeout=call_timeout)
+        client = provider_clients().openai()
         if on_token is None:
             response = client.chat.completions.create(
                 model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
+                messages=_chat_messages(prompt, context),
             )
             text = response.choices[0].message.content.strip()
-            return _provider_result(True, "gpt4o", text=text)
+            return _provider_result(True, "gpt4o", text=text, usage=_openai_usage(getattr(response, "usage", None)))
 
         stream = client.chat.completions.create(
             model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
+            messages=_chat_messages(prompt, context),
             stream=True,
+            stream_options={"include_usage": True},
         )
         for chunk in stream:
+            # The final chunk carries usage and no choices.
+            usage = _openai_usage(getattr(chunk, "usage", None)) or usage
             for choice in getattr(chunk, "choices", []):
                 delta = getattr(choice, "delta", None)
                 text = getattr(delta, "content", None)
@@ -132,7 +331,7 @@ def call_openai(
 
         final_text = accumulated.strip()
         if final_text:
-            return _provider_result(True, "gpt4o", text=final_text, started=started)
+            return _provider_result(True, "gpt4o", text=final_text, started=started, usage=usage)
         return _provider_result(
             False,
             "gpt4o",
@@ -156,32 +355,28 @@ def call_grok(
 
     started = False
     accumulated = ""
+    usage: Dict[str, int] = {}
     try:
-        # xAI is OpenAI-compatible; reuse the openai client with x.ai's base URL.
-        import openai
-
-        call_timeout = float(settings.router_timeout) if settings.router_timeout else 30.0
-        client = openai.OpenAI(
-            api_key=api_key,
-            base_url="https://api.x.ai/v1",
-            timeout=call_timeout,
-        )
+        # xAI is OpenAI-compatible; the registry points an openai client at x.ai.
+        client = provider_clients().grok()
         if on_token is None:
             response = client.chat.completions.create(
                 model="grok-2-latest",
-                messages=[{"role": "user", "content": prompt}],
+                messages=_chat_messages(prompt, context),
             )
             text = (response.choices[0].message.content or "").strip()
             if text:
-                return _provider_result(True, "grok", text=text)
+                return _provider_result(True, "grok", text=text, usage=_openai_usage(getattr(response, "usage", None)))
             return _provider_result(False, "grok", error="Empty response from Grok")
 
         stream = client.chat.completions.create(
             model="grok-2-latest",
-            messages=[{"role": "user", "content": prompt}],
+            messages=_chat_messages(prompt, context),
             stream=True,
+            stream_options={"include_usage": True},
         )
         for chunk in stream:
+            usage = _openai_usage(getattr(chunk, "usage", None)) or usage
             for choice in getattr(chunk, "choices", []):
                 delta = getattr(choice, "delta", None)
                 text = getattr(delta, "content", None)
@@ -193,7 +388,7 @@ def call_grok(
 
         final_text = accumulated.strip()
         if final_text:
-            return _provider_result(True, "grok", text=final_text, started=started)
+            return _provider_result(True, "grok", text=final_text, started=started, usage=usage)
         return _provider_result(
             False, "grok", text=accumulated, error="Empty response from Grok", started=started
         )
@@ -211,19 +406,44 @@ def call_gemini(
     if not api_key:
         return _provider_result(False, "gemini", error="Gemini API key missing")
 
+    started = False
+    accumulated = ""
+    usage: Dict[str, int] = {}
     try:
-        import google.generativeai as genai
+        model = provider_clients().gemini()
+        if on_token is None:
+            response = model.generate_content(prompt)
+            text = getattr(response, "text", "").strip()
+            if text:
+                return _provider_result(True, "gemini", text=text, usage=_gemini_usage(response))
+            return _provider_result(False, "gemini", error="Empty response from Gemini")
+
+        for chunk in model.generate_content(prompt, stream=True):
+            usage = _gemini_usage(chunk) or usage
+            text = _gemini_chunk_text(chunk)
+            if not text:
+                continue
+            started = True
+            accumulated += text
+            on_token(text)
 
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        text = getattr(response, "text", "").strip()
-        if text:
-            return _provider_result(True, "gemini", text=text)
-        return _provider_result(False, "gemini", error="Empty response from Gemini")
+        final_text = accumulated.strip()
+        if final_text:
+            return _provider_result(True, "gemini", text=final_text, started=started, usage=usage)
+        return _provider_result(
+            False, "gemini", text=accumulated, error="Empty response from Gemini", started=started
+        )
     except Exception as e:
         logger.warning("Provider failed: gemini error=%s", e)
-        return _provider_result(False, "gemini", error=str(e))
+        return _provider_result(False, "gemini", text=accumulated, error=str(e), started=started)
+
+
+def _gemini_chunk_text(chunk: Any) -> str:
+    # `.text` raises on chunks without text parts (e.g. a trailing safety-rating chunk).
+    try:
+        return chunk.text or ""
+    except ValueError:
+        return ""
 
 
 def call_gguf(
@@ -231,18 +451,197 @@ def call_gguf(
     context: Dict[str, Any],
     on_token: TokenCallback | None = None,
 ) -> ProviderResult:
+    started = False
+    accumulated = ""
     try:
-        from services.llama_local import generate, is_available
+        from services.llama_local import (
+            PRIORITY_BACKGROUND,
+            PRIORITY_INTERACTIVE,
+            generate,
+            generate_stream,
+            is_available,
+        )
 
         if not is_available():
             return _provider_result(False, "gguf", error="GGUF model not configured")
-        text = generate(prompt)
-        if text:
-            return _provider_result(True, "gguf", text=text)
-        return _provider_result(False, "gguf", error="Empty response from GGUF")
+        priority = PRIORITY_BACKGROUND if context.get("task") in _BACKGROUND_TASKS else PRIORITY_INTERACTIVE
+        if on_token is None:
+            text = generate(prompt, priority=priority)
+            if text:
+                return _provider_result(True, "gguf", text=text)
+            return _provider_result(False, "gguf", error="Empty response from GGUF")
+
+        stream = generate_stream(prompt, priority=priority)
+        try:
+            for chunk in stream:
+                started = True
+                accumulated += chunk
+                on_token(chunk)
+        finally:
+            # Cancel the worker job now even if on_token aborted the stream.
+            stream.close()
+
+        final_text = accumulated.strip()
+        if final_text:
+            return _provider_result(True, "gguf", text=final_text, started=started)
+        return _provider_result(
+            False, "gguf", text=accumulated, error="Empty response from GGUF", started=started
+        )
     except Exception as e:
         logger.warning("Provider failed: gguf error=%s", e)
-        return _provider_result(False, "gguf", error=str(e))
+        return _provider_result(False, "gguf", text=accumulated, error=str(e), started=started)
+
+
+ProviderFn = Callable[[str, Dict[str, Any], TokenCallback | None], ProviderResult]
+
+# Hedge delay when hedging is on but the primary has too few samples for a p95.
+_HEDGE_FALLBACK_MS = 3000
+
+
+class _HedgeCancelled(Exception):
+    """Raised from the token callback of a provider that lost a hedge race."""
+
+
+class _Attempt:
+    """One provider call, run inline or on its own thread for hedging.
+
+    Streamed chunks reach the caller's ``on_token`` only once this attempt
+    owns the stream (``claim``); a loser's next chunk raises
+    ``_HedgeCancelled`` inside the provider, which aborts its stream.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: ProviderFn,
+        on_token: TokenCallback | None,
+        claim: Callable[["_Attempt"], bool],
+        cond: threading.Condition,
+    ) -> None:
+        self.name = name
+        self.fn = fn
+        self.on_token = on_token
+        self.claim = claim
+        self.cond = cond
+        self.result: Optional[ProviderResult] = None
+        self.started_at = 0.0
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancelled = False
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    @property
+    def succeeded(self) -> bool:
+        return bool(self.result and self.result["success"] and self.result["text"])
+
+    def run(self, prompt: str, context: Dict[str, Any]) -> None:
+        self.started_at = time.perf_counter()
+        try:
+            result = self.fn(prompt, context, self._token if self.on_token is not None else None)
+        except Exception as exc:
+            result = _provider_result(False, self.name, error=str(exc))
+        with self.cond:
+            self.finished_at = time.perf_counter()
+            self.result = result
+            self.cond.notify_all()
+
+    def start(self, prompt: str, context: Dict[str, Any]) -> None:
+        threading.Thread(target=self.run, args=(prompt, context), name=f"hedge-{self.name}", daemon=True).start()
+
+    def _token(self, chunk: str) -> None:
+        if self.cancelled or not self.claim(self):
+            self.cancelled = True
+            raise _HedgeCancelled()
+        if self.first_token_at is None:
+            with self.cond:
+                self.first_token_at = time.perf_counter()
+                self.cond.notify_all()
+        self.on_token(chunk)
+
+    def latency_ms(self) -> int:
+        return int(((self.finished_at or time.perf_counter()) - self.started_at) * 1000)
+
+    def ttft_ms(self) -> Optional[int]:
+        """Time to the first streamed token; None if nothing was streamed."""
+        if self.first_token_at is not None:
+            return int((self.first_token_at - self.started_at) * 1000)
+        return None
+
+
+def _hedge_budget_s(health: Optional[ProviderHealth], provider: str, *, streaming: bool) -> float:
+    # A streamed call has responded at its first token, a non-streamed one only
+    # when it completes, so each is measured against its own kind of sample.
+    if settings.router_hedge_after_ms > 0:
+        return settings.router_hedge_after_ms / 1000.0
+    p95 = None
+    if health is not None:
+        p95 = health.p95_ttft_ms(provider) if streaming else health.p95_latency_ms(provider)
+    return (p95 if p95 is not None else _HEDGE_FALLBACK_MS) / 1000.0
+
+
+def _run_attempts(
+    first: Tuple[str, ProviderFn],
+    next_provider: Callable[[], Optional[Tuple[str, ProviderFn]]],
+    prompt: str,
+    context: Dict[str, Any],
+    on_token: TokenCallback | None,
+    hedge_after_s: Optional[float],
+) -> Tuple[List[_Attempt], Optional[_Attempt]]:
+    """Run *first*, hedging with ``next_provider()`` if it is slow to respond.
+
+    Returns every attempt launched plus the one whose result counts (the
+    first to stream a token, or to finish successfully), or ``None`` when no
+    attempt succeeded or streamed. Without *hedge_after_s* the single
+    attempt runs inline.
+    """
+    cond = threading.Condition()
+    owner: List[_Attempt] = []
+
+    def claim(attempt: _Attempt) -> bool:
+        with cond:
+            if not owner:
+                owner.append(attempt)
+                cond.notify_all()
+            return owner[0] is attempt
+
+    primary = _Attempt(first[0], first[1], on_token, claim, cond)
+    if hedge_after_s is None:
+        primary.run(prompt, context)
+        return [primary], primary
+
+    primary.start(prompt, context)
+    with cond:
+        cond.wait_for(lambda: primary.done or primary.first_token_at is not None, timeout=hedge_after_s)
+        responded = primary.done or primary.first_token_at is not None
+    second = None if responded else next_provider()
+    if second is None:
+        with cond:
+            cond.wait_for(lambda: primary.done)
+        return [primary], primary
+
+    logger.info("Hedging slow provider %s with %s after %.1fs", primary.name, second[0], hedge_after_s)
+    hedge = _Attempt(second[0], second[1], on_token, claim, cond)
+    hedge.start(prompt, context)
+    attempts = [primary, hedge]
+    with cond:
+        while True:
+            # Non-streaming winners claim on success; streaming ones claimed on their first token.
+            for attempt in attempts:
+                if attempt.succeeded and not owner:
+                    owner.append(attempt)
+            if owner or all(attempt.done for attempt in attempts):
+                break
+            cond.wait()
+        winner = owner[0] if owner else None
+        for attempt in attempts:
+            if attempt is not winner and not attempt.done:
+                attempt.cancelled = True
+        if winner is not None:
+            cond.wait_for(lambda: winner.done)
+    return attempts, winner
 
 
 def multi_ai_response(
@@ -250,50 +649,96 @@ def multi_ai_response(
     context: Dict[str, Any],
     on_token: TokenCallback | None = None,
 ) -> ProviderResult:
-    if on_token is None:
-        providers: List[Callable[[str, Dict[str, Any], TokenCallback | None], ProviderResult]] = [
-            call_gguf,
-            call_ollama,
-            call_openai,
-            call_grok,
-            call_gemini,
-        ]
-    else:
-        providers = [
-            call_ollama,
-            call_openai,
-            call_gguf,
-            call_grok,
-            call_gemini,
-        ]
+    # Every provider streams through on_token, so one local-first order
+    # serves both modes.
+    providers: List[Tuple[str, ProviderFn]] = [
+        ("gguf", call_gguf),
+        ("ollama", call_ollama),
+        ("gpt4o", call_openai),
+        ("grok", call_grok),
+        ("gemini", call_gemini),
+    ]
+
+    health = provider_health() if settings.router_adaptive else None
+    if health is not None:
+        by_name = dict(providers)
+        providers = [(name, by_name[name]) for name in health.order([name for name, _ in providers])]
 
     route_attempts: List[str] = []
+    skipped: List[str] = []
     errors = []
     overall_start = time.perf_counter()
+    queue = list(providers)
+
+    def next_provider(accept: Callable[[str], bool] = lambda name: True) -> Optional[Tuple[str, ProviderFn]]:
+        while queue:
+            if not accept(queue[0][0]):
+                return None
+            candidate = queue.pop(0)
+            if health is not None and not health.allow(candidate[0]):
+                skipped.append(candidate[0])
+                continue
+            return candidate
+        return None
+
+    def hedgeable(name: str) -> bool:
+        # A losing attempt is cancelled through its token stream. A
+        # non-streaming GGUF call has none: it would keep decoding and hold
+        # the single local inference worker, so it never takes part in a race.
+        return on_token is not None or name != "gguf"
+
+    def next_hedge() -> Optional[Tuple[str, ProviderFn]]:
+        return next_provider(hedgeable)
+
+    while True:
+        current = next_provider()
+        if current is None:
+            break
+        hedge_after_s = None
+        if settings.router_hedge_enabled and hedgeable(current[0]):
+            hedge_after_s = _hedge_budget_s(health, current[0], streaming=on_token is not None)
+        attempts, winner = _run_attempts(current, next_hedge, prompt, context, on_token, hedge_after_s)
+
+        for attempt in attempts:
+            if not attempt.done or attempt.cancelled:
+                continue  # a hedge loser: neither a success nor the provider's fault
+            result = attempt.result
+            route_attempts.append(result["model"])
+            if health is not None:
+                health.record(
+                    attempt.name,
+                    attempt.succeeded,
+                    attempt.ttft_ms(),
+                    result.get("error"),
+                    latency_ms=attempt.latency_ms(),
+                )
+            log_inference(
+                {
+                    "provider": result["model"],
+                    "success": result["success"],
+                    "latency_ms": attempt.latency_ms(),
+                    "ttft_ms": attempt.ttft_ms(),
+                    "streamed": attempt.first_token_at is not None,
+                    "error": result.get("error"),
+                    "route": route_attempts.copy(),
+                    "prefix_hash": context.get("prefix_hash"),
+                    **(result.get("usage") or {}),
+                }
+            )
+            if attempt is not winner or not attempt.succeeded:
+                errors.append({"provider": result["model"], "error": result.get("error")})
 
-    for provider_fn in providers:
-        attempt_start = time.perf_counter()
-        result = provider_fn(prompt, context, on_token)
-        route_attempts.append(result["model"])
-        latency_ms = int((time.perf_counter() - attempt_start) * 1000)
-
-        log_inference(
-            {
-                "provider": result["model"],
-                "success": result["success"],
-                "latency_ms": latency_ms,
-                "error": result.get("error"),
-                "route": route_attempts.copy(),
-            }
-        )
-
-        if result["success"] and result["text"]:
+        if winner is None:
+            continue
+        result = winner.result
+        if winner.succeeded:
             result["errors"] = errors
             result["route"] = route_attempts
+            result["skipped"] = skipped
             return result
 
         if result.get("started"):
-            errors.append({"provider": result["model"], "error": result.get("error")})
+            # Partial output already reached the caller; never splice in another provider.
             return {
                 "success": False,
                 "model": result["model"],
@@ -301,11 +746,10 @@ def multi_ai_response(
                 "error": result.get("error") or "Streaming provider failed",
                 "errors": errors,
                 "route": route_attempts,
+                "skipped": skipped,
                 "started": True,
             }
 
-        errors.append({"provider": result["model"], "error": result.get("error")})
-
     log_inference(
         {
             "provider": "none",
@@ -315,7 +759,7 @@ def multi_ai_response(
             "route": route_attempts,
         }
     )
-    logger.error("All providers failed route=%s", route_attempts)
+    logger.error("All providers failed route=%s skipped=%s", route_attempts, skipped)
 
     return {
         "success": False,
@@ -324,6 +768,7 @@ def multi_ai_response(
         "error": "All providers failed",
         "errors": errors,
         "route": route_attempts,
+        "skipped": skipped,
     }
 
 
@@ -365,4 +810,5 @@ def route_request(
         "model_used": model_used,
         "errors": result.get("errors", []),
         "route": result.get("route", []),
+        "usage": result.get("usage", {}),
     }
@@ -7,20 +7,46 @@ Recommended models (4-bit quantized, ~4GB RAM):
 - mistral-7b-instruct-v0.2.Q4_K_M.gguf
 - llama-2-7b-chat.Q4_K_M.gguf
 - phi-2.Q4_K_M.gguf
+
+A llama.cpp context is not re-entrant, and chat, the tool planner,
+consolidation and user-model synthesis can all reach it concurrently. All
+inference therefore goes through one ``InferenceWorker`` thread that owns
+the model and drains a priority queue: interactive requests run ahead of
+background jobs (a job already decoding is never preempted). The model gets
+an in-RAM prompt cache, so a request restores the KV state of the longest
+previously evaluated prefix, typically the static Joi system prompt, and
+evaluates only the new suffix.
 """
 
+import itertools
 import logging
-from typing import Optional
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional
 
 from app.config import settings
 
 log = logging.getLogger(__name__)
 
+_STOP = ["User:", "\n\n\n"]
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
 _llm = None  # Singleton
+_llm_lock = threading.Lock()  # a cold start must load the model only once
+_END = object()  # end-of-stream marker on a job's chunk queue
 
 
 def _ensure_model():
-    """Lazy-load the GGUF model. Returns the Llama instance or None."""
+    """Lazy-load the GGUF model. Returns the Llama instance or None.
+
+    Callers on any thread (router, health probe, diagnostics, the worker)
+    may race here on a cold start; the lock makes exactly one of them load.
+    """
     global _llm
     if _llm is not None:
         return _llm
@@ -28,24 +54,40 @@ def _ensure_model():
     if not settings.gguf_model_path:
         return None
 
+    with _llm_lock:
+        if _llm is not None:
+            return _llm
+        try:
+            from llama_cpp import Llama
+
+            log.info(f"Loading GGUF model: {settings.gguf_model_path}")
+            llm = Llama(
+                model_path=settings.gguf_model_path,
+                n_ctx=settings.gguf_n_ctx,
+                n_gpu_layers=settings.gguf_n_gpu_layers,
+                verbose=False,
+            )
+            _attach_prompt_cache(llm)
+            _llm = llm
+            log.info("GGUF model loaded.")
+            return _llm
+        except ImportError:
+            log.warning("llama-cpp-python not installed. GGUF provider disabled.")
+            return None
+        except Exception as e:
+            log.error(f"Failed to load GGUF model: {e}")
+            return None
+
+
+def _attach_prompt_cache(llm) -> None:
+    if settings.gguf_prompt_cache_mb <= 0:
+        return
     try:
-        from llama_cpp import Llama
-
-        log.info(f"Loading GGUF model: {settings.gguf_model_path}")
-        _llm = Llama(
-            model_path=settings.gguf_model_path,
-            n_ctx=settings.gguf_n_ctx,
-            n_gpu_layers=settings.gguf_n_gpu_layers,
-            verbose=False,
-        )
-        log.info("GGUF model loaded.")
-        return _llm
-    except ImportError:
-        log.warning("llama-cpp-python not installed. GGUF provider disabled.")
-        return None
+        from llama_cpp import LlamaRAMCache
+
+        llm.set_cache(LlamaRAMCache(capacity_bytes=settings.gguf_prompt_cache_mb << 20))
     except Exception as e:
-        log.error(f"Failed to load GGUF model: {e}")
-        return None
+        log.warning(f"GGUF prompt cache unavailable: {e}")
 
 
 def is_available() -> bool:
@@ -53,23 +95,178 @@ def is_available() -> bool:
     return bool(settings.gguf_model_path) and _ensure_model() is not None
 
 
-def generate(prompt: str, max_tokens: int = 256, temperature: float = 0.7) -> Optional[str]:
+def token_counter() -> Optional[Callable[[str], int]]:
+    """Token-count function for the loaded model, or None if none is loaded.
+
+    Never loads the model. Tokenizing only reads the vocabulary, not the
+    llama.cpp context the inference worker owns, so the returned function is
+    safe to call from any thread.
+    """
+    llm = _llm
+    if llm is None:
+        return None
+
+    def count(text: str) -> int:
+        return len(llm.tokenize(text.encode("utf-8"), add_bos=False)) if text else 0
+
+    return count
+
+
+# ── inference worker ──────────────────────────────────────────────────────
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    run: Callable[[Any, "_Job"], Any] = field(compare=False)
+    future: Future = field(compare=False, default_factory=Future)
+    chunks: Optional["queue.Queue[Any]"] = field(compare=False, default=None)
+    cancelled: bool = field(compare=False, default=False)
+    worker: Optional["InferenceWorker"] = field(compare=False, default=None, repr=False)
+
+
+class InferenceWorker:
+    """Single thread that owns the model and serves a priority queue."""
+
+    def __init__(self) -> None:
+        self._queue: "queue.PriorityQueue[_Job]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._busy = False
+        self._completed = 0
+        self._tokens = 0
+        self._decode_s = 0.0
+        self._last_tokens_per_sec = 0.0
+
+    def submit(self, run: Callable[[Any, _Job], Any], *, priority: int, stream: bool = False) -> _Job:
+        job = _Job(priority, next(self._seq), run, chunks=queue.Queue() if stream else None, worker=self)
+        self._ensure_thread()
+        self._queue.put(job)
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "busy": self._busy,
+                "completed": self._completed,
+                "tokens_generated": self._tokens,
+                "tokens_per_sec": round(self._tokens / self._decode_s, 2) if self._decode_s else 0.0,
+                "last_tokens_per_sec": round(self._last_tokens_per_sec, 2),
+                "prompt_cache_mb": settings.gguf_prompt_cache_mb,
+            }
+
+    def record_decode(self, tokens: int, seconds: float) -> None:
+        with self._lock:
+            self._tokens += tokens
+            self._decode_s += seconds
+            if seconds > 0:
+                self._last_tokens_per_sec = tokens / seconds
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="gguf-worker", daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job.cancelled:
+                self._finish(job, None)
+                continue
+            with self._lock:
+                self._busy = True
+            try:
+                llm = _ensure_model()
+                if llm is None:
+                    raise RuntimeError("GGUF model not available")
+                self._finish(job, job.run(llm, job))
+            except Exception as e:
+                if job.chunks is not None:
+                    job.chunks.put(e)
+                job.future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._busy = False
+                    self._completed += 1
+
+    @staticmethod
+    def _finish(job: _Job, result: Any) -> None:
+        if job.chunks is not None:
+            job.chunks.put(_END)
+        job.future.set_result(result)
+
+
+_worker: Optional[InferenceWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> InferenceWorker:
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = InferenceWorker()
+    return _worker
+
+
+def worker_stats() -> Dict[str, Any]:
+    return get_worker().stats()
+
+
+def _run_completion(prompt: str, max_tokens: int, temperature: float):
+    def run(llm, job: _Job):
+        started = time.perf_counter()
+        output = llm(prompt, max_tokens=max_tokens, temperature=temperature, stop=_STOP, echo=False)
+        tokens = int((output.get("usage") or {}).get("completion_tokens") or 0)
+        job.worker.record_decode(tokens, time.perf_counter() - started)
+        return output
+
+    return run
+
+
+def _run_stream(prompt: str, max_tokens: int, temperature: float):
+    def run(llm, job: _Job):
+        first_at = None
+        tokens = 0
+        for chunk in llm(prompt, max_tokens=max_tokens, temperature=temperature, stop=_STOP, echo=False, stream=True):
+            if job.cancelled:
+                break  # consumer went away; free the model for the next job
+            text = chunk["choices"][0].get("text") or ""
+            if first_at is None:
+                first_at = time.perf_counter()
+            tokens += 1
+            if text:
+                job.chunks.put(text)
+        if first_at is not None:
+            job.worker.record_decode(tokens, time.perf_counter() - first_at)
+
+    return run
+
+
+# ── public API ────────────────────────────────────────────────────────────
+
+
+def generate(
+    prompt: str,
+    max_tokens: int = 256,
+    temperature: float = 0.7,
+    *,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> Optional[str]:
     """Generate text from the local GGUF model.
 
     Returns the generated text or None on failure.
     """
-    llm = _ensure_model()
-    if llm is None:
+    if _ensure_model() is None:
         return None
 
     try:
-        output = llm(
-            prompt,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            stop=["User:", "\n\n\n"],
-            echo=False,
-        )
+        job = get_worker().submit(_run_completion(prompt, max_tokens, temperature), priority=priority)
+        output = job.future.result()
         text = output["choices"][0]["text"].strip()
         return text if text else None
     except Exception as e:
@@ -77,22 +274,58 @@ def generate(prompt: str, max_tokens: int = 256, temperature: float = 0.7) -> Op
         return None
 
 
-def chat(messages: list, max_tokens: int = 256, temperature: float = 0.7) -> Optional[str]:
+def generate_stream(
+    prompt: str,
+    max_tokens: int = 256,
+    temperature: float = 0.7,
+    *,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> Iterator[str]:
+    """Yield completion text chunks from the local GGUF model as they decode.
+
+    Unlike ``generate``, errors propagate: a caller that already forwarded
+    some chunks needs to know the stream broke part-way. Closing the
+    generator early cancels the job so the worker moves on.
+    """
+    if _ensure_model() is None:
+        return
+    job = get_worker().submit(_run_stream(prompt, max_tokens, temperature), priority=priority, stream=True)
+    try:
+        while True:
+            item = job.chunks.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        job.cancelled = True
+
+
+def chat(
+    messages: list,
+    max_tokens: int = 256,
+    temperature: float = 0.7,
+    *,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> Optional[str]:
     """Chat-style generation using the GGUF model's chat format.
 
     Args:
         messages: List of {"role": "user"/"assistant"/"system", "content": str}
     """
-    llm = _ensure_model()
-    if llm is None:
+    if _ensure_model() is None:
         return None
 
+    def run(llm, job: _Job):
+        started = time.perf_counter()
+        output = llm.create_chat_completion(messages=messages, max_tokens=max_tokens, temperature=temperature)
+        tokens = int((output.get("usage") or {}).get("completion_tokens") or 0)
+        job.worker.record_decode(tokens, time.perf_counter() - started)
+        return output
+
     try:
-        output = llm.create_chat_completion(
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature,
-        )
+        output = get_worker().submit(run, priority=priority).future.result()
         text = output["choices"][0]["message"]["content"].strip()
         return text if text else None
     except Exception as e:
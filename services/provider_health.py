@@ -0,0 +1,263 @@
+"""Per-provider health tracking and circuit breakers for the AI router.
+
+``multi_ai_response`` used to walk a fixed provider list on every message,
+so a dead Ollama cost a full connect timeout per turn and a broken GGUF
+setup retried its model load each time. ``ProviderHealth`` keeps a rolling
+window of outcomes per provider and:
+
+- opens a circuit after ``breaker_failures`` consecutive failures, so the
+  router skips that provider at zero cost;
+- after ``cooldown_s`` moves it to half-open: a registered probe runs in
+  the background (the provider stays skipped until it passes), and without
+  a probe a single live request is let through as the trial;
+- orders the remaining providers by observed p50 time-to-first-token,
+  demoting any with a high recent error rate and keeping the static order
+  for ties and for providers with no samples yet. Only streamed calls
+  yield TTFT samples; total latencies are tracked separately.
+
+State is seeded from the records ``log_inference`` already writes, so a
+restart does not forget which providers are slow or down.
+"""
+
+from __future__ import annotations
+
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+log = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+ProbeFn = Callable[[], bool]
+
+# Fewer successful samples than this give no meaningful p95.
+_MIN_P95_SAMPLES = 5
+
+
+def _p95(values: Iterable[float]) -> Optional[float]:
+    ordered = sorted(values)
+    if len(ordered) < _MIN_P95_SAMPLES:
+        return None
+    return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+@dataclass
+class _ProviderState:
+    # Outcomes drive the error rate. Latencies are kept apart by kind: a
+    # non-streamed call only has its total latency, which must not pass for
+    # a (much shorter) time-to-first-token.
+    outcomes: Deque[bool]
+    ttft: Deque[float]
+    latency: Deque[float]
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    trial_in_flight: bool = False
+    probing: bool = False
+    last_error: Optional[str] = None
+
+    def p50_ttft_ms(self) -> Optional[float]:
+        return statistics.median(self.ttft) if self.ttft else None
+
+    def p95_ttft_ms(self) -> Optional[float]:
+        return _p95(self.ttft)
+
+    def p95_latency_ms(self) -> Optional[float]:
+        return _p95(self.latency)
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for ok in self.outcomes if not ok) / len(self.outcomes)
+
+
+@dataclass
+class ProviderHealth:
+    """Rolling health, circuit breaking and latency ordering for providers."""
+
+    window: int = 50
+    breaker_failures: int = 3
+    cooldown_s: float = 30.0
+    demote_error_rate: float = 0.5
+    clock: Callable[[], float] = time.monotonic
+    _states: Dict[str, _ProviderState] = field(default_factory=dict, init=False, repr=False)
+    _probes: Dict[str, ProbeFn] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def register_probe(self, provider: str, probe: ProbeFn) -> None:
+        """Cheap health check run in the background while *provider* is half-open."""
+        self._probes[provider] = probe
+
+    # ── recording ─────────────────────────────────────────────────────────
+
+    def record(
+        self,
+        provider: str,
+        success: bool,
+        ttft_ms: Optional[float],
+        error: Optional[str] = None,
+        *,
+        latency_ms: Optional[float] = None,
+    ) -> None:
+        """Record one call. *ttft_ms* is None when nothing was streamed."""
+        with self._lock:
+            state = self._state(provider)
+            state.outcomes.append(bool(success))
+            if success and ttft_ms is not None:
+                state.ttft.append(float(ttft_ms))
+            if success and latency_ms is not None:
+                state.latency.append(float(latency_ms))
+            state.trial_in_flight = False
+            if success:
+                state.state = CLOSED
+                state.consecutive_failures = 0
+                state.last_error = None
+                return
+            state.consecutive_failures += 1
+            state.last_error = error
+            if state.state == HALF_OPEN or state.consecutive_failures >= self.breaker_failures:
+                self._open(provider, state)
+
+    def seed(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Replay ``log_inference`` records (oldest first); returns how many were used."""
+        used = 0
+        for record in records:
+            provider = record.get("provider")
+            if not provider or provider == "none" or "success" not in record:
+                continue
+            latency = record.get("latency_ms")
+            ttft = record.get("ttft_ms")
+            if latency is None and ttft is None:
+                continue
+            if "streamed" in record:
+                streamed = bool(record["streamed"])
+            else:
+                # Older records reported total latency as TTFT for unstreamed calls.
+                streamed = ttft is not None and (latency is None or ttft < latency)
+            self.record(
+                provider,
+                bool(record["success"]),
+                ttft if streamed else None,
+                record.get("error"),
+                latency_ms=latency,
+            )
+            used += 1
+        # Breakers tripped by history start their cooldown now, not at log time.
+        with self._lock:
+            for state in self._states.values():
+                if state.state == OPEN:
+                    state.opened_at = self.clock()
+        return used
+
+    # ── routing ───────────────────────────────────────────────────────────
+
+    def allow(self, provider: str) -> bool:
+        """Whether the router should try *provider* now."""
+        with self._lock:
+            state = self._state(provider)
+            if state.state == CLOSED:
+                return True
+            if state.state == OPEN:
+                if self.clock() - state.opened_at < self.cooldown_s:
+                    return False
+                state.state = HALF_OPEN
+                state.trial_in_flight = False
+            # Half-open: probe in the background if we can, else one live trial.
+            probe = self._probes.get(provider)
+            if probe is not None:
+                if not state.probing:
+                    state.probing = True
+                    threading.Thread(
+                        target=self._run_probe, args=(provider, probe), name=f"probe-{provider}", daemon=True
+                    ).start()
+                return False
+            if state.trial_in_flight:
+                return False
+            state.trial_in_flight = True
+            return True
+
+    def order(self, providers: Sequence[str]) -> List[str]:
+        """*providers* sorted fastest-first by p50 TTFT; unknown ones keep their place."""
+        with self._lock:
+            def key(item: Tuple[int, str]) -> Tuple[bool, float, int]:
+                index, name = item
+                state = self._states.get(name)
+                if state is None:
+                    return (False, float("inf"), index)
+                p50 = state.p50_ttft_ms()
+                return (
+                    state.error_rate() >= self.demote_error_rate,
+                    p50 if p50 is not None else float("inf"),
+                    index,
+                )
+
+            return [name for _, name in sorted(enumerate(providers), key=key)]
+
+    def p95_ttft_ms(self, provider: str) -> Optional[float]:
+        with self._lock:
+            state = self._states.get(provider)
+            return state.p95_ttft_ms() if state is not None else None
+
+    def p95_latency_ms(self, provider: str) -> Optional[float]:
+        """p95 of total call latency, the budget for a non-streamed call."""
+        with self._lock:
+            state = self._states.get(provider)
+            return state.p95_latency_ms() if state is not None else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "state": state.state,
+                    "p50_ttft_ms": state.p50_ttft_ms(),
+                    "error_rate": round(state.error_rate(), 3),
+                    "samples": len(state.outcomes),
+                    "ttft_samples": len(state.ttft),
+                    "consecutive_failures": state.consecutive_failures,
+                    "last_error": state.last_error,
+                }
+                for name, state in self._states.items()
+            }
+
+    # ── internals ─────────────────────────────────────────────────────────
+
+    def _state(self, provider: str) -> _ProviderState:
+        # Caller holds self._lock.
+        state = self._states.get(provider)
+        if state is None:
+            size = max(1, self.window)
+            state = _ProviderState(
+                outcomes=deque(maxlen=size), ttft=deque(maxlen=size), latency=deque(maxlen=size)
+            )
+            self._states[provider] = state
+        return state
+
+    def _open(self, provider: str, state: _ProviderState) -> None:
+        # Caller holds self._lock.
+        if state.state != OPEN:
+            log.warning("Circuit opened for provider %s after %d failures", provider, state.consecutive_failures)
+        state.state = OPEN
+        state.opened_at = self.clock()
+
+    def _run_probe(self, provider: str, probe: ProbeFn) -> None:
+        try:
+            healthy = bool(probe())
+        except Exception as exc:
+            log.debug("Probe for %s raised: %s", provider, exc)
+            healthy = False
+        with self._lock:
+            state = self._state(provider)
+            state.probing = False
+            if healthy:
+                log.info("Circuit closed for provider %s after a passing probe", provider)
+                state.state = CLOSED
+                state.consecutive_failures = 0
+            else:
+                self._open(provider, state)
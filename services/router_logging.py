@@ -22,3 +22,25 @@ def get_recent_logs(limit: int = 50) -> List[Dict[str, Any]]:
     lines = LOG_PATH.read_text(encoding="utf-8").strip().splitlines()
     recent = lines[-limit:]
     return [json.loads(line) for line in reversed(recent)]
+
+
+def prompt_cache_stats(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-provider prompt-cache hit rates from ``log_inference`` records."""
+    stats: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        if "prompt_tokens" not in record:
+            continue
+        entry = stats.setdefault(
+            record.get("provider") or "none",
+            {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "prefixes": set()},
+        )
+        entry["requests"] += 1
+        entry["prompt_tokens"] += int(record.get("prompt_tokens") or 0)
+        entry["cached_tokens"] += int(record.get("cached_tokens") or 0)
+        if record.get("prefix_hash"):
+            entry["prefixes"].add(record["prefix_hash"])
+    for entry in stats.values():
+        prompt_tokens = entry["prompt_tokens"]
+        entry["cached_ratio"] = round(entry["cached_tokens"] / prompt_tokens, 3) if prompt_tokens else 0.0
+        entry["distinct_prefixes"] = len(entry.pop("prefixes"))
+    return stats
@@ -22,6 +22,7 @@ from app.orchestrator.security.approval import ApprovalStatus, PendingApproval
 from app.tools.types import ApprovedToolExecution, ToolOperation
 from app.user_model.store import UserModelCorrectionStore
 from app.desktop_actions import DesktopActionBroker
+from app.memory.store import ChatWindow
 
 
 client = TestClient(app)
@@ -218,15 +219,24 @@ def test_v2_get_messages(monkeypatch):
         SimpleNamespace(id=2, session_id="session-abc", role="assistant", content="hello", timestamp=datetime(2026, 1, 2, 8, 1, 0)),
     ]
     monkeypatch.setattr(api_v2.memory_store, "get_session", lambda session_id: fake_session)
-    monkeypatch.setattr(api_v2.memory_store, "get_chat_history", lambda session_id: fake_messages)
+    windows = []
 
-    response = client.get("/api/v2/sessions/session-abc/messages")
+    def fake_window(session_id, limit=50, *, before_id=None):
+        windows.append((session_id, limit, before_id))
+        return ChatWindow(fake_messages, total=7, next_before_id=1)
+
+    monkeypatch.setattr(api_v2.memory_store, "get_chat_window", fake_window)
+
+    response = client.get("/api/v2/sessions/session-abc/messages", params={"limit": 2, "before_id": 9})
 
     assert response.status_code == 200
     body = response.json()
     assert body["api_version"] == "v2"
     assert len(body["messages"]) == 2
     assert body["messages"][1]["content"] == "hello"
+    assert body["total"] == 7
+    assert body["next_before_id"] == 1
+    assert windows == [("session-abc", 2, 9)]
 
 
 def test_v2_chat_contract(monkeypatch):
@@ -242,17 +252,14 @@ def test_v2_chat_contract(monkeypatch):
         SimpleNamespace(id=11, session_id="session-chat", role="assistant", content="I can do that once you approve it.", timestamp=datetime(2026, 1, 3, 12, 0, 1)),
     ]
 
-    def fake_history(session_id):
-        return persisted_messages if fake_history.calls else []
-
-    fake_history.calls = 0
-
-    def history_wrapper(session_id):
-        result = fake_history(session_id)
-        fake_history.calls += 1
-        return result
-
-    monkeypatch.setattr(api_v2.memory_store, "get_chat_history", history_wrapper)
+    monkeypatch.setattr(
+        api_v2.memory_store, "get_chat_window", lambda session_id, limit=50, **kwargs: ChatWindow([])
+    )
+    monkeypatch.setattr(
+        api_v2.memory_store,
+        "get_messages_by_ids",
+        lambda ids: {msg.id: msg for msg in persisted_messages if msg.id in ids},
+    )
     monkeypatch.setattr(api_v2.memory_store, "get_session", lambda session_id: fake_session)
     monkeypatch.setattr(
         api_v2.agent,
@@ -314,7 +321,8 @@ def test_v2_chat_contract(monkeypatch):
         def __init__(self, store):
             self.store = store
 
-        def get_craving_expression(self, session_id):
+        @staticmethod
+        def expression_for_score(score):
             return "clingy"
 
     monkeypatch.setattr(api_v2, "CravingEngine", FakeCravingEngine)
@@ -383,17 +391,14 @@ def test_v2_chat_with_attachments_and_deltas(monkeypatch):
         ),
     ]
 
-    def fake_history(session_id):
-        return persisted_messages if fake_history.calls else []
-
-    fake_history.calls = 0
-
-    def history_wrapper(session_id):
-        result = fake_history(session_id)
-        fake_history.calls += 1
-        return result
-
-    monkeypatch.setattr(api_v2.memory_store, "get_chat_history", history_wrapper)
+    monkeypatch.setattr(
+        api_v2.memory_store, "get_chat_window", lambda session_id, limit=50, **kwargs: ChatWindow([])
+    )
+    monkeypatch.setattr(
+        api_v2.memory_store,
+        "get_messages_by_ids",
+        lambda ids: {msg.id: msg for msg in persisted_messages if msg.id in ids},
+    )
     monkeypatch.setattr(api_v2.memory_store, "get_session", lambda session_id: fake_session)
     class FakeMediaSessions:
         def __init__(self):
@@ -480,7 +485,8 @@ def test_v2_chat_with_attachments_and_deltas(monkeypatch):
         def __init__(self, store):
             self.store = store
 
-        def get_craving_expression(self, session_id):
+        @staticmethod
+        def expression_for_score(score):
             return "neutral"
 
     monkeypatch.setattr(api_v2, "CravingEngine", FakeCravingEngine)
@@ -528,7 +534,6 @@ def test_v2_chat_with_attachments_and_deltas(monkeypatch):
         "message.received",
         "response.started",
         "message.delta",
-        "message.delta",
         "message.created",
         "message.completed",
         "avatar.state",
@@ -548,8 +553,9 @@ def test_v2_chat_with_attachments_and_deltas(monkeypatch):
     assert None not in turn_ids
     assert "avatar.life_state_changed" in event_names
     delta_events = [event for event in published_events if event["event"] == "message.delta"]
-    assert delta_events[0]["payload"]["content"] == "I see the "
-    assert delta_events[1]["payload"]["content"] == "I see the skyline."
+    # Both tokens land inside one coalescing window and go out as a single suffix.
+    assert [event["payload"]["delta"] for event in delta_events] == ["I see the skyline."]
+    assert [event["payload"]["seq"] for event in delta_events] == [1]
     received_event = next(
         event for event in published_events if event["event"] == "message.received"
     )
@@ -596,13 +602,14 @@ def test_v2_interrupted_chat_discards_assistant_message(monkeypatch):
 
     fake_media = FakeMediaSessions()
     monkeypatch.setattr(api_v2, "media_sessions", fake_media)
-    history_calls = {"count": 0}
-
-    def fake_history(_session_id):
-        history_calls["count"] += 1
-        return [] if history_calls["count"] == 1 else persisted_messages
-
-    monkeypatch.setattr(api_v2.memory_store, "get_chat_history", fake_history)
+    monkeypatch.setattr(
+        api_v2.memory_store, "get_chat_window", lambda session_id, limit=50, **kwargs: ChatWindow([])
+    )
+    monkeypatch.setattr(
+        api_v2.memory_store,
+        "get_messages_by_ids",
+        lambda ids: {msg.id: msg for msg in persisted_messages if msg.id in ids},
+    )
     monkeypatch.setattr(api_v2.memory_store, "get_session", lambda _session_id: fake_session)
     deleted = []
     monkeypatch.setattr(
@@ -1447,19 +1454,17 @@ def test_v2_return_after_absence_candidate(monkeypatch):
     monkeypatch.setattr(api_v2, "initiative_service", fake_service)
     monkeypatch.setattr(api_v2, "media_sessions", FakeMediaSessions())
     monkeypatch.setattr(api_v2.event_bus, "publish", fake_publish)
+    observed = []
     monkeypatch.setattr(
-        api_v2.context_events,
-        "observe",
-        lambda **kwargs: SimpleNamespace(
-            accepted=True,
-            event=SimpleNamespace(session_id=kwargs["session_id"]),
-            to_dict=lambda: {"accepted": True, "event": kwargs},
-        ),
+        api_v2,
+        "context_ingest",
+        SimpleNamespace(submit=lambda **kwargs: observed.append(kwargs) or True),
     )
 
     response = client.post("/api/v2/initiative/activity", params={"session_id": "default", "state": "away", "source": "test"})
     assert response.status_code == 200
     assert response.json()["state"] == "away"
+    assert observed[-1]["kind"] == "user_away"
 
     response = client.post("/api/v2/initiative/return-after-absence", params={"session_id": "default"})
     assert response.status_code == 200
@@ -1904,7 +1909,7 @@ def test_v2_memory_search(monkeypatch):
     monkeypatch.setattr(
         api_v2.memory_store,
         "graph_rag_search",
-        lambda query, k=5: [
+        lambda query, k=5, timings=None: [
             {
                 "text": "Met Bob at the cafe",
                 "metadata": {"type": "user_input"},
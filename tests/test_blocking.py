@@ -0,0 +1,57 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+from app.blocking import BlockingPool
+
+_request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def test_pool_bounds_concurrency_and_reports_queue():
+    pool = BlockingPool("test", max_workers=2)
+    release = threading.Event()
+    active = []
+    peak = []
+
+    def work():
+        active.append(1)
+        peak.append(len(active))
+        release.wait(2)
+        active.pop()
+
+    async def main():
+        tasks = [asyncio.create_task(pool.run(work)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        stats = pool.stats()
+        release.set()
+        await asyncio.gather(*tasks)
+        return stats
+
+    stats = asyncio.run(main())
+    pool.shutdown()
+
+    assert stats == {"max_workers": 2, "running": 2, "queued": 3, "completed": 0}
+    assert max(peak) == 2
+    assert pool.stats()["completed"] == 5
+
+
+def test_loop_keeps_ticking_while_blocking_work_runs():
+    pool = BlockingPool("test", max_workers=1)
+    ticks = []
+
+    async def heartbeat():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        beat = asyncio.create_task(heartbeat())
+        _request_id.set("turn-1")
+        seen = await pool.run(lambda: (time.sleep(0.2), _request_id.get())[1])
+        beat.cancel()
+        return seen
+
+    assert asyncio.run(main()) == "turn-1"
+    pool.shutdown()
+    assert len(ticks) >= 5
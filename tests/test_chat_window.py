@@ -0,0 +1,47 @@
+import uuid
+
+from app.memory.store import MemoryStore
+
+
+def _session_with_messages(store, count):
+    session_id = f"window-{uuid.uuid4().hex[:8]}"
+    store.create_session(session_id)
+    ids = [store.add_chat_message(session_id, "user", f"msg {i}").id for i in range(count)]
+    return session_id, ids
+
+
+def test_chat_window_returns_newest_page_oldest_first():
+    store = MemoryStore()
+    session_id, ids = _session_with_messages(store, 7)
+
+    window = store.get_chat_window(session_id, limit=3)
+
+    assert [m.content for m in window] == ["msg 4", "msg 5", "msg 6"]
+    assert window.total == 7
+    assert len(window) == 3
+    assert window.next_before_id == ids[4]
+
+
+def test_chat_window_pages_backwards_with_before_id():
+    store = MemoryStore()
+    session_id, ids = _session_with_messages(store, 5)
+
+    first = store.get_chat_window(session_id, limit=2)
+    second = store.get_chat_window(session_id, limit=2, before_id=first.next_before_id)
+    last = store.get_chat_window(session_id, limit=2, before_id=second.next_before_id)
+
+    assert [m.id for m in second] == ids[1:3]
+    assert [m.id for m in last] == ids[:1]
+    assert last.next_before_id is None
+    assert store.get_chat_window(session_id, limit=10).next_before_id is None
+
+
+def test_messages_by_ids_skips_unknown_ids():
+    store = MemoryStore()
+    session_id, ids = _session_with_messages(store, 2)
+
+    found = store.get_messages_by_ids([ids[1], None, 10**9])
+
+    assert list(found) == [ids[1]]
+    assert found[ids[1]].content == "msg 1"
+    assert store.get_messages_by_ids([]) == {}
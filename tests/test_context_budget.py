@@ -0,0 +1,99 @@
+from app.api.models import ToolCall
+from app.orchestrator.context_budget import (
+    TRUNCATION_MARK,
+    ContextAssembler,
+    Section,
+    TokenCounter,
+    summarize_tool_calls,
+    token_counter,
+)
+
+# One token per whitespace-separated word keeps the arithmetic readable.
+WORDS = TokenCounter("words", lambda text: len(text.split()))
+
+
+def _words(n, word="w"):
+    return " ".join(f"{word}{i}" for i in range(n))
+
+
+def test_required_sections_are_kept_and_low_priority_sections_shrink_first():
+    assembler = ContextAssembler(WORDS, budget=100)
+
+    out = assembler.assemble(
+        {"persona": _words(20), "user": _words(10)},
+        [
+            Section("context", 1, 0.5, text=_words(30)),
+            Section("memory", 3, 0.5, text=_words(30)),
+            Section("few_shot", 5, 0.5, text=_words(30)),
+        ],
+    )
+
+    assert out.texts["persona"] == _words(20)
+    assert out.usage["context"] == {"tokens": 30, "cap": 35, "truncated": False}
+    assert out.usage["memory"]["truncated"] is False
+    # Only 10 tokens remain for the lowest-priority section.
+    assert out.usage["few_shot"]["truncated"] is True
+    assert out.usage["few_shot"]["tokens"] <= 10
+    assert out.texts["few_shot"].endswith(TRUNCATION_MARK)
+    assert out.total_tokens <= 100
+
+
+def test_history_drops_oldest_messages_first():
+    assembler = ContextAssembler(WORDS, budget=20)
+    history = [{"role": "user", "content": _words(8, f"m{i}_")} for i in range(4)]
+
+    out = assembler.assemble({}, [Section("history", 4, 1.0, messages=history)])
+
+    assert out.messages["history"] == history[-2:]
+    assert out.usage["history"] == {"tokens": 16, "cap": 20, "truncated": True}
+
+
+def test_short_attachments_stay_whole_and_long_ones_absorb_the_slack():
+    assembler = ContextAssembler(WORDS, budget=40)
+
+    out = assembler.assemble({}, [Section("attachments", 2, 1.0, items=[_words(50, "a"), _words(5, "b")])])
+
+    long_item, short_item = out.items["attachments"]
+    assert short_item == _words(5, "b")
+    assert long_item.endswith(TRUNCATION_MARK)
+    assert out.usage["attachments"]["tokens"] <= 40
+
+
+def test_tool_results_are_summarized_compactly():
+    calls = [
+        ToolCall(tool_name="weather", args={"city": "LA"}, result={"temp": 21, "rows": list(range(500))}),
+        ToolCall(tool_name="noop", args={}, status="error"),
+    ]
+
+    summary = summarize_tool_calls(calls, max_result_chars=40)
+
+    lines = summary.splitlines()
+    assert lines[0] == "Tool results:"
+    assert lines[1].startswith('- weather({"city":"LA"}) [success]: {"temp":21,')
+    assert lines[1].endswith(TRUNCATION_MARK)
+    assert lines[2] == "- noop({}) [error]"
+    assert summarize_tool_calls([]) == ""
+
+
+def test_gguf_counter_uses_the_loaded_model_only(monkeypatch):
+    import warnings
+
+    from app.config import settings
+    from services import llama_local
+
+    class FakeLlama:
+        def tokenize(self, data, add_bos=True):
+            return data.split()
+
+    monkeypatch.setattr(settings, "gguf_model_path", "/models/fake.gguf")
+    monkeypatch.setattr(llama_local, "_llm", None)
+    assert token_counter().name == "estimate"
+
+    monkeypatch.setattr(llama_local, "_llm", FakeLlama())
+    counter = token_counter()
+    assert counter.name == "gguf"
+    assert counter.count("three short words") == 3
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        summarize_tool_calls([ToolCall(tool_name="noop", args={})])
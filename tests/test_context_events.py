@@ -237,6 +237,30 @@ def test_context_delivery_status_tracks_retry_and_emission(tmp_path, monkeypatch
     )
 
 
+def test_emitted_event_outlives_its_ttl_for_feedback(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "context_commentary_enabled", True)
+    service = _service(tmp_path)
+    decision = service.observe(
+        source="presence",
+        kind="user_returned",
+        category="wellbeing",
+        confidence=0.95,
+        sensitivity="private",
+        ttl_seconds=60,
+    )
+    event_id = decision.event.event_id
+    service.mark_delivery(event_id, emitted=True)
+
+    later = datetime.now(timezone.utc) + timedelta(minutes=2)
+    assert service.store.get(event_id, now=later)["commentary_status"] == "emitted"
+    assert service.store.pending(now=later) == []
+    assert service.record_feedback(event_id, "useful")["action"] == "useful"
+
+    restored = ContextEventStore(tmp_path / "context_events.json")
+    assert restored.get(event_id, now=later) is not None
+    assert restored.get(event_id, now=later + timedelta(days=8)) is None
+
+
 def test_commentary_claim_is_atomic_and_stale_claims_recover(
     tmp_path,
     monkeypatch,
@@ -347,3 +371,40 @@ def test_commentary_toggle_authorizes_initiative_type_for_legacy_settings(
     policy = InitiativePolicy.from_settings()
 
     assert "context_commentary" in policy.allowed_types
+
+
+def _event(event_id: str, now: datetime, *, ttl: int = 600, **extra) -> dict:
+    return {
+        "event_id": event_id,
+        "observed_at": now.isoformat(),
+        "expires_at": (now + timedelta(seconds=ttl)).isoformat(),
+        **extra,
+    }
+
+
+def test_context_event_store_indexes_dedup_queue_and_expiry(tmp_path) -> None:
+    store = ContextEventStore(tmp_path / "context_events.json", limit=3)
+    now = datetime.now(timezone.utc)
+    store.add(_event("a", now, ttl=30, dedup_key="k", commentary_status="queued"), now=now)
+    store.add(_event("b", now + timedelta(seconds=1), dedup_key="k"), now=now)
+    store.add(_event("c", now, ttl=3600, commentary_status="queued"), now=now)
+
+    assert store.find_recent_dedup("k", since=now, now=now)["event_id"] == "b"
+    assert [event["event_id"] for event in store.pending(now=now)] == ["a", "c"]
+    assert store.claim_commentary("c", now=now)["commentary_status"] == "delivering"
+    assert store.claim_commentary("c", now=now) is None
+
+    later = now + timedelta(seconds=31)
+    assert store.get("a", now=later) is None
+    assert store.pending(now=later) == []
+    # A stale claim goes back on the queue.
+    assert [event["event_id"] for event in store.pending(now=now + timedelta(minutes=11))] == ["c"]
+
+    store.add(_event("d", later), now=later)
+    store.add(_event("e", later), now=later)
+    assert [event["event_id"] for event in store.recent(limit=10, now=later)] == ["c", "d", "e"]
+    assert store.find_recent_dedup("k", since=now, now=later) is None
+    assert store.diagnostics()["buffered_events"] == 3
+
+    restored = ContextEventStore(tmp_path / "context_events.json", limit=3)
+    assert [event["event_id"] for event in restored.recent(limit=10, now=later)] == ["c", "d", "e"]
@@ -0,0 +1,108 @@
+import asyncio
+
+from app.config import settings
+from app.context_events.feedback import ContextFeedbackStore
+from app.context_events.ingest import ContextIngestPipeline, OverloadPolicy, parse_overload_policies
+from app.context_events.service import ContextEventService
+from app.context_events.store import ContextEventStore
+
+
+def _service(tmp_path) -> ContextEventService:
+    return ContextEventService(
+        ContextEventStore(tmp_path / "context_events.json"),
+        ContextFeedbackStore(tmp_path / "context_feedback.json"),
+    )
+
+
+def _observation(source="camera", kind="presence", **payload):
+    return {
+        "source": source,
+        "kind": kind,
+        "category": "wellbeing",
+        "confidence": 0.9,
+        "sensitivity": "private",
+        "payload": payload,
+    }
+
+
+def test_parse_overload_policies():
+    policies = parse_overload_policies("screen:keep, camera:presence:sample:4,*:drop,bogus")
+
+    assert policies == {
+        "screen": OverloadPolicy("keep"),
+        "camera:presence": OverloadPolicy("sample", 4),
+        "*": OverloadPolicy("drop"),
+    }
+
+
+def test_batches_collapse_duplicates_and_publish(tmp_path):
+    service = _service(tmp_path)
+    published = []
+
+    async def publish(decision):
+        published.append(decision)
+
+    pipeline = ContextIngestPipeline(service, publish, batch_window_ms=10)
+
+    async def main():
+        for index in range(6):
+            assert pipeline.submit(**_observation(person=index % 2))
+        await pipeline.stop()
+
+    asyncio.run(main())
+    stats = pipeline.stats()
+
+    assert len(published) == 6
+    assert stats["accepted"] == 2
+    assert stats["deduped"] == 4
+    assert stats["batches"] == 1
+    assert len(service.store.recent(limit=10)) == 2
+
+
+def test_overload_samples_and_drops_by_policy(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "context_min_confidence", 0.5)
+    pipeline = ContextIngestPipeline(
+        _service(tmp_path),
+        queue_size=8,
+        batch_window_ms=0,
+        policies="screen:keep,mqtt:drop,*:sample:2",
+    )
+
+    async def main():
+        # Nothing yields to the worker, so the queue only fills up.
+        results = [pipeline.submit(**_observation(n=index)) for index in range(4)]
+        results += [pipeline.submit(**_observation(n=index)) for index in range(4, 8)]
+        results.append(pipeline.submit(**_observation(source="mqtt", kind="sensor")))
+        results.append(pipeline.submit(**_observation(source="screen", kind="capture")))
+        stats = pipeline.stats()
+        await pipeline.stop()
+        return results, stats
+
+    results, stats = asyncio.run(main())
+
+    assert results == [True] * 4 + [True, False, True, False, False, True]
+    assert stats["queue_depth"] == 7
+    assert stats["sampled_out"] == 2
+    assert stats["dropped_overload"] == 1
+    assert stats["dropped"] == 3
+    assert pipeline.stats()["accepted"] == 7
+
+
+def test_failed_batches_are_counted(tmp_path):
+    service = _service(tmp_path)
+
+    def broken(batch):
+        raise RuntimeError("store down")
+
+    service.observe_many = broken
+    pipeline = ContextIngestPipeline(service, batch_window_ms=0)
+
+    async def main():
+        pipeline.submit(**_observation())
+        pipeline.submit(**_observation(n=1))
+        await pipeline.stop()
+
+    asyncio.run(main())
+
+    assert pipeline.stats()["failed"] == 2
+    assert pipeline.stats()["accepted"] == 0
@@ -0,0 +1,64 @@
+from app.memory.embed_cache import EmbeddingCache, cache_key, get_embedding_cache
+from app.memory.store import MemoryStore
+
+
+def _cache(tmp_path, **overrides):
+    options = {"max_entries": 100, "memory_entries": 8}
+    options.update(overrides)
+    return EmbeddingCache(tmp_path / "embed_cache.sqlite3", **options)
+
+
+def test_key_depends_on_model_and_text():
+    assert cache_key("m1", "hello") != cache_key("m2", "hello")
+    assert cache_key("m1", "hello") != cache_key("m1", "hello ")
+    assert len(cache_key("m1", "hello")) == 64
+
+
+def test_vectors_survive_a_restart_as_float32(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put_many("model", {"alpha": [0.1, 0.2, 0.3]})
+
+    reopened = _cache(tmp_path)
+    vector = reopened.get("model", "alpha")
+    assert vector is not None
+    assert [round(v, 6) for v in vector] == [0.1, 0.2, 0.3]
+    assert reopened.get("other-model", "alpha") is None
+    stats = reopened.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["disk_hits"] == 1
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, max_entries=3, memory_entries=0)
+    cache.put_many("m", {"a": [1.0], "b": [2.0], "c": [3.0]})
+    # Touch "a" so "b" becomes the oldest entry.
+    assert cache.get("m", "a") == [1.0]
+    cache.put_many("m", {"d": [4.0]})
+
+    assert cache.stats()["evictions"] >= 1
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0]
+    assert cache.get("m", "d") == [4.0]
+
+
+def test_memory_stores_share_the_process_cache():
+    first = MemoryStore()
+    second = MemoryStore()
+    assert first._embed_cache is second._embed_cache is get_embedding_cache()
+
+    first._embed_cache.put_many(first.embed_model_id, {"shared-cache-probe": [0.5] * first.expected_dim})
+    calls = []
+    second._load_embedder = lambda: calls.append(1)
+    assert second.embed_text("shared-cache-probe") == [0.5] * second.expected_dim
+    assert calls == []
+
+
+def test_reputting_a_text_refreshes_its_recency(tmp_path):
+    cache = _cache(tmp_path, max_entries=3, memory_entries=0)
+    cache.put_many("m", {"a": [1.0], "b": [2.0], "c": [3.0]})
+    # Re-embedding "a" counts as a use, so "b" is now the oldest entry.
+    cache.put_many("m", {"a": [1.0]})
+    assert cache.stats()["disk_entries"] == 3
+    cache.put_many("m", {"d": [4.0]})
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0]
@@ -0,0 +1,149 @@
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from app.config import settings
+from app.memory.embedding import EmbedCoalescer, iter_batches
+from app.memory.store import MemoryStore
+
+
+class _FakeEmbedder:
+    def __init__(self, dim):
+        self.dim = dim
+        self.calls = []
+
+    def encode(self, texts, batch_size=None, convert_to_tensor=False):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t))] * self.dim for t in texts], dtype=np.float32)
+
+
+def _store_with_fake_embedder():
+    store = MemoryStore()
+    fake = _FakeEmbedder(store.expected_dim)
+    store._load_embedder = lambda: fake
+    return store, fake
+
+
+def test_iter_batches_splits_in_order():
+    assert list(iter_batches(["a", "b", "c", "d", "e"], 2)) == [["a", "b"], ["c", "d"], ["e"]]
+    assert list(iter_batches([], 4)) == []
+
+
+def test_embed_many_uses_micro_batches_and_cache(monkeypatch):
+    monkeypatch.setattr(settings, "embed_batch_size", 3)
+    store, fake = _store_with_fake_embedder()
+    texts = [f"chunk-{i}-{uuid.uuid4().hex[:4]}" for i in range(7)]
+
+    vectors = store.embed_many(texts + [texts[0]])
+
+    assert [len(call) for call in fake.calls] == [3, 3, 1]
+    assert len(vectors) == 8
+    assert vectors[0] == vectors[-1]
+    assert len(vectors[0]) == store.expected_dim
+
+    # Everything is cached now: neither path re-encodes.
+    fake.calls.clear()
+    store.embed_many(texts)
+    store.embed_text(texts[3])
+    assert fake.calls == []
+
+
+def test_coalescer_merges_concurrent_single_calls():
+    release = threading.Event()
+    batches = []
+
+    def encode_batch(texts):
+        release.wait(timeout=2)
+        batches.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    coalescer = EmbedCoalescer(encode_batch, max_batch=16, window_ms=50)
+    results = {}
+
+    def worker(text):
+        results[text] = coalescer.submit(text)
+
+    threads = [threading.Thread(target=worker, args=(f"t{i}" * (i + 1),)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(results) == 6
+    assert all(results[text] == [float(len(text))] for text in results)
+    assert len(batches) < 6
+    assert coalescer.stats()["requests"] == 6
+
+
+def test_coalescer_propagates_encoder_errors():
+    def encode_batch(texts):
+        raise RuntimeError("embedder down")
+
+    coalescer = EmbedCoalescer(encode_batch, window_ms=0)
+    try:
+        coalescer.submit("hello")
+    except RuntimeError as exc:
+        assert "embedder down" in str(exc)
+    else:
+        raise AssertionError("expected the encoder error to reach the caller")
+
+
+def test_coalescer_falls_back_to_direct_embed_when_the_worker_stalls():
+    release = threading.Event()
+    calls = []
+
+    def encode_batch(texts):
+        calls.append(list(texts))
+        if texts == ["stuck"]:
+            release.wait(timeout=5)
+        return [[1.0] for _ in texts]
+
+    coalescer = EmbedCoalescer(encode_batch, window_ms=0, timeout_s=0.05)
+    stuck = threading.Thread(target=coalescer.submit, args=("stuck",))
+    stuck.start()
+    while not calls:
+        time.sleep(0.001)
+
+    assert coalescer.submit("next") == [1.0]
+    release.set()
+    stuck.join(timeout=5)
+    assert coalescer.stats()["timeouts"] == 2  # both callers gave up on the worker
+    # The abandoned request was cancelled, so the worker never encodes it.
+    time.sleep(0.05)
+    assert calls.count(["next"]) == 1
+
+
+def test_coalescer_restarts_a_dead_worker():
+    coalescer = EmbedCoalescer(lambda texts: [[2.0] for _ in texts], window_ms=0)
+    assert coalescer.submit("a") == [2.0]
+    coalescer._worker = threading.Thread(target=lambda: None)
+    coalescer._worker.start()
+    coalescer._worker.join()
+
+    assert coalescer.submit("b") == [2.0]
+    assert coalescer._worker.is_alive()
+
+
+def test_add_entities_embeds_only_new_entities_in_one_batch():
+    store, fake = _store_with_fake_embedder()
+    tag = uuid.uuid4().hex[:6]
+    existing = store.add_entity(f"Avery-{tag}", "person")
+    fake.calls.clear()
+
+    ids = store.add_entities(
+        [
+            {"name": f"Avery-{tag}", "type": "person"},
+            {"name": f"Toronto-{tag}", "type": "place"},
+            {"name": f"Launch-{tag}", "type": "concept"},
+            {"name": f"Toronto-{tag}", "type": "place"},
+        ],
+        "From text: test",
+    )
+
+    assert ids[0] == existing
+    assert ids[1] == ids[3]
+    assert len(set(ids)) == 3
+    assert len(fake.calls) == 1 and len(fake.calls[0]) == 2
@@ -0,0 +1,101 @@
+import json
+import uuid
+
+import numpy as np
+
+from app.memory import store as store_module
+from app.memory.entity_index import EntityIndex
+from app.memory.store import MemoryStore, engine
+from sqlalchemy.orm import Session as SQLSession
+
+
+def _unit(dim, hot):
+    vec = np.zeros(dim, dtype=np.float32)
+    vec[hot] = 1.0
+    return vec.tolist()
+
+
+def test_search_ranks_by_cosine_and_skips_bad_rows():
+    index = EntityIndex(4)
+    index.build(
+        [
+            (1, "north", [1.0, 0.0, 0.0, 0.0]),
+            (2, "east", json.dumps([0.0, 2.0, 0.0, 0.0])),  # SQLite text form
+            (3, "northeast", [1.0, 1.0, 0.0, 0.0]),
+            (4, "zero", [0.0, 0.0, 0.0, 0.0]),
+            (5, "wrong-dim", [1.0, 0.0]),
+            (6, "garbage", "not json"),
+        ]
+    )
+    assert len(index) == 3
+
+    matches = index.search([1.0, 0.1, 0.0, 0.0], limit=2)
+    assert [m.name for m in matches] == ["north", "northeast"]
+    assert matches[0].distance < matches[1].distance
+    assert index.search([0.0, 0.0, 0.0, 0.0]) == []
+
+
+def test_add_grows_past_capacity_and_is_noop_until_built():
+    index = EntityIndex(3)
+    index.add(99, "ignored", [1.0, 0.0, 0.0])
+    assert len(index) == 0
+
+    index.build([])
+    for i in range(300):
+        index.add(i, f"e{i}", [1.0, float(i), 0.0])
+    assert len(index) == 300
+    assert index.search([0.0, 1.0, 0.0], limit=1)[0].id == 299
+
+    index.invalidate()
+    assert not index.built
+
+
+def test_adds_during_a_rebuild_are_applied_after_the_swap():
+    index = EntityIndex(3)
+
+    def load():
+        # Committed after the SELECT ran, but appended before the swap.
+        index.add(2, "late", [0.0, 1.0, 0.0])
+        index.add(1, "seen", [1.0, 0.0, 0.0])  # also in the rows read
+        return [(1, "seen", [1.0, 0.0, 0.0])]
+
+    index.rebuild(load)
+
+    assert index.built
+    assert len(index) == 2
+    assert index.search([0.0, 1.0, 0.0], limit=1)[0].name == "late"
+
+    def load_and_invalidate():
+        index.invalidate()  # grooming deleted entities mid-read
+        return []
+
+    index.rebuild(load_and_invalidate)
+    assert not index.built
+
+
+def test_store_lookup_uses_index_and_tracks_new_entities():
+    store = MemoryStore()
+    dim = store.expected_dim
+    tag = uuid.uuid4().hex[:6]
+    vectors = {}
+
+    def fake_embed_many(texts):
+        out = []
+        for text in texts:
+            vectors.setdefault(text, _unit(dim, (len(vectors) + 7) % dim))
+            out.append(vectors[text])
+        return out
+
+    store.embed_many = fake_embed_many
+    first = store.add_entity(f"Harbor-{tag}", "place")
+    index = store_module._get_entity_index()
+
+    with SQLSession(engine) as session:
+        store._find_similar_entities(session, _unit(dim, 0), limit=1)
+        assert index.built
+        second = store.add_entity(f"Lighthouse-{tag}", "place")
+        target = vectors[f"place: Lighthouse-{tag} - "]
+        matches = store._find_similar_entities(session, target, limit=3)
+
+    assert matches[0].id == second
+    assert first in {m.id for m in index.search(vectors[f"place: Harbor-{tag} - "], limit=3)}
@@ -154,6 +154,7 @@ def test_chat_persists_share_on_explicit_message(monkeypatch, tmp_path):
     from fastapi.testclient import TestClient
     from app.api.main import app
     from app.api import v2 as api_v2
+    from app.memory.store import ChatWindow
     from app.user_model.store import UserModelCorrectionStore
 
     store_path = tmp_path / "corrections.json"
@@ -179,18 +180,18 @@ def test_chat_persists_share_on_explicit_message(monkeypatch, tmp_path):
 
     monkeypatch.setattr(api_v2.agent, "reply", mock_reply)
     monkeypatch.setattr(
-        api_v2.memory_store, "get_chat_history", lambda sid: []
+        api_v2.memory_store, "get_chat_window", lambda sid, limit=50, **kwargs: ChatWindow([])
     )
     monkeypatch.setattr(
         api_v2.memory_store, "get_session",
         lambda sid: SimpleNamespace(id=sid, user_id="default", title=None, created_at="2026-01-01", updated_at="2026-01-01"),
     )
     monkeypatch.setattr(
-        api_v2.memory_store, "get_chat_history",
-        lambda sid: [
-            SimpleNamespace(id=1, session_id=sid, role="user", content="test", timestamp="2026-01-01"),
-            SimpleNamespace(id=2, session_id=sid, role="assistant", content="ok", timestamp="2026-01-01"),
-        ],
+        api_v2.memory_store, "get_messages_by_ids",
+        lambda ids: {
+            1: SimpleNamespace(id=1, session_id="s1", role="user", content="test", timestamp="2026-01-01"),
+            2: SimpleNamespace(id=2, session_id="s1", role="assistant", content="ok", timestamp="2026-01-01"),
+        },
     )
 
     client = TestClient(app)
@@ -214,6 +215,7 @@ def test_chat_no_share_passes_no_extra_context(monkeypatch, tmp_path):
     from fastapi.testclient import TestClient
     from app.api.main import app
     from app.api import v2 as api_v2
+    from app.memory.store import ChatWindow
     from app.user_model.store import UserModelCorrectionStore
 
     store_path = tmp_path / "corrections.json"
@@ -233,11 +235,12 @@ def test_chat_no_share_passes_no_extra_context(monkeypatch, tmp_path):
     monkeypatch.setattr(api_v2.memory_store, "get_session",
         lambda sid: SimpleNamespace(id=sid, user_id="default", title=None, created_at="2026-01-01", updated_at="2026-01-01"),
     )
-    monkeypatch.setattr(api_v2.memory_store, "get_chat_history",
-        lambda sid: [
-            SimpleNamespace(id=1, session_id=sid, role="user", content="hi", timestamp="2026-01-01"),
-            SimpleNamespace(id=2, session_id=sid, role="assistant", content="hello", timestamp="2026-01-01"),
-        ],
+    monkeypatch.setattr(api_v2.memory_store, "get_chat_window", lambda sid, limit=50, **kwargs: ChatWindow([]))
+    monkeypatch.setattr(api_v2.memory_store, "get_messages_by_ids",
+        lambda ids: {
+            1: SimpleNamespace(id=1, session_id="s1", role="user", content="hi", timestamp="2026-01-01"),
+            2: SimpleNamespace(id=2, session_id="s1", role="assistant", content="hello", timestamp="2026-01-01"),
+        },
     )
 
     client = TestClient(app)
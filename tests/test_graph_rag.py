@@ -0,0 +1,82 @@
+import uuid
+
+import numpy as np
+
+from app.memory.store import MemoryStore
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.queries = []
+
+    def query(self, query_embeddings, n_results, where=None):
+        self.queries.append((len(query_embeddings), n_results))
+        docs, metas, dists = [], [], []
+        for i, _ in enumerate(query_embeddings):
+            docs.append([f"memory {i}-{j}" for j in range(n_results)])
+            metas.append([{"type": "user_input"} for _ in range(n_results)])
+            dists.append([0.1 * (j + 1) + 0.01 * i for j in range(n_results)])
+        return {"documents": docs, "metadatas": metas, "distances": dists}
+
+
+def _seeded_store():
+    store = MemoryStore()
+    dim = store.expected_dim
+    tag = uuid.uuid4().hex[:6]
+    hot = np.zeros(dim, dtype=np.float32)
+    hot[3] = 1.0
+    vectors = {}
+
+    def fake_embed_many(texts):
+        out = []
+        for text in texts:
+            if text not in vectors:
+                vec = np.random.default_rng(len(vectors)).standard_normal(dim).astype(np.float32)
+                if f"Maya-{tag}" in text:
+                    vec = hot.copy()
+                vectors[text] = vec.tolist()
+            out.append(vectors[text])
+        return out
+
+    store.embed_many = fake_embed_many
+    store.embed_text = lambda text: hot.tolist()
+    maya, cafe, bob = store.add_entities(
+        [
+            {"name": f"Maya-{tag}", "type": "person"},
+            {"name": f"Cafe-{tag}", "type": "place"},
+            {"name": f"Bob-{tag}", "type": "person"},
+        ]
+    )
+    store.add_relationship(maya, cafe, "co_occurrence")
+    store.add_relationship(bob, maya, "co_occurrence")
+    store.collection = _FakeCollection()
+    return store, tag
+
+
+def test_graph_rag_issues_a_single_multi_query():
+    store, tag = _seeded_store()
+    timings = {}
+
+    results = store.graph_rag_search("what did Maya say?", k=3, timings=timings)
+
+    assert len(store.collection.queries) == 1
+    n_queries, n_results = store.collection.queries[0]
+    assert n_queries >= 4  # the query plus Maya and both neighbours
+    assert n_results == 6
+    assert len(results) == 3
+    assert {"embed_query", "entity_lookup", "graph_expand", "embed_entities", "vector_query", "merge"} <= set(timings)
+    matched = {r.get("matched_entity") for r in results if r["source"] == "graph"}
+    assert f"Maya-{tag}" in matched
+
+
+def test_expanded_names_include_both_edge_directions():
+    store, tag = _seeded_store()
+    from app.memory.store import engine
+    from sqlalchemy.orm import Session as SQLSession
+
+    with SQLSession(engine) as session:
+        seeds = [m for m in store._find_similar_entities(session, store.embed_text("x"), limit=5) if m.name == f"Maya-{tag}"]
+        names = store._expanded_entity_names(session, seeds)
+
+    assert names[0] == f"Maya-{tag}"
+    assert {f"Cafe-{tag}", f"Bob-{tag}"} <= set(names[1:])
@@ -862,3 +862,30 @@ def test_scheduler_no_double_emit_across_types_at_limit(tmp_path):
     assert published.count("initiative.emitted") == 1
     assert published.count("initiative.suppressed") == 1
 
+
+
+def test_emission_ledger_indexes_and_compacts(tmp_path):
+    path = tmp_path / "initiative_state.json"
+    store = InitiativeStore(path, retention_days=3)
+    for day in range(1, 8):
+        for initiative_type in ("daily_greeting", "check_in"):
+            store.record_emitted(
+                initiative_type=initiative_type,
+                session_id="s",
+                message="Hi.",
+                reason="test",
+                emitted_at=datetime(2026, 4, day, 9, 0),
+            )
+
+    assert store.daily_count("2026-04-07") == 2
+    assert store.emitted_type_today("check_in", "2026-04-07")
+    assert not store.emitted_type_today("memory_followup", "2026-04-07")
+    # Three days ending on the newest one: 04-05 .. 04-07 are kept.
+    assert store.emission_count() == 6
+    assert store.daily_count("2026-04-04") == 0
+
+    restored = InitiativeStore(path, retention_days=3)
+    assert restored.emission_count() == 6
+    assert restored.daily_count("2026-04-05") == 2
+    assert restored.daily_count("2026-04-04") == 0
+    assert restored.emitted_type_today("daily_greeting", "2026-04-06")
@@ -215,6 +215,34 @@ def test_gate_suppresses_repeat_topic_within_window(tmp_path):
     assert "similar initiative" in (score.hard_reason or "")
 
 
+def test_gate_suppresses_rephrased_duplicate_under_new_topic(tmp_path):
+    memory = InitiativeEmissionMemory(tmp_path / "emissions.json")
+    gate = InitiativeQualityGate(memory)
+    first = _evidence_candidate()
+    gate.record_emission(first, gate.evaluate(first, now=_now()), now=_now() - timedelta(days=1))
+
+    rephrased = _evidence_candidate(
+        source_id="mem-2",
+        message="You mentioned Dana earlier - did that go anywhere?",
+        excerpt="Still need to follow up with Dana on the review checklist.",
+    )
+    unrelated = _evidence_candidate(
+        source_id="mem-3",
+        message='Earlier you mentioned: "book the dentist" - did that go anywhere?',
+        excerpt="I should book the dentist appointment before Friday.",
+    )
+    # A restarted gate rebuilds its index from the emission memory.
+    for current in (gate, InitiativeQualityGate(memory)):
+        score = current.evaluate(rephrased, now=_now())
+        assert score.max_similarity >= 0.85
+        assert score.novelty == 0.0
+        assert score.hard_reason == "near-duplicate initiative within 7d"
+        assert current.evaluate(unrelated, now=_now()).passed is True
+
+    later = _now() + timedelta(days=7)
+    assert gate.evaluate(rephrased, now=later).max_similarity == 0.0
+
+
 def test_gate_recency_decays_for_stale_evidence():
     gate = InitiativeQualityGate()
     fresh = gate.evaluate(_evidence_candidate(observed_hours_ago=14), now=_now())
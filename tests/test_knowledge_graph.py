@@ -0,0 +1,80 @@
+import uuid
+
+import pytest
+
+from app.memory.knowledge_graph import KnowledgeGraph
+from app.memory.store import MemoryStore
+
+
+def _chain_graph():
+    # 1 - 2 - 3 - 4, plus a weak 1 - 5 "knows" edge.
+    graph = KnowledgeGraph()
+    graph.load(
+        [
+            (1, 2, "co_occurrence", 4.0),
+            (2, 3, "co_occurrence", 2.0),
+            (3, 4, "co_occurrence", 2.0),
+            (1, 5, "knows", 1.0),
+        ]
+    )
+    return graph
+
+
+def test_k_hop_respects_depth_and_relation_type():
+    graph = _chain_graph()
+    assert set(graph.k_hop([1], 1)) == {1, 2, 5}
+    assert set(graph.k_hop([1], 2)) == {1, 2, 3, 5}
+    assert set(graph.k_hop([1], 3)) == {1, 2, 3, 4, 5}
+    assert set(graph.k_hop([1], 3, relation_type="knows")) == {1, 5}
+
+    scores = graph.k_hop([1], 1)
+    assert scores[2] > scores[5]  # heavier edge, stronger path
+
+
+def test_edges_are_traversed_in_both_directions():
+    graph = _chain_graph()
+    assert set(graph.neighbors(4)) == {3}
+    assert graph.top_neighbors(2, k=1) == [(1, 4.0)]
+
+
+def test_personalized_pagerank_favours_seed_neighbourhood():
+    graph = _chain_graph()
+    rank = graph.personalized_pagerank([1])
+    assert sum(rank.values()) == pytest.approx(1.0, abs=1e-3)
+    assert rank[1] > rank[2] > rank[3] > rank[4]
+    assert list(graph.personalized_pagerank([1], top_k=2)) == [1, 2]
+    assert graph.personalized_pagerank([999]) == {}
+
+
+def test_mutations_rebuild_adjacency():
+    graph = _chain_graph()
+    assert graph.neighbors(4) == [3]
+    graph.add_edge(4, 6, "co_occurrence", 1.0)
+    assert set(graph.neighbors(4)) == {3, 6}
+
+    graph.scale_weights(0.5)
+    assert graph.top_neighbors(1, k=1) == [(2, 2.0)]
+
+    graph.invalidate()
+    assert not graph.loaded
+    graph.add_edge(7, 8, "co_occurrence")  # ignored until reloaded
+    assert len(graph) == 0
+
+
+def test_store_related_entities_honours_depth():
+    store = MemoryStore()
+    tag = uuid.uuid4().hex[:6]
+    store.embed_many = lambda texts: [[1.0] * store.expected_dim for _ in texts]
+    a, b, c = store.add_entities(
+        [
+            {"name": f"A-{tag}", "type": "concept"},
+            {"name": f"B-{tag}", "type": "concept"},
+            {"name": f"C-{tag}", "type": "concept"},
+        ]
+    )
+    store.add_relationship(a, b, "co_occurrence")
+    store.add_relationship(b, c, "co_occurrence")
+
+    assert store.get_related_entities(a, depth=1) == [b]
+    assert set(store.get_related_entities(a, depth=2)) == {b, c}
+    assert store.get_related_entities(c, depth=1) == [b]
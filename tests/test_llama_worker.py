@@ -0,0 +1,123 @@
+import threading
+
+from services import llama_local
+from services.llama_local import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, InferenceWorker
+
+
+class _GatedLlama:
+    """Blocks the first call until released so the queue can fill up."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, prompt, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        if not self.prompts:
+            self.gate.wait(2)
+        self.prompts.append(prompt)
+        self.active -= 1
+        if kwargs.get("stream"):
+            return iter([{"choices": [{"text": prompt}]}])
+        return {"choices": [{"text": prompt}], "usage": {"completion_tokens": 4}}
+
+
+def test_interactive_jobs_jump_queued_background_jobs(monkeypatch):
+    fake = _GatedLlama()
+    monkeypatch.setattr(llama_local, "_ensure_model", lambda: fake)
+    worker = InferenceWorker()
+
+    def job(prompt, priority):
+        return worker.submit(llama_local._run_completion(prompt, 8, 0.0), priority=priority)
+
+    blocker = job("first", PRIORITY_BACKGROUND)
+    while not fake.active:
+        threading.Event().wait(0.005)
+    jobs = [
+        job("bg-1", PRIORITY_BACKGROUND),
+        job("bg-2", PRIORITY_BACKGROUND),
+        job("chat", PRIORITY_INTERACTIVE),
+    ]
+    assert worker.stats()["queue_depth"] == 3
+    fake.gate.set()
+    for j in [blocker, *jobs]:
+        j.future.result(timeout=2)
+
+    assert fake.prompts == ["first", "chat", "bg-1", "bg-2"]
+    assert fake.max_active == 1
+    stats = worker.stats()
+    assert stats["completed"] == 4 and stats["queue_depth"] == 0
+    assert stats["tokens_generated"] == 16
+
+
+def test_module_api_goes_through_the_worker(monkeypatch):
+    fake = _GatedLlama()
+    fake.gate.set()
+    monkeypatch.setattr(llama_local, "_ensure_model", lambda: fake)
+    monkeypatch.setattr(llama_local, "_worker", None)
+
+    assert llama_local.generate("hello") == "hello"
+    assert list(llama_local.generate_stream("streamed")) == ["streamed"]
+    assert llama_local.worker_stats()["completed"] == 2
+
+
+def test_abandoned_stream_cancels_its_job(monkeypatch):
+    class Endless:
+        def __call__(self, prompt, **kwargs):
+            def chunks():
+                while True:
+                    yield {"choices": [{"text": "x"}]}
+            return chunks()
+
+    monkeypatch.setattr(llama_local, "_ensure_model", lambda: Endless())
+    monkeypatch.setattr(llama_local, "_worker", None)
+
+    stream = llama_local.generate_stream("go")
+    assert next(stream) == "x"
+    stream.close()
+
+    # The worker stops decoding and serves the next request.
+    fake = _GatedLlama()
+    fake.gate.set()
+    monkeypatch.setattr(llama_local, "_ensure_model", lambda: fake)
+    assert llama_local.generate("next") == "next"
+
+
+def test_cold_start_loads_the_model_once(monkeypatch):
+    import sys
+    import types
+
+    loads = []
+    barrier = threading.Barrier(4, timeout=2)
+
+    class FakeLlama:
+        def __init__(self, **kwargs):
+            loads.append(kwargs)
+            threading.Event().wait(0.05)  # a slow load widens the race
+
+        def create_chat_completion(self, **kwargs):
+            return {"choices": [{"message": {"content": "hi"}}], "usage": {"completion_tokens": 3}}
+
+    monkeypatch.setitem(sys.modules, "llama_cpp", types.SimpleNamespace(Llama=FakeLlama))
+    monkeypatch.setattr(llama_local.settings, "gguf_model_path", "/models/fake.gguf")
+    monkeypatch.setattr(llama_local.settings, "gguf_prompt_cache_mb", 0)
+    monkeypatch.setattr(llama_local, "_llm", None)
+    monkeypatch.setattr(llama_local, "_worker", None)
+
+    def probe():
+        barrier.wait()
+        llama_local.is_available()
+
+    threads = [threading.Thread(target=probe) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(loads) == 1
+    # chat() jobs count towards decode throughput too.
+    assert llama_local.chat([{"role": "user", "content": "hey"}]) == "hi"
+    assert llama_local.worker_stats()["tokens_generated"] == 3
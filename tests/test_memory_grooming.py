@@ -0,0 +1,95 @@
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session as SQLSession
+
+from app.api.models import Entity, Memory, Relationship
+from app.memory import store as store_module
+from app.memory.store import MemoryStore, engine
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.deleted = []
+
+    def add(self, **kwargs):
+        pass
+
+    def delete(self, ids):
+        self.deleted.extend(ids)
+
+
+def _seed(store, tag):
+    store.embed_many = lambda texts: [[1.0] * store.expected_dim for _ in texts]
+    strong, weak, lonely = store.add_entities(
+        [
+            {"name": f"Strong-{tag}", "type": "concept"},
+            {"name": f"Weak-{tag}", "type": "concept"},
+            {"name": f"Lonely-{tag}", "type": "concept"},
+        ]
+    )
+    store.add_relationship(strong, weak, "co_occurrence", weight=5.0)
+    store.add_relationship(weak, lonely, "co_occurrence", weight=0.2)
+    return strong, weak, lonely
+
+
+def test_groom_prunes_in_batches_and_drops_vectors():
+    store = MemoryStore()
+    store.collection = _FakeCollection()
+    tag = uuid.uuid4().hex[:6]
+    strong, weak, lonely = _seed(store, tag)
+
+    for i in range(5):
+        store.add_memory("event", f"groom-old-{tag}-{i}", ["groom"])
+    store.add_memory("event", f"groom-fresh-{tag}", ["groom"])
+    with SQLSession(engine) as session:
+        session.execute(
+            update(Memory)
+            .where(Memory.text.like(f"groom-old-{tag}-%"))
+            .values(created_at=datetime.utcnow() - timedelta(days=120))
+        )
+        session.commit()
+        old_ids = session.execute(
+            select(Memory.id).where(Memory.text.like(f"groom-old-{tag}-%"))
+        ).scalars().all()
+
+    seen = []
+    stats = store.groom_memory_graph(
+        min_weight=1.0, max_age_days=90, batch_size=2, progress=lambda step, n: seen.append((step, n))
+    )
+
+    assert stats["relationships_pruned"] >= 1
+    assert stats["entities_pruned"] >= 1
+    assert stats["memories_pruned"] >= 5
+    assert {str(i) for i in old_ids} <= set(store.collection.deleted)
+    assert ("memories", 2) in seen and ("memories", 4) in seen
+
+    with SQLSession(engine) as session:
+        remaining = set(
+            session.execute(select(Entity.id).where(Entity.id.in_([strong, weak, lonely]))).scalars()
+        )
+        texts = set(session.execute(select(Memory.text).where(Memory.text.like(f"groom-%-{tag}%"))).scalars())
+    assert remaining == {strong, weak}
+    assert texts == {f"groom-fresh-{tag}"}
+    assert not store_module._knowledge_graph.loaded
+
+
+def test_decay_updates_every_relationship_in_windows():
+    store = MemoryStore()
+    tag = uuid.uuid4().hex[:6]
+    strong, weak, _ = _seed(store, tag)
+
+    steps = []
+    decayed = store.decay_relationships(0.5, batch_size=1, progress=lambda step, n: steps.append(n))
+
+    with SQLSession(engine) as session:
+        weight = session.execute(
+            select(Relationship.weight).where(
+                Relationship.from_entity_id == strong, Relationship.to_entity_id == weak
+            )
+        ).scalar_one()
+    assert weight == 2.5
+    assert decayed >= 2
+    assert steps and steps[-1] == decayed
+    assert store.get_related_entities(strong) == [weak]
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+from app.config import JOI_CORE_PROMPT, JOI_PERSONA_PROMPT
+from app.orchestrator.prompt_layout import build_prompt_layout, split_persona
+from services import ai_router
+from services.router_logging import prompt_cache_stats
+
+
+def _core(mood, idle):
+    return JOI_CORE_PROMPT.format(
+        profile_summary="Name: K", avg_mood=mood, relationship_level="Companion", idle_hours=idle
+    )
+
+
+def test_persona_leads_and_prefix_hash_is_stable_across_turns():
+    layouts = []
+    for mood, idle, note, user in (("4.0", 1.5, "Needy", "hi"), ("7.5", 0.1, "Content", "back again")):
+        persona, turn_profile = split_persona(_core(mood, idle) + "\n[System Note]: x")
+        layouts.append(
+            build_prompt_layout(persona, [turn_profile, note, ""], [{"role": "user", "content": "earlier"}], user)
+        )
+
+    first, second = layouts
+    assert first.prefix_hash == second.prefix_hash
+    assert first.messages[0] == {"role": "system", "content": JOI_PERSONA_PROMPT.strip()}
+    assert [m["role"] for m in first.messages] == ["system", "user", "system", "user"]
+    assert "[Current Mood]: 4.0/10" in first.messages[2]["content"]
+    assert "Needy" in first.messages[2]["content"]
+    assert first.flatten().startswith("[SYSTEM]\n" + JOI_PERSONA_PROMPT.strip())
+
+
+def test_unrecognised_profile_is_entirely_per_turn():
+    persona, rest = split_persona("custom system prompt")
+    layout = build_prompt_layout(persona, [rest], [], "hi")
+
+    assert persona == "" and layout.static_count == 0
+    assert layout.messages == [
+        {"role": "system", "content": "custom system prompt"},
+        {"role": "user", "content": "hi"},
+    ]
+
+
+def test_openai_sends_structured_messages_and_reports_cached_tokens(monkeypatch):
+    sent = []
+    usage = SimpleNamespace(prompt_tokens=1200, prompt_tokens_details=SimpleNamespace(cached_tokens=1024))
+
+    class FakeCompletions:
+        def create(self, **kwargs):
+            sent.append(kwargs)
+            message = SimpleNamespace(content=" hello ")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    clients = ai_router.ProviderClients()
+    monkeypatch.setattr(clients, "openai", lambda: client)
+    monkeypatch.setattr(ai_router, "provider_clients", lambda: clients)
+    monkeypatch.setattr(ai_router.settings, "openai_api_key", "key")
+    messages = [{"role": "system", "content": "persona"}, {"role": "user", "content": "hi"}]
+
+    result = ai_router.call_openai("flat", {"messages": messages})
+
+    assert sent[0]["messages"] == messages
+    assert result["usage"] == {"prompt_tokens": 1200, "cached_tokens": 1024}
+
+
+def test_prompt_cache_stats_aggregate_per_provider():
+    stats = prompt_cache_stats(
+        [
+            {"provider": "gpt4o", "prompt_tokens": 1000, "cached_tokens": 0, "prefix_hash": "a"},
+            {"provider": "gpt4o", "prompt_tokens": 1000, "cached_tokens": 900, "prefix_hash": "a"},
+            {"provider": "ollama", "success": True},
+        ]
+    )
+
+    assert stats == {
+        "gpt4o": {
+            "requests": 2,
+            "prompt_tokens": 2000,
+            "cached_tokens": 900,
+            "cached_ratio": 0.45,
+            "distinct_prefixes": 1,
+        }
+    }
@@ -0,0 +1,68 @@
+import json
+
+import httpx
+
+from app.config import settings
+from services import ai_router
+from services.ai_router import ProviderClients
+
+
+def test_http_client_is_reused_until_settings_change(monkeypatch):
+    clients = ProviderClients()
+    first = clients.http()
+    assert clients.http() is first
+
+    monkeypatch.setattr(settings, "llm_max_connections", settings.llm_max_connections + 1)
+    rebuilt = clients.http()
+    assert rebuilt is not first
+    assert clients.http() is rebuilt
+    clients.reset()
+
+
+def test_api_clients_follow_their_key(monkeypatch):
+    clients = ProviderClients()
+    monkeypatch.setattr(settings, "openai_api_key", "")
+    assert clients.openai() is None
+
+    monkeypatch.setattr(settings, "openai_api_key", "sk-one")
+    first = clients.openai()
+    assert first is clients.openai()
+
+    monkeypatch.setattr(settings, "openai_api_key", "sk-two")
+    assert clients.openai() is not first
+    clients.reset()
+
+
+def test_ollama_calls_share_one_pooled_client(monkeypatch):
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"response": "hello"})
+
+    shared = httpx.Client(transport=httpx.MockTransport(handler))
+    clients = ProviderClients()
+    monkeypatch.setattr(clients, "http", lambda: shared)
+    monkeypatch.setattr(ai_router, "provider_clients", lambda: clients)
+
+    for _ in range(3):
+        result = ai_router.call_ollama("hi", {})
+        assert result["success"] and result["text"] == "hello"
+
+    assert seen == ["/api/generate"] * 3
+    assert not shared.is_closed
+
+
+def test_ollama_streaming_through_the_shared_client(monkeypatch):
+    lines = [{"response": "hel"}, {"response": "lo", "done": True}]
+    body = "\n".join(json.dumps(line) for line in lines)
+    shared = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=body)))
+    clients = ProviderClients()
+    monkeypatch.setattr(clients, "http", lambda: shared)
+    monkeypatch.setattr(ai_router, "provider_clients", lambda: clients)
+
+    tokens = []
+    result = ai_router.call_ollama("hi", {}, on_token=tokens.append)
+
+    assert tokens == ["hel", "lo"]
+    assert result["text"] == "hello" and result["started"]
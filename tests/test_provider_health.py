@@ -0,0 +1,153 @@
+import threading
+
+from services import ai_router
+from services.provider_health import CLOSED, HALF_OPEN, OPEN, ProviderHealth
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_repeated_failures_and_allows_one_trial():
+    clock = _Clock()
+    health = ProviderHealth(breaker_failures=2, cooldown_s=30, clock=clock)
+
+    health.record("grok", False, 5, "boom")
+    assert health.allow("grok")
+    health.record("grok", False, 5, "boom")
+    assert health.snapshot()["grok"]["state"] == OPEN
+    assert not health.allow("grok")
+
+    clock.now += 31
+    assert health.allow("grok")  # the half-open trial
+    assert not health.allow("grok")  # only one at a time
+    assert health.snapshot()["grok"]["state"] == HALF_OPEN
+
+    health.record("grok", True, 40)
+    assert health.snapshot()["grok"]["state"] == CLOSED
+    assert health.allow("grok")
+
+
+def test_failed_trial_reopens_immediately():
+    clock = _Clock()
+    health = ProviderHealth(breaker_failures=3, cooldown_s=10, clock=clock)
+    for _ in range(3):
+        health.record("gemini", False, 1)
+    clock.now += 11
+    assert health.allow("gemini")
+    health.record("gemini", False, 1)
+    assert health.snapshot()["gemini"]["state"] == OPEN
+    assert not health.allow("gemini")
+
+
+def test_half_open_provider_with_probe_is_checked_in_background():
+    clock = _Clock()
+    health = ProviderHealth(breaker_failures=1, cooldown_s=5, clock=clock)
+    probed = threading.Event()
+
+    def probe():
+        probed.set()
+        return True
+
+    health.register_probe("ollama", probe)
+    health.record("ollama", False, 10000, "connect timeout")
+    clock.now += 6
+
+    assert not health.allow("ollama")  # never blocks a live request on a probe
+    assert probed.wait(2)
+    for _ in range(100):
+        if health.snapshot()["ollama"]["state"] == CLOSED:
+            break
+        threading.Event().wait(0.01)
+    assert health.allow("ollama")
+
+
+def test_order_prefers_fast_healthy_providers():
+    health = ProviderHealth()
+    for ms in (900, 1100, 1000):
+        health.record("ollama", True, ms)
+    for ms in (300, 250):
+        health.record("gpt4o", True, ms)
+    health.record("grok", True, 50)
+    health.record("grok", False, 50)
+
+    assert health.order(["gguf", "ollama", "gpt4o", "grok"]) == ["gpt4o", "ollama", "gguf", "grok"]
+
+
+def test_unstreamed_latency_never_counts_as_ttft():
+    health = ProviderHealth()
+    for _ in range(5):
+        health.record("ollama", True, None, latency_ms=4000)  # non-streamed calls
+        health.record("gpt4o", True, 600, latency_ms=3000)
+    health.record("ollama", True, 200, latency_ms=3500)
+
+    assert health.order(["gpt4o", "ollama"]) == ["ollama", "gpt4o"]
+    assert health.p95_ttft_ms("ollama") is None  # one first-token sample only
+    assert health.p95_latency_ms("ollama") == 4000
+    assert health.snapshot()["ollama"]["samples"] == 6
+    assert health.snapshot()["ollama"]["ttft_samples"] == 1
+
+
+def test_seed_replays_inference_log_records():
+    health = ProviderHealth(breaker_failures=2)
+    used = health.seed(
+        [
+            {"provider": "ollama", "success": False, "latency_ms": 10000, "error": "timeout"},
+            {"provider": "ollama", "success": False, "latency_ms": 10000, "error": "timeout"},
+            {"provider": "none", "success": False, "latency_ms": 1},
+            {"model": "gpt4o", "provider": "gpt4o", "route": []},  # conversation log shape
+            {"provider": "gpt4o", "success": True, "latency_ms": 900, "ttft_ms": 300},
+            # Unstreamed: older records repeat the latency as TTFT, newer ones flag it.
+            {"provider": "gpt4o", "success": True, "latency_ms": 5000, "ttft_ms": 5000},
+            {"provider": "gpt4o", "success": True, "latency_ms": 6000, "ttft_ms": None, "streamed": False},
+        ]
+    )
+    assert used == 5
+    snapshot = health.snapshot()
+    assert snapshot["ollama"]["state"] == OPEN
+    assert snapshot["gpt4o"]["p50_ttft_ms"] == 300
+
+
+def test_router_skips_open_circuits_without_calling_them(monkeypatch):
+    calls = []
+
+    def provider(name, ok):
+        def call(prompt, context, on_token=None):
+            calls.append(name)
+            if on_token and ok:
+                on_token("hi")
+            return {"success": ok, "model": name, "text": "hi" if ok else "", "error": None if ok else "down"}
+        return call
+
+    health = ProviderHealth(breaker_failures=1, cooldown_s=60)
+    monkeypatch.setattr(ai_router, "_provider_health", health)
+    monkeypatch.setattr(ai_router, "log_inference", lambda entry: None)
+    monkeypatch.setattr(ai_router, "call_gguf", provider("gguf", False))
+    monkeypatch.setattr(ai_router, "call_ollama", provider("ollama", False))
+    monkeypatch.setattr(ai_router, "call_openai", provider("gpt4o", True))
+    monkeypatch.setattr(ai_router, "call_grok", provider("grok", True))
+    monkeypatch.setattr(ai_router, "call_gemini", provider("gemini", True))
+    monkeypatch.setattr(ai_router.settings, "router_adaptive", True)
+
+    first = ai_router.multi_ai_response("hello", {})
+    assert first["model"] == "gpt4o"
+    assert calls == ["gguf", "ollama", "gpt4o"]
+
+    calls.clear()
+    tokens = []
+    second = ai_router.multi_ai_response("hello", {}, on_token=tokens.append)
+    assert second["model"] == "gpt4o"
+    assert calls == ["gpt4o"]
+    assert tokens == ["hi"]
+
+    for name, attr in (("gpt4o", "call_openai"), ("grok", "call_grok"), ("gemini", "call_gemini")):
+        monkeypatch.setattr(ai_router, attr, provider(name, False))
+    calls.clear()
+    third = ai_router.multi_ai_response("hello", {})
+    assert not third["success"]
+    assert calls == ["gpt4o", "grok", "gemini"]
+    assert third["skipped"] == ["gguf", "ollama"]
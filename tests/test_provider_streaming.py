@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+from services import ai_router, llama_local
+
+
+class _FakeLlama:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, prompt, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get("stream"):
+            return iter({"choices": [{"text": piece}]} for piece in ("Hel", "", "lo"))
+        return {"choices": [{"text": " Hello "}]}
+
+
+def test_gguf_streams_tokens_through_on_token(monkeypatch):
+    fake = _FakeLlama()
+    monkeypatch.setattr(llama_local, "_ensure_model", lambda: fake)
+    monkeypatch.setattr(llama_local, "is_available", lambda: True)
+    tokens = []
+
+    result = ai_router.call_gguf("hi", {}, on_token=tokens.append)
+
+    assert tokens == ["Hel", "lo"]
+    assert result["success"] and result["started"] and result["text"] == "Hello"
+    assert fake.calls[-1]["stream"] is True
+
+
+def test_gguf_stream_abort_keeps_partial_text_and_releases_the_model(monkeypatch):
+    monkeypatch.setattr(llama_local, "_ensure_model", lambda: _FakeLlama())
+    monkeypatch.setattr(llama_local, "is_available", lambda: True)
+
+    def on_token(chunk):
+        raise RuntimeError("client went away")
+
+    result = ai_router.call_gguf("hi", {}, on_token=on_token)
+
+    assert not result["success"]
+    assert result["started"] is True
+    assert result["text"] == "Hel"
+
+
+def test_gguf_without_on_token_still_returns_whole_completion(monkeypatch):
+    monkeypatch.setattr(llama_local, "_ensure_model", lambda: _FakeLlama())
+    monkeypatch.setattr(llama_local, "is_available", lambda: True)
+
+    result = ai_router.call_gguf("hi", {})
+
+    assert result["text"] == "Hello" and not result["started"]
+
+
+class _Blocked:
+    @property
+    def text(self):
+        raise ValueError("no text parts")
+
+
+def test_gemini_streams_and_skips_textless_chunks(monkeypatch):
+    calls = []
+
+    class FakeModel:
+        def generate_content(self, prompt, stream=False):
+            calls.append(stream)
+            return [SimpleNamespace(text="Hi "), _Blocked(), SimpleNamespace(text="there")]
+
+    clients = ai_router.ProviderClients()
+    monkeypatch.setattr(clients, "gemini", lambda: FakeModel())
+    monkeypatch.setattr(ai_router, "provider_clients", lambda: clients)
+    monkeypatch.setattr(ai_router.settings, "gemini_api_key", "key")
+    tokens = []
+
+    result = ai_router.call_gemini("hi", {}, on_token=tokens.append)
+
+    assert tokens == ["Hi ", "there"]
+    assert result["text"] == "Hi there" and result["started"]
+    assert calls == [True]
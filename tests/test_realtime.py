@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import zlib
+
+from app.api.realtime import DeltaCoalescer, RealtimeEventBus, format_sse_event, gzip_sse_stream
+
+
+def _run_stream(tokens, is_active=lambda: True, **kwargs):
+    published = []
+    checks = []
+
+    async def publish(delta, seq):
+        published.append((seq, delta))
+
+    def active():
+        checks.append(1)
+        return is_active()
+
+    async def main():
+        coalescer = DeltaCoalescer(asyncio.get_running_loop(), publish, active, **kwargs)
+        producer = threading.Thread(target=lambda: [coalescer.push(token) for token in tokens])
+        producer.start()
+        await asyncio.to_thread(producer.join)
+        await coalescer.flush()
+
+    asyncio.run(main())
+    return published, checks
+
+
+def test_thousand_token_reply_becomes_tens_of_ordered_suffix_events():
+    tokens = [f"t{i:03d} " for i in range(1000)]  # 5 chars each
+
+    published, checks = _run_stream(tokens, window_s=10.0, max_chars=64)
+
+    assert "".join(delta for _, delta in published) == "".join(tokens)
+    assert [seq for seq, _ in published] == list(range(1, len(published) + 1))
+    assert len(published) <= 80
+    # The turn-active lookup is cached, not repeated per token.
+    assert len(checks) < 50
+
+
+def test_trailing_tokens_flush_after_the_window():
+    published = []
+
+    async def publish(delta, seq):
+        published.append(delta)
+
+    async def main():
+        coalescer = DeltaCoalescer(asyncio.get_running_loop(), publish, lambda: True, window_s=0.01)
+        coalescer.push("Hel")
+        coalescer.push("lo")
+        await asyncio.sleep(0.1)
+        return list(published)
+
+    assert asyncio.run(main()) == ["Hello"]
+
+
+def test_interrupted_turn_stops_streaming():
+    published, _ = _run_stream(["a", "b"], is_active=lambda: False)
+
+    assert published == []
+
+
+def test_deltas_are_delivered_live_but_not_kept_in_history():
+    bus = RealtimeEventBus()
+
+    async def main():
+        _, queue = await bus.subscribe("s1")
+        await bus.publish("message.delta", {"delta": "hi", "seq": 1}, session_id="s1")
+        await bus.publish("message.completed", {}, session_id="s1")
+        return queue.qsize(), [event["event"] for event in await bus.get_recent(session_id="s1")]
+
+    assert asyncio.run(main()) == (2, ["message.completed"])
+
+
+def test_reconnect_resumes_after_last_event_id_within_the_session():
+    bus = RealtimeEventBus(history_limit=3)
+
+    async def main():
+        ids = []
+        for i in range(5):
+            envelope = await bus.publish("note", {"i": i}, session_id="s1")
+            ids.append(envelope["event_id"])
+            await bus.publish("note", {"i": i}, session_id="other")
+        return (
+            await bus.replay_after(ids[2], session_id="s1"),
+            await bus.replay_after(ids[1], session_id="s1"),
+            await bus.replay_after(ids[0], session_id="s1"),
+            await bus.replay_after(ids[4], session_id="dropped"),
+        )
+
+    resumed, oldest_kept, evicted, dropped = asyncio.run(main())
+
+    assert [event["payload"]["i"] for event in resumed] == [3, 4]
+    assert all(event["session_id"] == "s1" for event in resumed)
+    # The client saw the newest evicted event, so nothing is missing.
+    assert [event["payload"]["i"] for event in oldest_kept] == [2, 3, 4]
+    # Events between the id and the ring buffer are gone, as is an evicted
+    # session's buffer: fall back to backfill instead of replaying with a gap.
+    assert evicted is None
+    assert dropped is None
+
+
+def test_event_ids_from_another_process_are_not_resumed():
+    bus = RealtimeEventBus()
+
+    async def main():
+        await bus.publish("note", {}, session_id="s1")
+        return await bus.replay_after("deadbeef-1", session_id="s1"), await bus.replay_after(None)
+
+    assert asyncio.run(main()) == (None, None)
+
+
+def test_sse_frame_is_rendered_once_and_heartbeats_carry_no_id():
+    bus = RealtimeEventBus()
+    envelope = asyncio.run(bus.publish("note", {"x": 1}, session_id="s1"))
+
+    assert format_sse_event(envelope) is envelope.sse
+    assert envelope.sse.startswith(f"id: {envelope['event_id']}\nevent: note\ndata: {{")
+    heartbeat = {"event_id": "heartbeat-1", "event": "heartbeat", "payload": {}}
+    assert format_sse_event(heartbeat).startswith("event: heartbeat\n")
+
+
+def test_gzip_stream_flushes_every_frame():
+    async def frames():
+        yield "event: a\ndata: {}\n\n"
+        yield "event: b\ndata: {}\n\n"
+
+    async def main():
+        return [chunk async for chunk in gzip_sse_stream(frames())]
+
+    chunks = asyncio.run(main())
+    decompressor = zlib.decompressobj(31)
+
+    assert decompressor.decompress(chunks[0]) == b"event: a\ndata: {}\n\n"
+    assert decompressor.decompress(b"".join(chunks[1:])) == b"event: b\ndata: {}\n\n"
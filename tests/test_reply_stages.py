@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from app.orchestrator.stages import Stage, StageRunner
+
+
+def test_stages_run_concurrently_and_merge_in_declaration_order():
+    runner = StageRunner(max_workers=3)
+    barrier = threading.Barrier(3, timeout=2)
+
+    def stage(value, delay):
+        def run():
+            barrier.wait()  # only passes if all three are running at once
+            time.sleep(delay)
+            return value
+        return run
+
+    results = runner.run(
+        [
+            Stage("slow", stage("a", 0.05), 2.0),
+            Stage("fast", stage("b", 0.0), 2.0),
+            Stage("mid", stage("c", 0.02), 2.0),
+        ]
+    )
+
+    assert list(results) == ["slow", "fast", "mid"]
+    assert [r.value for r in results.values()] == ["a", "b", "c"]
+    assert results["slow"].elapsed_ms >= 50
+    runner.shutdown()
+
+
+def test_missed_deadline_uses_fallback():
+    runner = StageRunner(max_workers=2)
+    release = threading.Event()
+
+    results = runner.run(
+        [
+            Stage("hung", lambda: release.wait(2) and "late", 0.05, fallback=list),
+            Stage("ok", lambda: "done", 1.0),
+        ]
+    )
+    release.set()
+
+    assert results["hung"].timed_out
+    assert results["hung"].value == []
+    assert results["ok"].value == "done"
+    runner.shutdown()
+
+
+def test_errors_propagate_unless_the_stage_opts_into_fallback():
+    runner = StageRunner(max_workers=2)
+
+    def boom():
+        raise RuntimeError("boom")
+
+    results = runner.run([Stage("soft", boom, 1.0, fallback=dict, fallback_on_error=True)])
+    assert results["soft"].value == {}
+    assert results["soft"].error == "boom"
+
+    with pytest.raises(RuntimeError):
+        runner.run([Stage("hard", boom, 1.0)])
+    with pytest.raises(RuntimeError):
+        runner.run([Stage("hard", boom, 1.0)], parallel=False)
+    runner.shutdown()
+
+
+def test_inline_mode_runs_in_the_calling_thread():
+    runner = StageRunner(max_workers=1)
+    caller = threading.get_ident()
+
+    results = runner.run([Stage("here", threading.get_ident, 0.0)], parallel=False)
+
+    assert results["here"].value == caller
+    assert not results["here"].timed_out
+    runner.shutdown()
+
+
+def test_tool_deadline_bounds_planning_not_execution(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.config import settings
+    from app.orchestrator.agent import Agent
+
+    monkeypatch.setattr(settings, "tool_planning_enabled", True)
+    release = threading.Event()
+    executed = []
+    agent = Agent.__new__(Agent)
+    agent._tool_planner = SimpleNamespace(
+        is_candidate=lambda msg: True,
+        plan=lambda msg: release.wait(2) and SimpleNamespace(valid=True, proposals=["late"]),
+    )
+    agent._executor = SimpleNamespace(
+        execute_proposals=lambda proposals: executed.append(("planned", proposals)) or [],
+        execute_tools=lambda msg, session_id: executed.append(("keyword", msg)) or [],
+    )
+    runner = StageRunner(max_workers=1)
+
+    results = runner.run([Stage("tool_plan", lambda: agent._plan_tools("log my mood"), 0.05)])
+    agent._execute_tools(results["tool_plan"].value, "log my mood", "s")
+    release.set()
+
+    assert results["tool_plan"].timed_out
+    assert executed == [("keyword", "log my mood")]
+    agent._execute_tools(SimpleNamespace(valid=True, proposals=["p"]), "log my mood", "s")
+    assert executed[-1] == ("planned", ["p"])
+    runner.shutdown()
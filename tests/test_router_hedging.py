@@ -0,0 +1,143 @@
+import time
+
+import pytest
+
+from services import ai_router
+
+
+def _provider(name, *, delay=0.0, chunks=("ok",), fail_after_stream=False, calls=None):
+    def call(prompt, context, on_token=None):
+        if calls is not None:
+            calls.append(name)
+        time.sleep(delay)
+        started = False
+        text = ""
+        try:
+            for chunk in chunks:
+                if on_token is not None:
+                    started = True
+                    text += chunk
+                    on_token(chunk)
+                else:
+                    text += chunk
+                time.sleep(0.01)
+        except Exception as exc:
+            return {"success": False, "model": name, "text": text, "error": str(exc), "started": started}
+        if fail_after_stream:
+            return {"success": False, "model": name, "text": text, "error": "dropped", "started": started}
+        return {"success": True, "model": name, "text": text, "error": None, "started": started}
+    return call
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(ai_router.settings, "router_adaptive", False)
+    monkeypatch.setattr(ai_router.settings, "router_hedge_enabled", True)
+    monkeypatch.setattr(ai_router.settings, "router_hedge_after_ms", 30)
+    monkeypatch.setattr(ai_router, "log_inference", lambda entry: None)
+    for attr, name in (
+        ("call_gguf", "gguf"),
+        ("call_grok", "grok"),
+        ("call_gemini", "gemini"),
+    ):
+        monkeypatch.setattr(ai_router, attr, _provider(name, chunks=()))  # empty reply = failure
+    return monkeypatch
+
+
+def test_slow_stream_is_hedged_and_loser_never_reaches_the_caller(router):
+    router.setattr(ai_router, "call_ollama", _provider("ollama", delay=0.3, chunks=("slow",)))
+    router.setattr(ai_router, "call_openai", _provider("gpt4o", chunks=("fa", "st")))
+    tokens = []
+
+    result = ai_router.multi_ai_response("hi", {}, on_token=tokens.append)
+    time.sleep(0.4)  # let the loser wake up and try to stream
+
+    assert result["model"] == "gpt4o"
+    assert tokens == ["fa", "st"]
+    assert result["route"] == ["gguf", "gpt4o"]  # the cancelled ollama attempt is not reported
+
+
+def test_fast_primary_is_not_hedged(router):
+    calls = []
+    router.setattr(ai_router, "call_ollama", _provider("ollama", chunks=("a", "b"), calls=calls))
+    router.setattr(ai_router, "call_openai", _provider("gpt4o", calls=calls))
+    tokens = []
+
+    result = ai_router.multi_ai_response("hi", {}, on_token=tokens.append)
+
+    assert result["model"] == "ollama"
+    assert tokens == ["a", "b"]
+    assert calls == ["ollama"]
+
+
+def test_non_streaming_hedge_takes_the_first_success(router):
+    router.setattr(ai_router, "call_ollama", _provider("ollama", delay=0.5, chunks=("late",)))
+    router.setattr(ai_router, "call_openai", _provider("gpt4o", chunks=("quick",)))
+
+    started = time.perf_counter()
+    result = ai_router.multi_ai_response("hi", {})
+
+    assert result["model"] == "gpt4o"
+    assert result["text"] == "quick"
+    assert time.perf_counter() - started < 0.4
+
+
+def test_non_streaming_gguf_never_races(router):
+    # Without a token stream a losing GGUF call can't be cancelled and would
+    # keep the local inference worker busy.
+    calls = []
+    router.setattr(ai_router, "call_gguf", _provider("gguf", delay=0.1, chunks=("local",), calls=calls))
+    router.setattr(ai_router, "call_ollama", _provider("ollama", calls=calls))
+
+    result = ai_router.multi_ai_response("hi", {})
+
+    assert result["model"] == "gguf"
+    assert calls == ["gguf"]
+
+    # Nor is it launched as the hedge for a slow provider ahead of it.
+    class OllamaFirst:
+        def order(self, names):
+            return ["ollama", *[name for name in names if name != "ollama"]]
+
+        def allow(self, name):
+            return True
+
+        def record(self, *args, **kwargs):
+            pass
+
+    calls.clear()
+    router.setattr(ai_router.settings, "router_adaptive", True)
+    router.setattr(ai_router, "provider_health", OllamaFirst)
+    router.setattr(ai_router, "call_ollama", _provider("ollama", delay=0.1, chunks=("slow",), calls=calls))
+
+    result = ai_router.multi_ai_response("hi", {})
+
+    assert result["model"] == "ollama"
+    assert calls == ["ollama"]
+
+
+def test_partial_stream_failure_is_never_spliced_with_the_hedge(router):
+    router.setattr(
+        ai_router, "call_ollama", _provider("ollama", delay=0.06, chunks=("par", "tial"), fail_after_stream=True)
+    )
+    router.setattr(ai_router, "call_openai", _provider("gpt4o", delay=0.2, chunks=("other",)))
+    tokens = []
+
+    result = ai_router.multi_ai_response("hi", {}, on_token=tokens.append)
+
+    assert result["started"] is True
+    assert result["success"] is False
+    assert result["model"] == "ollama"
+    assert tokens == ["par", "tial"]
+
+
+def test_hedging_is_off_by_default(router):
+    router.setattr(ai_router.settings, "router_hedge_enabled", False)
+    calls = []
+    router.setattr(ai_router, "call_ollama", _provider("ollama", delay=0.1, calls=calls))
+    router.setattr(ai_router, "call_openai", _provider("gpt4o", calls=calls))
+
+    result = ai_router.multi_ai_response("hi", {}, on_token=lambda chunk: None)
+
+    assert result["model"] == "ollama"
+    assert calls == ["ollama"]
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import json
+from datetime import datetime
 from pathlib import Path
 
 from app.api.media_session import MediaSessionStore
 from app.api.perception_policy import PerceptionPolicyStore
+from app.initiative.store import InitiativeStore
+from app.integrations.outbox import TelegramOutbox
+from app.persistence import STATE_DB_NAME, StateTable
 from app.orchestrator.security.approval import ApprovalStatus, ToolApprovalManager
 
 
@@ -51,6 +56,7 @@ def test_media_session_survives_restart(tmp_path: Path) -> None:
         speech_duration_ms=640,
         interruption_count=2,
     )
+    first.flush()
 
     restored = MediaSessionStore(path).get("session-1")
 
@@ -101,3 +107,111 @@ def test_perception_policy_rejects_unknown_screen_mode(tmp_path: Path) -> None:
         assert "screen_access" in str(exc)
     else:
         raise AssertionError("continuous screen access must be rejected")
+
+
+def test_state_table_keeps_order_and_updates_in_place(tmp_path: Path) -> None:
+    table = StateTable(tmp_path / "things.json")
+    table.put("a", {"n": 1})
+    table.put("b", {"n": 2})
+    table.put("a", {"n": 3})
+    table.put("c", {"n": 4})
+
+    assert table.items() == [("a", {"n": 3}), ("b", {"n": 2}), ("c", {"n": 4})]
+
+    table.trim(2)
+    table.delete("c")
+
+    assert table.values() == [{"n": 2}]
+    assert (tmp_path / STATE_DB_NAME).exists()
+
+    table.write([("d", {"n": 5})], delete=["b"])
+    assert table.items() == [("d", {"n": 5})]
+
+
+def test_initiative_state_migrates_from_json_once(tmp_path: Path) -> None:
+    path = tmp_path / "initiative_state.json"
+    path.write_text(
+        json.dumps(
+            {
+                "emissions": [{"type": "daily_greeting", "emitted_at": "2026-10-01T09:00:00"}],
+                "last_emitted_at": "2026-10-01T09:00:00",
+                "last_user_activity_by_session": {
+                    "s1": {"session_id": "s1", "source": "chat", "observed_at": "2026-10-01T10:00:00"}
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    store = InitiativeStore(path)
+
+    assert not path.exists()
+    assert path.with_name("initiative_state.json.migrated").exists()
+    assert store.daily_count("2026-10-01") == 1
+    assert store.last_user_activity_for_session("s1") == datetime(2026, 10, 1, 10, 0)
+
+    store.record_user_activity(session_id="s1", source="chat", observed_at=datetime(2026, 10, 2, 8, 0))
+    restored = InitiativeStore(path)
+
+    assert restored.daily_count("2026-10-01") == 1
+    assert restored.last_user_activity_for_session("s1") == datetime(2026, 10, 2, 8, 0)
+
+
+def test_user_activity_writes_a_single_row(tmp_path: Path) -> None:
+    store = InitiativeStore(tmp_path / "initiative_state.json")
+    for index in range(50):
+        store.record_emitted(
+            initiative_type="check_in",
+            session_id="s1",
+            message=f"line {index}",
+            reason="test",
+            emitted_at=datetime(2026, 10, 1, 9, index),
+        )
+    emissions = StateTable(tmp_path / "initiative_state.json", namespace="initiative_state.emissions")
+    before = emissions.items()
+
+    store.record_user_activity(session_id="s1", source="chat", observed_at=datetime(2026, 10, 1, 12, 0))
+
+    assert emissions.items() == before
+    assert not (tmp_path / "initiative_state.json").exists()
+
+
+def test_outbox_prune_deletes_rows(tmp_path: Path) -> None:
+    path = tmp_path / "telegram_outbox.json"
+    outbox = TelegramOutbox(path)
+    first = outbox.enqueue(text="hello", kind="initiative", now=datetime.fromisoformat("2026-10-01T09:00:00+00:00"))
+    assert first is not None
+    outbox.ack([first["id"]], now=datetime.fromisoformat("2026-10-01T09:01:00+00:00"))
+    outbox.enqueue(text="later", kind="initiative", now=datetime.fromisoformat("2026-10-03T09:00:00+00:00"))
+
+    assert [record["text"] for record in StateTable(path).values()] == ["later"]
+
+
+def test_media_session_writes_behind(tmp_path: Path) -> None:
+    path = tmp_path / "media.json"
+    store = MediaSessionStore(path, flush_ms=60_000)
+    for latency in range(20):
+        store.update("session-1", turn_state="speaking", model_latency_ms=latency)
+    store.update("session-2", mic_state="listening")
+
+    assert StateTable(path).values() == []
+    assert store.get("session-1")["model_latency_ms"] == 19
+
+    assert store.flush() == 2
+    assert store.flush() == 0
+    store.update("session-1", turn_state="idle")
+    store.close()
+
+    restored = MediaSessionStore(path)
+    assert restored.get("session-1")["turn_state"] == "idle"
+    assert restored.get("session-1")["model_latency_ms"] == 19
+    assert restored.get("session-2")["mic_state"] == "listening"
+
+
+def test_media_session_snapshots_are_not_shared(tmp_path: Path) -> None:
+    store = MediaSessionStore()
+    first = store.get("session-1")
+    first["turn_state"] = "mutated"
+
+    assert store.get("session-1")["turn_state"] == "idle"
+    assert store.update("session-1", extra_flag=True)["extra_flag"] is True
@@ -0,0 +1,116 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.orchestrator.craving_engine import CravingEngine
+from app.orchestrator.turn_context import TurnContext
+
+
+class _CountingStore:
+    def __init__(self, moods=None, contacts=None):
+        self.calls = Counter()
+        self.moods = moods or []
+        self.contacts = contacts or []
+        self.last_user = datetime.now() - timedelta(hours=10)
+
+    def get_last_interaction(self, session_id, role="user"):
+        self.calls["last_interaction"] += 1
+        return self.last_user if role == "user" else None
+
+    def get_recent_moods(self, user_id, limit=7):
+        self.calls["moods"] += 1
+        return self.moods[:limit]
+
+    def get_contacts(self, user_id="default", limit=50):
+        self.calls["contacts"] += 1
+        return self.contacts[:limit]
+
+    def get_user_profile(self, user_id):
+        self.calls["profile"] += 1
+        return SimpleNamespace(name="Ada")
+
+    def add_chat_message(self, session_id, role, content):
+        self.calls["add_chat_message"] += 1
+        if role == "user":
+            self.last_user = datetime.now()
+        return SimpleNamespace(id=1)
+
+
+def test_craving_reads_last_interaction_once_per_turn():
+    store = _CountingStore()
+    turn = TurnContext(store, "s1")
+
+    first = CravingEngine(turn)
+    score = first.calculate_craving("s1")
+    assert first.get_return_bonus("s1")[0] is True
+    turn.add_chat_message("s1", "user", "hi")  # forwarded, but the snapshot stands
+    assert CravingEngine(turn).calculate_craving("s1") == pytest.approx(score, abs=0.01)
+
+    assert store.calls["last_interaction"] == 1
+    assert store.calls["add_chat_message"] == 1
+
+
+def test_mood_reads_share_one_query():
+    moods = [SimpleNamespace(mood=m) for m in (3, 4, 5, 6, 7, 8, 9, 9)]
+    store = _CountingStore(moods=moods)
+    turn = TurnContext(store, "s1")
+
+    assert [m.mood for m in turn.get_recent_moods("u", 3)] == [3, 4, 5]
+    assert [m.mood for m in turn.get_recent_moods("u", 1)] == [3]
+    trend = turn.mood_trend_analysis("u")
+    assert trend["num_entries"] == 7
+    assert trend["direction"] == "down"
+    assert store.calls["moods"] == 1
+
+    assert len(turn.get_recent_moods("u", 14)) == 8  # deeper read refetches once
+    assert len(turn.get_recent_moods("u", 10)) == 8
+    assert store.calls["moods"] == 2
+
+
+def test_short_results_satisfy_deeper_requests():
+    store = _CountingStore(contacts=["a", "b"])
+    turn = TurnContext(store, "s1")
+
+    assert turn.get_contacts("u", limit=1) == ["a"]
+    assert store.calls["contacts"] == 1
+    assert turn.get_contacts("u", limit=50) == ["a", "b"]
+    assert turn.get_contacts("u", limit=100) == ["a", "b"]
+    assert store.calls["contacts"] == 2
+
+    assert turn.get_user_profile("u") is turn.get_user_profile("u")
+    assert store.calls["profile"] == 1
+    assert turn.stats() == {"hits": 2, "misses": 3}
+
+
+def test_concurrent_stages_share_one_fetch():
+    import threading
+
+    started = threading.Event()
+    release = threading.Event()
+
+    class SlowStore(_CountingStore):
+        def get_user_profile(self, user_id):
+            started.set()
+            release.wait(2)  # hold the first fetch open so the second reader races it
+            return super().get_user_profile(user_id)
+
+    store = SlowStore()
+    turn = TurnContext(store, "s1")
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(turn.get_user_profile("u").name))
+        for _ in range(2)
+    ]
+    threads[0].start()
+    assert started.wait(2)
+    threads[1].start()
+    threading.Event().wait(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results == ["Ada", "Ada"]
+    assert store.calls["profile"] == 1
+    assert turn.stats() == {"hits": 1, "misses": 1}